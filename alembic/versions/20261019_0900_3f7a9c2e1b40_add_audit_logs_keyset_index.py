@@ -0,0 +1,27 @@
+"""add_audit_logs_keyset_index
+
+Revision ID: 3f7a9c2e1b40
+Revises: e1c2d3e4f5a6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f7a9c2e1b40'
+down_revision = 'e1c2d3e4f5a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Composite index backing keyset batches on (timestamp, id) per organization
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_org_timestamp_id "
+        "ON audit_logs (organization_id, timestamp, id)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_org_timestamp_id")
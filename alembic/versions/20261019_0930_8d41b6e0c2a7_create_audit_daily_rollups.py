@@ -0,0 +1,37 @@
+"""create_audit_daily_rollups
+
+Revision ID: 8d41b6e0c2a7
+Revises: 3f7a9c2e1b40
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b6e0c2a7'
+down_revision = '3f7a9c2e1b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'audit_daily_rollups',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('total_events', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('phi_access_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('active_users_sketch', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('organization_id', 'day'),
+    )
+    op.create_index('ix_audit_daily_rollups_day', 'audit_daily_rollups', ['day'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_audit_daily_rollups_day', table_name='audit_daily_rollups')
+    op.drop_table('audit_daily_rollups')
@@ -0,0 +1,28 @@
+"""add_consultations_awaiting_transcript_index
+
+Revision ID: b52e7d9a4c13
+Revises: 8d41b6e0c2a7
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e7d9a4c13'
+down_revision = '8d41b6e0c2a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Partial index for the transcript watcher's sweep; stays tiny since only
+    # consultations still waiting on Google Meet are included
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_consultations_awaiting_transcript "
+        "ON consultations (updated_at) WHERE ai_status = 'awaiting_transcript'"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_consultations_awaiting_transcript")
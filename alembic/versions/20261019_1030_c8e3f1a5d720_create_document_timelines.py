@@ -0,0 +1,36 @@
+"""create_document_timelines
+
+Revision ID: c8e3f1a5d720
+Revises: b52e7d9a4c13
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e3f1a5d720'
+down_revision = 'b52e7d9a4c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'document_timelines',
+        sa.Column('document_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('document_version', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('events', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('generated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('document_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('document_timelines')
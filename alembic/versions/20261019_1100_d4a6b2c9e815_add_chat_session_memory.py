@@ -0,0 +1,26 @@
+"""add_chat_session_memory
+
+Revision ID: d4a6b2c9e815
+Revises: c8e3f1a5d720
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a6b2c9e815'
+down_revision = 'c8e3f1a5d720'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('chat_sessions', sa.Column('memory_summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('memory_through', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    op.drop_column('chat_sessions', 'memory_through')
+    op.drop_column('chat_sessions', 'memory_summary')
@@ -0,0 +1,52 @@
+"""add_clinical_search_vectors
+
+Revision ID: e1f7a3c5b942
+Revises: d4a6b2c9e815
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f7a3c5b942'
+down_revision = 'd4a6b2c9e815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Generated columns: Postgres keeps them current on every insert/update,
+    # so no application code or trigger has to maintain them
+    op.execute(
+        """
+        ALTER TABLE consultations ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(prescription, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(chief_complaint, '')), 'B') ||
+            setweight(jsonb_to_tsvector('english', coalesce(soap_note, '{}'::jsonb), '["string"]'), 'C') ||
+            setweight(to_tsvector('english', coalesce(notes, '')), 'C')
+        ) STORED
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_consultations_search_vector "
+        "ON consultations USING gin (search_vector)"
+    )
+
+    op.execute(
+        "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_chunks_search_vector "
+        "ON chunks USING gin (search_vector)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_chunks_search_vector")
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP INDEX IF EXISTS ix_consultations_search_vector")
+    op.execute("ALTER TABLE consultations DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,39 @@
+"""index_consultations_into_chunks
+
+Revision ID: f3b8d1e6a274
+Revises: e1f7a3c5b942
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d1e6a274'
+down_revision = 'e1f7a3c5b942'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Chunks can now come from a consultation's SOAP note instead of a document
+    op.add_column('chunks', sa.Column('consultation_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'fk_chunks_consultation_id', 'chunks', 'consultations',
+        ['consultation_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index('ix_chunks_consultation_id', 'chunks', ['consultation_id'], unique=False)
+    op.alter_column('chunks', 'document_id', existing_type=sa.UUID(), nullable=True)
+    op.create_check_constraint(
+        'chk_chunk_origin', 'chunks', 'num_nonnulls(document_id, consultation_id) = 1'
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM chunks WHERE consultation_id IS NOT NULL")
+    op.drop_constraint('chk_chunk_origin', 'chunks', type_='check')
+    op.alter_column('chunks', 'document_id', existing_type=sa.UUID(), nullable=False)
+    op.drop_index('ix_chunks_consultation_id', table_name='chunks')
+    op.drop_constraint('fk_chunks_consultation_id', 'chunks', type_='foreignkey')
+    op.drop_column('chunks', 'consultation_id')
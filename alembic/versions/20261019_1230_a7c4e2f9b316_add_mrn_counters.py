@@ -0,0 +1,37 @@
+"""add_mrn_counters
+
+Revision ID: a7c4e2f9b316
+Revises: f3b8d1e6a274
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c4e2f9b316'
+down_revision = 'f3b8d1e6a274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-organization MRN sequences replace count(*) over patients.
+    # Existing MRNs (ORG-YYYY-NNNNNN-RRRR) cannot collide with the new
+    # ORG-CCCC-NNNNNN format, so no backfill is needed.
+    op.execute("CREATE SEQUENCE mrn_org_code_seq")
+    op.create_table(
+        'mrn_counters',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('org_code', sa.Integer(), server_default=sa.text("nextval('mrn_org_code_seq')"), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), server_default='1', nullable=False),
+        sa.PrimaryKeyConstraint('organization_id'),
+        sa.UniqueConstraint('org_code'),
+    )
+
+
+def downgrade():
+    op.drop_table('mrn_counters')
+    op.execute("DROP SEQUENCE mrn_org_code_seq")
@@ -0,0 +1,48 @@
+"""create_patient_imports
+
+Revision ID: b9d2f6a1c843
+Revises: a7c4e2f9b316
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d2f6a1c843'
+down_revision = 'a7c4e2f9b316'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'patient_imports',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('file_name', sa.String(length=255), nullable=False),
+        sa.Column('file_format', sa.String(length=10), nullable=False),
+        sa.Column('storage_path', sa.String(length=500), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('total_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('imported_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='[]'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_patient_imports_organization_id', 'patient_imports', ['organization_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_patient_imports_organization_id', table_name='patient_imports')
+    op.drop_table('patient_imports')
@@ -0,0 +1,30 @@
+"""index_calendar_event_ranges
+
+Revision ID: c2e8a4b7d951
+Revises: b9d2f6a1c843
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e8a4b7d951'
+down_revision = 'b9d2f6a1c843'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Month/day views scan one calendar or one organization by start_time
+    op.create_index(
+        'ix_calendar_events_org_start_time', 'calendar_events', ['organization_id', 'start_time'], unique=False
+    )
+    op.create_index(
+        'ix_calendar_events_user_start_time', 'calendar_events', ['user_id', 'start_time'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_calendar_events_user_start_time', table_name='calendar_events')
+    op.drop_index('ix_calendar_events_org_start_time', table_name='calendar_events')
@@ -0,0 +1,33 @@
+"""add_notification_feed_score
+
+Revision ID: d4f1a9c6e382
+Revises: c2e8a4b7d951
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f1a9c6e382'
+down_revision = 'c2e8a4b7d951'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Feed cursors (epoch microseconds) move from created_at to a stored score
+    op.add_column('notifications', sa.Column('feed_score', sa.BigInteger(), nullable=True))
+    op.execute(
+        "UPDATE notifications SET feed_score = (extract(epoch FROM created_at) * 1000000)::bigint"
+    )
+    op.alter_column('notifications', 'feed_score', nullable=False)
+    op.create_index(
+        'ix_notifications_user_feed_score', 'notifications', ['user_id', 'feed_score'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_notifications_user_feed_score', table_name='notifications')
+    op.drop_column('notifications', 'feed_score')
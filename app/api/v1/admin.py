@@ -1,6 +1,6 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
 from app.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func, case
@@ -8,10 +8,10 @@ from datetime import datetime, timedelta, time, timezone
 import uuid
 from app.services.minio_service import minio_service
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional
 import hashlib
 
-from app.database import get_db
+from app.database import get_db, get_readonly_db
 from app.core.deps import require_role, require_any_role
 from app.models.user import User, Organization, Invitation
 from app.models.activity_log import ActivityLog
@@ -49,7 +49,7 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 # --- 1. Dashboard Overview (UPDATED) ---
 @router.get("/overview", response_model=AdminOverviewResponse)
 async def get_dashboard_overview(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     current_user: User = Depends(require_role("admin")),
 ):
     """
@@ -134,6 +134,8 @@ async def get_dashboard_overview(
     alerts = []
     from app.services.notification_service import NotificationService
     ns = NotificationService(db)
+    # Alerts to persist as notifications (created in one batch below)
+    pending_alerts = []
     
     # A. Storage Alerts
     if storage_stats.percentage > 90:
@@ -145,20 +147,13 @@ async def get_dashboard_overview(
             severity="high"
         )
         alerts.append(alert_item)
-        # Create persistent notification for Admin if not already present
-        existing = await db.execute(select(Notification).where(
-            Notification.user_id == current_user.id,
-            Notification.type == "storage-critical",
-            Notification.is_read == False
-        ))
-        if not existing.scalars().first():
-            await ns.create_notification(
-                user_id=current_user.id,
-                type="storage-critical",
-                title=alert_item.title,
-                message=alert_item.message,
-                organization_id=current_user.organization_id
-            )
+        pending_alerts.append({
+            "user_id": current_user.id,
+            "type": "storage-critical",
+            "title": alert_item.title,
+            "message": alert_item.message,
+            "organization_id": current_user.organization_id
+        })
 
     elif storage_stats.percentage > 70:
         alert_item = SystemAlert(
@@ -169,20 +164,13 @@ async def get_dashboard_overview(
             severity="medium"
         )
         alerts.append(alert_item)
-        # Create persistent notification for Admin if not already present
-        existing = await db.execute(select(Notification).where(
-            Notification.user_id == current_user.id,
-            Notification.type == "storage-warning",
-            Notification.is_read == False
-        ))
-        if not existing.scalars().first():
-            await ns.create_notification(
-                user_id=current_user.id,
-                type="storage-warning",
-                title=alert_item.title,
-                message=alert_item.message,
-                organization_id=current_user.organization_id
-            )
+        pending_alerts.append({
+            "user_id": current_user.id,
+            "type": "storage-warning",
+            "title": alert_item.title,
+            "message": alert_item.message,
+            "organization_id": current_user.organization_id
+        })
 
     # B. New User Vetting Alerts
     unverified_users_query = select(func.count(User.id)).where(User.email_verified == False, User.deleted_at.is_(None))
@@ -196,21 +184,14 @@ async def get_dashboard_overview(
             severity="medium"
         )
         alerts.append(alert_item)
-        # Create persistent notification if not already present
-        existing = await db.execute(select(Notification).where(
-            Notification.user_id == current_user.id,
-            Notification.type == "user-vetting",
-            Notification.is_read == False
-        ))
-        if not existing.scalars().first():
-            await ns.create_notification(
-                user_id=current_user.id,
-                type="user-vetting",
-                title=alert_item.title,
-                message=alert_item.message,
-                organization_id=current_user.organization_id,
-                action_url="/dashboard/admin/manage-accounts"
-            )
+        pending_alerts.append({
+            "user_id": current_user.id,
+            "type": "user-vetting",
+            "title": alert_item.title,
+            "message": alert_item.message,
+            "organization_id": current_user.organization_id,
+            "action_url": "/dashboard/admin/manage-accounts"
+        })
 
     # C. AI Processing Failures
     from app.models.consultation import Consultation
@@ -225,6 +206,17 @@ async def get_dashboard_overview(
             severity="medium"
         ))
 
+    # D. Persist new alerts, skipping any the admin still has unread
+    if pending_alerts:
+        unread_types = set((await db.execute(select(Notification.type).where(
+            Notification.user_id == current_user.id,
+            Notification.type.in_([a["type"] for a in pending_alerts]),
+            Notification.is_read == False
+        ))).scalars())
+        await ns.create_notifications_bulk(
+            [a for a in pending_alerts if a["type"] not in unread_types]
+        )
+
     # 4. Global Total Doctors
     doctor_count_query = select(func.count(User.id)).where(User.role == "doctor", User.deleted_at.is_(None))
     doctor_count_result = await db.execute(doctor_count_query)
@@ -488,8 +480,8 @@ async def update_admin_account(
         user.phone_number = pii_encryption.encrypt(update_data.phone_number) if pii_encryption else update_data.phone_number
 
     if update_data.password:
-        from app.core.security import hash_password
-        user.password_hash = hash_password(update_data.password)
+        from app.core.security import hash_password_async
+        user.password_hash = await hash_password_async(update_data.password)
 
     # 2. Doctor-specific fields on User table
     if update_data.specialty:
@@ -609,7 +601,7 @@ async def remove_team_member(
 
 @router.get("/organizations/stats", response_model=List[AdminClinicStatsItem])
 async def get_clinic_management_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     current_user: User = Depends(require_role("admin")),
 ):
     """
@@ -806,8 +798,8 @@ async def update_admin_profile(
         current_user.phone_number = pii_encryption.encrypt(profile_in.phone_number) if (pii_encryption and profile_in.phone_number) else profile_in.phone_number
 
     if profile_in.password:
-        from app.core.security import hash_password
-        current_user.password_hash = hash_password(profile_in.password)
+        from app.core.security import hash_password_async
+        current_user.password_hash = await hash_password_async(profile_in.password)
 
     await db.commit()
     return {"message": "Profile updated successfully"}
@@ -1007,46 +999,66 @@ async def get_admin_doctor_details(
 
 @router.get("/audit-logs", response_model=AdminAuditResponse)
 async def get_audit_logs(
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_readonly_db),
     current_user: User = Depends(require_role("admin")),
 ):
     """
     Enhanced global audit logs with security insights for administrators.
+
+    Logs are cursor-paginated on (timestamp, id); insights are only computed
+    for the first page.
     """
     from sqlalchemy.orm import selectinload
     from app.models.audit import AuditLog
+    from app.services.audit_service import apply_audit_cursor, decode_audit_cursor, encode_audit_cursor
     from datetime import timedelta
+
+    position = None
+    if cursor:
+        try:
+            position = decode_audit_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
     
     # 1. Fetch Global Audit Logs
     query = (
-        select(AuditLog)
+        apply_audit_cursor(select(AuditLog), position)
         .options(selectinload(AuditLog.user))
-        .order_by(desc(AuditLog.timestamp))
-        .limit(100)
+        .limit(limit)
     )
     result = await db.execute(query)
     logs = result.scalars().all()
+    next_cursor = encode_audit_cursor(logs[-1].timestamp, logs[-1].id) if len(logs) == limit else None
     
-    # 2. Calculate 24h Insights (Dynamic Stats)
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    
-    from app.models.user import User, Organization
-    
-    # 2.1 Total Events (Last 24h)
-    total_24h_query = select(func.count(AuditLog.id)).where(AuditLog.timestamp >= yesterday)
-    total_24h = await db.scalar(total_24h_query) or 0
-    
-    # 2.2 New Users Onboarding (Last 24h)
-    new_users_query = select(func.count(User.id)).where(User.created_at >= yesterday)
-    new_users_24h = await db.scalar(new_users_query) or 0
-    
-    # 2.3 New Doctors Onboarding (Last 24h)
-    new_doctors_query = select(func.count(User.id)).where(User.created_at >= yesterday, User.role == "doctor")
-    new_doctors_24h = await db.scalar(new_doctors_query) or 0
-    
-    # 2.4 New Hospitals/Clinics Onboarding (Last 24h)
-    new_hospitals_query = select(func.count(Organization.id)).where(Organization.created_at >= yesterday)
-    new_hospitals_24h = await db.scalar(new_hospitals_query) or 0
+    # 2. Calculate 24h Insights (Dynamic Stats) - first page only
+    insights = None
+    if position is None:
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        
+        # 2.1 Total Events (Last 24h)
+        total_24h_query = select(func.count(AuditLog.id)).where(AuditLog.timestamp >= yesterday)
+        total_24h = await db.scalar(total_24h_query) or 0
+        
+        # 2.2 New Users Onboarding (Last 24h)
+        new_users_query = select(func.count(User.id)).where(User.created_at >= yesterday)
+        new_users_24h = await db.scalar(new_users_query) or 0
+        
+        # 2.3 New Doctors Onboarding (Last 24h)
+        new_doctors_query = select(func.count(User.id)).where(User.created_at >= yesterday, User.role == "doctor")
+        new_doctors_24h = await db.scalar(new_doctors_query) or 0
+        
+        # 2.4 New Hospitals/Clinics Onboarding (Last 24h)
+        new_hospitals_query = select(func.count(Organization.id)).where(Organization.created_at >= yesterday)
+        new_hospitals_24h = await db.scalar(new_hospitals_query) or 0
+
+        insights = AuditInsights(
+            total_events_24h=total_24h,
+            new_users_24h=new_users_24h,
+            new_doctors_24h=new_doctors_24h,
+            new_hospitals_24h=new_hospitals_24h
+        )
     
     try:
         from app.core.security import pii_encryption
@@ -1089,10 +1101,74 @@ async def get_audit_logs(
 
     return AdminAuditResponse(
         logs=formatted_logs,
-        insights=AuditInsights(
-            total_events_24h=total_24h,
-            new_users_24h=new_users_24h,
-            new_doctors_24h=new_doctors_24h,
-            new_hospitals_24h=new_hospitals_24h
-        )
-    )
\ No newline at end of file
+        insights=insights,
+        next_cursor=next_cursor
+    )
+
+@router.get("/ai-cache-stats")
+async def get_ai_cache_stats(
+    current_user: User = Depends(require_role("admin")),
+):
+    """
+    Bedrock cache effectiveness per call kind (chat, timeline, credentials, title):
+    response-cache hits/misses and prompt-cache token counts with hit rates.
+    """
+    from app.services.bedrock_cache import bedrock_cache
+
+    try:
+        return {"kinds": await bedrock_cache.stats()}
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Cache statistics unavailable: {e}")
+
+
+@router.get("/password-hash-stats")
+async def get_password_hash_stats(
+    current_user: User = Depends(require_role("admin")),
+):
+    """
+    Password hashing pool of this API process: workers, running and queued
+    bcrypt jobs, average queue wait and requests rejected with 503.
+    """
+    from app.core.security import password_hasher
+
+    return password_hasher.stats()
+
+
+@router.get("/db-pool-stats")
+async def get_db_pool_stats(
+    current_user: User = Depends(require_role("admin")),
+):
+    """
+    Connection pool usage of this API process per database engine (primary
+    and each read replica), with replica lag and health.
+    """
+    from app.database import pool_stats
+
+    return pool_stats()
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_role("admin")),
+):
+    """
+    Slow-query log across all API and worker processes: statement
+    fingerprints ranked by total time, plus the latest slow statements.
+    """
+    from app.core.db_instrumentation import slow_query_report
+
+    try:
+        return await slow_query_report(limit)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Slow query log unavailable: {e}")
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries(
+    current_user: User = Depends(require_role("admin")),
+):
+    """Clear the slow-query log, e.g. after deploying a fix"""
+    from app.core.db_instrumentation import reset_slow_query_log
+
+    await reset_slow_query_log()
@@ -412,8 +412,8 @@ async def send_chat_message(
 
     **Flow**:
     1. Validate AI access permission
-    2. Load session + last 10 messages (conversation memory)
-    3. Run RAG (doc chunks + SOAP notes)
+    2. Load session, its rolling memory summary and the not-yet-summarised messages
+    3. Run RAG (doc chunks + SOAP notes) and pack context within the token budget
     4. Apply medical guardrails & confidence scoring
     5. Stream Claude response
     6. Persist both messages to `chat_messages` table
@@ -439,10 +439,12 @@ async def send_chat_message(
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found or access denied")
 
-    # Load conversation history for context
+    # Load conversation history not yet folded into the session's rolling memory
     session_history = await session_svc.get_session_history_for_prompt(
-        session_id=request.session_id
+        session_id=request.session_id,
+        since=session.memory_through,
     )
+    session_memory = session.memory_summary
 
     ai_service = AIChatService(db)
 
@@ -458,6 +460,7 @@ async def send_chat_message(
             requesting_user=current_user,
             document_id=request.document_id,
             session_history=session_history,
+            session_memory=session_memory,
         ):
             # Detect internal metadata event (not streamed to frontend)
             if token.startswith("\n__META__:"):
@@ -486,6 +489,12 @@ async def send_chat_message(
             title = await session_svc.auto_generate_title(request.message)
             await session_svc.set_title(request.session_id, title)
 
+        # Fold turns that left the verbatim window into the rolling memory
+        try:
+            await session_svc.update_rolling_memory(request.session_id)
+        except Exception as e:
+            print(f"[AI Chat] Rolling memory update failed for session {request.session_id}: {e}")
+
     return StreamingResponse(_stream_and_persist(), media_type="text/event-stream")
 
 
@@ -628,32 +637,6 @@ async def get_doctor_history(
 # Medical Timeline Generation (new endpoint)
 # ══════════════════════════════════════════════════════════════════════════════
 
-TIMELINE_SYSTEM_PROMPT = """\
-You are a clinical document analysis AI. Your task is to extract a structured timeline from the provided document.
-
-STRICT RULES:
-1. Extract ALL events that have a date or time reference — clinical, administrative, or otherwise.
-2. For every event you extract, provide a date (even if approximate like "2024-01", "~2023" or "Unknown").
-3. Classify each event into one of these types: lab, imaging, visit, medication, procedure, surgery, diagnosis, vaccination, other
-4. If the document is a medical report, focus on clinical events. If it has any dated entries, milestones, or references, include those too under type "other".
-5. Return ONLY valid JSON — no markdown fences, no explanation, no preamble.
-
-JSON format (array of events, sorted by date descending):
-[
-  {
-    "id": 1,
-    "date": "YYYY-MM-DD or YYYY-MM or YYYY or approximate",
-    "title": "Short event title (max 60 chars)",
-    "description": "Brief description of the event (max 120 chars)",
-    "type": "lab|imaging|visit|medication|procedure|surgery|diagnosis|vaccination|other",
-    "page": 1
-  }
-]
-
-If truly no events with any date or time reference can be found, return an empty array: []
-"""
-
-
 class TimelineEvent(BaseModel):
     id: int
     date: str
@@ -670,27 +653,31 @@ class TimelineResponse(BaseModel):
     source: str  # "ai" or "fallback"
 
 
-@router.get("/timeline/{document_id}", response_model=TimelineResponse)
+@router.get(
+    "/timeline/{document_id}",
+    response_model=TimelineResponse,
+    responses={202: {"description": "Timeline is still being generated; retry shortly"}},
+)
 async def get_document_timeline(
     document_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Analyse a medical document with AI (Claude via Bedrock) and extract
-    a structured timeline as a list of dated events.
+    Return the structured timeline (dated events) of a medical document.
 
-    The document is fetched directly from MinIO (no presigned URL needed).
+    Timelines are extracted by AI (Claude via Bedrock) once per document
+    version and stored; later views are a single database read. The first
+    view of a new version generates it (or waits for a generation already in
+    progress) and may answer 202 if that takes too long.
     """
     if current_user.role not in ["doctor", "admin"]:
         raise HTTPException(status_code=403, detail="Doctor or Admin role required")
 
+    from fastapi.responses import JSONResponse
     from sqlalchemy import select as sa_select
     from app.models.document import Document
-    from app.services.storage_service import StorageService
-    from app.services.aws_service import aws_service as _aws_svc
-    from datetime import datetime
-    import base64, json as _json
+    from app.services.timeline_service import TimelineService
 
     # 1. Fetch document metadata
     result = await db.execute(
@@ -703,128 +690,9 @@ async def get_document_timeline(
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # 2. Download raw bytes from MinIO using internal client
-    storage = StorageService()
+    # 2. Serve the stored timeline, generating it once if needed
     try:
-        import io
-        response_obj = storage.client.get_object(
-            bucket_name=storage.bucket_name,
-            object_name=doc.storage_path,
-        )
-        file_bytes = response_obj.read()
-        response_obj.close()
-        response_obj.release_conn()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Could not fetch document from storage: {e}")
-
-    # 3. Determine media type
-    fname = (doc.file_name or "").lower()
-    if fname.endswith(".pdf"):
-        media_type = "application/pdf"
-    elif fname.endswith(".png"):
-        media_type = "image/png"
-    elif fname.endswith((".jpg", ".jpeg")):
-        media_type = "image/jpeg"
-    elif fname.endswith(".webp"):
-        media_type = "image/webp"
-    else:
-        media_type = "application/pdf"  # safe fallback for unknown types
-
-    now_str = datetime.utcnow().isoformat()
-    is_image = media_type.startswith("image/")
-
-    # 4. Build Claude message — images use vision, PDFs use extracted text
-    if is_image:
-        b64_data = base64.b64encode(file_bytes).decode("utf-8")
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": media_type,
-                            "data": b64_data,
-                        },
-                    },
-                    {
-                        "type": "text",
-                        "text": (
-                            f"Analyse this document image (file: {doc.file_name}). "
-                            "Extract all timeline events with dates and return them as JSON."
-                        ),
-                    },
-                ],
-            }
-        ]
-    else:
-        # For PDFs: extract text via pypdf
-        try:
-            import io as _io
-            from pypdf import PdfReader
-            reader = PdfReader(_io.BytesIO(file_bytes))
-            text = "\n".join(page.extract_text() or "" for page in reader.pages)
-            if not text.strip():
-                text = "[PDF contained no extractable text — may be a scanned image]"
-        except Exception as pdf_ex:
-            text = f"[Could not extract text from PDF: {pdf_ex}]"
-
-        print(f"[Timeline] Extracted {len(text)} chars from PDF: {doc.file_name}")
-
-        messages = [
-            {
-                "role": "user",
-                "content": (
-                    f"Analyse this document text (file: {doc.file_name}):\n\n"
-                    f"{text[:12000]}\n\n"
-                    "Extract all timeline events with dates and return them as JSON."
-                ),
-            }
-        ]
-
-    # 5. Call Bedrock via the shared aws_service (correct credentials & region)
-    body = _json.dumps({
-        "anthropic_version": "bedrock-2023-05-31",
-        "max_tokens": 2048,
-        "system": TIMELINE_SYSTEM_PROMPT,
-        "messages": messages,
-    })
-
-    try:
-        bedrock = _aws_svc._get_client("bedrock-runtime")
-        resp = bedrock.invoke_model(
-            modelId=_aws_svc.model_id,
-            body=body,
-        )
-        resp_body = _json.loads(resp.get("body").read().decode())
-        raw_text = resp_body["content"][0]["text"].strip()
-        print(f"[Timeline] Claude raw response ({len(raw_text)} chars): {raw_text[:300]}")
-
-        # Strip optional code fences
-        if "```json" in raw_text:
-            raw_text = raw_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in raw_text:
-            raw_text = raw_text.split("```")[1].split("```")[0].strip()
-
-        events_raw = _json.loads(raw_text)
-        if not isinstance(events_raw, list):
-            events_raw = []
-
-        events = [
-            TimelineEvent(
-                id=i + 1,
-                date=str(e.get("date", "Unknown")),
-                title=str(e.get("title", "Event"))[:60],
-                description=str(e.get("description", ""))[:120],
-                type=str(e.get("type", "other")),
-                page=int(e.get("page", 1)),
-            )
-            for i, e in enumerate(events_raw)
-        ]
-        source = "ai"
-        print(f"[Timeline] Extracted {len(events)} events from {doc.file_name}")
-
+        timeline = await TimelineService(db).get_or_generate(doc)
     except Exception as ex:
         print(f"[Timeline] Bedrock call failed for doc {document_id}: {ex}")
         raise HTTPException(
@@ -832,9 +700,21 @@ async def get_document_timeline(
             detail=f"AI timeline generation failed: {ex}"
         )
 
+    if timeline is None:
+        return JSONResponse(
+            status_code=202,
+            content={"document_id": str(document_id), "status": "pending"},
+            headers={"Retry-After": "5"},
+        )
+    if timeline.status == "failed":
+        raise HTTPException(
+            status_code=500,
+            detail=f"AI timeline generation failed: {timeline.error}"
+        )
+
     return TimelineResponse(
         document_id=str(document_id),
-        events=events,
-        generated_at=now_str,
-        source=source,
+        events=[TimelineEvent(**event) for event in timeline.events or []],
+        generated_at=timeline.generated_at.isoformat(),
+        source="ai",
     )
@@ -1,8 +1,8 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,6 +16,8 @@ from app.schemas.appointment import (
     AppointmentResponse,
     AppointmentStatusUpdate,
     AppointmentApproval,
+    AppointmentBulkAccept,
+    AvailableSlot,
     DoctorAppointmentCreate
 )
 from app.services.zoom_service import zoom_service
@@ -23,12 +25,26 @@ from app.services.notification_service import NotificationService
 
 router = APIRouter(prefix="/appointments", tags=["Appointments"])
 
+
+async def _ensure_doctor_available(db: AsyncSession, doctor_id: UUID, requested_date: datetime) -> None:
+    """409 when the requested slot overlaps the doctor's appointments or events"""
+    from app.services.scheduling_service import SchedulingService
+
+    conflict = await SchedulingService(db).find_conflict(doctor_id, requested_date)
+    if conflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"The doctor is not available at the requested time (busy {conflict[0].isoformat()} - {conflict[1].isoformat()})"
+        )
+
+
 @router.post("", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_appointment(
     appointment_in: AppointmentCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    await _ensure_doctor_available(db, appointment_in.doctor_id, appointment_in.requested_date)
     try:
         # Check if this is a hospital patient flow
         # A hospital patient is one who belongs to an organization that is not the 'default' one
@@ -86,11 +102,11 @@ async def create_appointment(
         
         await db.commit()
         
-        # Sync appointment to calendar only if accepted (usually patient creates pending)
-        if appointment.status == "accepted":
-            from app.services.calendar_service import CalendarService
-            calendar_service = CalendarService(db)
-            await calendar_service.sync_appointment_to_calendar(appointment, "create")
+        # Sync appointment to calendar (events only once accepted; pending requests
+        # still hold the doctor's slot, so free/busy is refreshed either way)
+        from app.services.calendar_service import CalendarService
+        calendar_service = CalendarService(db)
+        await calendar_service.sync_appointment_to_calendar(appointment, "create")
         
         # Eagerly load relationships to avoid lazy loading issues in async
         stmt = select(Appointment).where(Appointment.id == appointment.id).options(
@@ -202,6 +218,8 @@ async def create_appointment_by_doctor(
     Doctor creates an appointment request for a patient.
     Status is set to pending, patient must accept/reject.
     """
+    await _ensure_doctor_available(db, current_user.id, appointment_in.requested_date)
+
     appointment = Appointment(
         doctor_id=current_user.id,
         patient_id=appointment_in.patient_id,
@@ -272,6 +290,26 @@ async def create_appointment_by_doctor(
     
     return AppointmentResponse(**response_dict)
 
+@router.get("/slots", response_model=List[AvailableSlot])
+async def get_available_slots(
+    count: int = Query(10, ge=1, le=50, description="Number of slots to return"),
+    after: Optional[datetime] = Query(None, description="Earliest slot start (default: now)"),
+    department: Optional[str] = Query(None, description="Only doctors of this department"),
+    doctor_id: Optional[UUID] = Query(None, description="Only this doctor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Next free appointment slots across the organization's doctors, soonest first.
+    Served from the cached free/busy intervals, for booking UIs.
+    """
+    from app.services.scheduling_service import SchedulingService
+
+    return await SchedulingService(db).next_free_slots(
+        current_user.organization_id, count, after=after, department=department, doctor_id=doctor_id
+    )
+
+
 @router.get("/patient-appointments", response_model=List[AppointmentResponse])
 async def get_patient_appointments(
     db: AsyncSession = Depends(get_db),
@@ -406,90 +444,27 @@ async def _do_update_appointment_status(
         if status_update.status in ["accepted", "completed"]:
             raise HTTPException(status_code=403, detail="Patients cannot accept their own requests.")
     
+    if status_update.status in ["accepted", "completed"]:
+        # Generate Google Meet link if not exists
+        if not appointment.meet_link:
+            await _create_meet_link(appointment)
+        if status_update.reschedule_note:
+            appointment.reschedule_note = status_update.reschedule_note
+        notification = await _accept_appointment(
+            db, appointment, current_user, status_update.status, status_update.doctor_notes
+        )
+        await db.commit()
+        await db.refresh(appointment)
+        if notification:
+            await NotificationService(db).create_notification(**notification)
+        return appointment
+
     appointment.status = status_update.status
     if status_update.doctor_notes:
         appointment.doctor_notes = status_update.doctor_notes
     if status_update.reschedule_note:
         appointment.reschedule_note = status_update.reschedule_note
     appointment.updated_at = datetime.utcnow()
-    
-    # Special handling for when an appointment becomes 'accepted' OR 'completed'
-    if appointment.status in ["accepted", "completed"]:
-        # Generate Google Meet link if not exists
-        if not appointment.meet_link:
-            from app.services.google_meet_service import google_meet_service
-            from app.core.security import pii_encryption
-            
-            p_name = "Patient"
-            d_name = "Doctor"
-            # Decrypt names for Meet summary
-            try:
-                if appointment.patient:
-                    p_name = pii_encryption.decrypt(appointment.patient.full_name)
-            except:
-                pass
-            try:
-                if appointment.doctor:
-                    d_name = pii_encryption.decrypt(appointment.doctor.full_name)
-            except:
-                pass
-                
-            summary = f"Consultation: Dr. {d_name} & {p_name}"
-            # Fetch emails for attendees if possible
-            attendees = []
-            if appointment.patient.email:
-                attendees.append(appointment.patient.email)
-            if appointment.doctor.email:
-                attendees.append(appointment.doctor.email)
-                
-            try:
-                g_event_id, meet_link = await google_meet_service.create_meeting(
-                    start_time=appointment.requested_date,
-                    duration_minutes=30,
-                    summary=summary,
-                    attendees=attendees
-                )
-                appointment.google_event_id = g_event_id
-                appointment.meet_link = meet_link
-            except Exception as e:
-                print(f"Failed to create Google Meet: {e}")
-
-        # ── ENSURE A CONSULTATION RECORD EXISTS ───────────────────────────────
-        # This makes it appear in 'Visit History' and enables SOAP reports.
-        try:
-            from app.models.consultation import Consultation
-            # Check if one already exists for this slot + doctor + patient
-            c_check = await db.execute(
-                select(Consultation).where(
-                    and_(
-                        Consultation.doctor_id == appointment.doctor_id,
-                        Consultation.patient_id == appointment.patient_id,
-                        Consultation.scheduled_at == appointment.requested_date
-                    )
-                )
-            )
-            if not c_check.scalars().first():
-                # Use hospital_id if available, fallback to doctor's org
-                org_id = appointment.hospital_id or appointment.doctor.organization_id
-                
-                linked_consultation = Consultation(
-                    doctor_id=appointment.doctor_id,
-                    patient_id=appointment.patient_id,
-                    organization_id=org_id,
-                    scheduled_at=appointment.requested_date,
-                    duration_minutes=30,
-                    status="completed" if appointment.status == "completed" else "scheduled",
-                    google_event_id=appointment.google_event_id,
-                    meet_link=appointment.meet_link,
-                    notes=appointment.doctor_notes,
-                    chief_complaint=appointment.reason,
-                    visit_state="completed" if appointment.status == "completed" else "scheduled"
-                )
-                db.add(linked_consultation)
-                print(f"[Appointments] ✅ Automatically created linked consultation for appointment {appointment.id}")
-        except Exception as e:
-            print(f"[Appointments] ⚠ Could not auto-create linked consultation: {e}")
-        # ─────────────────────────────────────────────────────────────────────
 
     # Sync appointment status to calendar
     from app.services.calendar_service import CalendarService
@@ -499,56 +474,225 @@ async def _do_update_appointment_status(
     if status_update.status in ["declined", "cancelled", "rejected"]:
         await calendar_service.sync_appointment_to_calendar(appointment, "cancel")
     else:
-        # If it was pending and now accepted/completed, 'update' in calendar_service 
         await calendar_service.sync_appointment_to_calendar(appointment, "update")
     
     await db.commit()
     await db.refresh(appointment)
     
-    notification_service = NotificationService(db)
-    
-    # Notification handling
-    target_user_id = None
-    notif_type = None
-    notif_title = None
-    notif_message = None
-    
-    from app.core.security import pii_encryption
-    actor_name = "The other party"
-    if is_patient:
-        actor_name = pii_encryption.decrypt(appointment.patient.full_name) if appointment.patient else "The patient"
-        target_user_id = appointment.doctor_id
-    else:
-        actor_name = pii_encryption.decrypt(appointment.doctor.full_name) if appointment.doctor else "The doctor"
-        actor_name = f"Dr. {actor_name}"
-        target_user_id = appointment.patient_id
-        
-    status_display = appointment.status.replace('_', ' ')
-    note = appointment.reschedule_note or appointment.doctor_notes or ""
-    print(f"DEBUG: Constructing notification for apt {appointment.id}. Note: {note}")
-    note_text = f" Reason: \"{note}\"" if (note and len(note.strip()) > 0) else ""
-    
-    if appointment.status == "accepted":
-        notif_type = "appointment_accepted"
-        notif_title = "Appointment Accepted"
-        notif_message = f"{actor_name} has accepted the appointment for {appointment.requested_date.strftime('%Y-%m-%d %H:%M')}."
-    elif appointment.status in ["rejected", "declined", "cancelled"]:
-        notif_type = f"appointment_{appointment.status}"
-        notif_title = f"Appointment {appointment.status.capitalize()}"
-        notif_message = f"{actor_name} has {appointment.status} the appointment for {appointment.requested_date.strftime('%Y-%m-%d %H:%M')}.{note_text}"
-    
-    if target_user_id and notif_type:
-        await notification_service.create_notification(
-            user_id=target_user_id,
-            type=notif_type,
-            title=notif_title,
-            message=notif_message,
+    if appointment.status in ["rejected", "declined", "cancelled"]:
+        actor_name = _actor_name(appointment, current_user)
+        note = appointment.reschedule_note or appointment.doctor_notes or ""
+        note_text = f" Reason: \"{note}\"" if (note and len(note.strip()) > 0) else ""
+        await NotificationService(db).create_notification(
+            user_id=_other_party_id(appointment, current_user),
+            type=f"appointment_{appointment.status}",
+            title=f"Appointment {appointment.status.capitalize()}",
+            message=f"{actor_name} has {appointment.status} the appointment for {appointment.requested_date.strftime('%Y-%m-%d %H:%M')}.{note_text}",
             action_url=f"/appointments/{appointment.id}"
         )
     
     return appointment
 
 
+def _actor_name(appointment: Appointment, actor: User) -> str:
+    """How the other party sees whoever changed the appointment"""
+    from app.core.security import pii_encryption
+
+    is_patient = actor.id == appointment.patient_id
+    try:
+        name = pii_encryption.decrypt(actor.full_name)
+    except Exception:
+        name = None
+    if is_patient:
+        return name or "The patient"
+    return f"Dr. {name}" if name else "The doctor"
+
+
+def _other_party_id(appointment: Appointment, actor: User) -> UUID:
+    return appointment.doctor_id if actor.id == appointment.patient_id else appointment.patient_id
+
+
+async def _create_meet_link(appointment: Appointment) -> None:
+    """Attach a Google Meet to the appointment; a failure leaves it without a link"""
+    from app.services.google_meet_service import google_meet_service
+
+    try:
+        g_event_id, meet_link = await google_meet_service.create_meeting(**_meeting_request(appointment))
+        appointment.google_event_id = g_event_id
+        appointment.meet_link = meet_link
+    except Exception as e:
+        print(f"Failed to create Google Meet: {e}")
+
+
+def _meeting_request(appointment: Appointment) -> dict:
+    """create_meeting arguments for an appointment (doctor and patient loaded)"""
+    from app.core.security import pii_encryption
+
+    p_name = "Patient"
+    d_name = "Doctor"
+    # Decrypt names for Meet summary
+    try:
+        if appointment.patient:
+            p_name = pii_encryption.decrypt(appointment.patient.full_name)
+    except Exception:
+        pass
+    try:
+        if appointment.doctor:
+            d_name = pii_encryption.decrypt(appointment.doctor.full_name)
+    except Exception:
+        pass
+
+    attendees = []
+    if appointment.patient and appointment.patient.email:
+        attendees.append(appointment.patient.email)
+    if appointment.doctor and appointment.doctor.email:
+        attendees.append(appointment.doctor.email)
+    return {
+        "start_time": appointment.requested_date,
+        "duration_minutes": 30,
+        "summary": f"Consultation: Dr. {d_name} & {p_name}",
+        "attendees": attendees,
+    }
+
+
+async def _accept_appointment(
+    db: AsyncSession,
+    appointment: Appointment,
+    actor: User,
+    new_status: str = "accepted",
+    doctor_notes: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Accept (or complete) an appointment; shared by single and bulk accept.
+
+    Any Meet link must already be attached: an appointment whose meeting
+    could not be created is still accepted, just without one. Sets the
+    status, makes sure one Consultation exists for the doctor, patient and
+    slot, and syncs the calendar. Returns the notification for the other
+    party (create_notification keyword arguments, None if there is none) so
+    bulk accept can send them in one batch. The caller commits.
+    """
+    appointment.status = new_status
+    if doctor_notes:
+        appointment.doctor_notes = doctor_notes
+    appointment.updated_at = datetime.utcnow()
+
+    # ── ENSURE A CONSULTATION RECORD EXISTS ───────────────────────────────
+    # This makes it appear in 'Visit History' and enables SOAP reports.
+    try:
+        from app.models.consultation import Consultation
+        # Check if one already exists for this slot + doctor + patient
+        c_check = await db.execute(
+            select(Consultation.id).where(
+                and_(
+                    Consultation.doctor_id == appointment.doctor_id,
+                    Consultation.patient_id == appointment.patient_id,
+                    Consultation.scheduled_at == appointment.requested_date
+                )
+            ).limit(1)
+        )
+        if c_check.scalar_one_or_none() is None:
+            # Use hospital_id if available, fallback to doctor's org
+            org_id = appointment.hospital_id or appointment.doctor.organization_id
+            
+            linked_consultation = Consultation(
+                doctor_id=appointment.doctor_id,
+                patient_id=appointment.patient_id,
+                organization_id=org_id,
+                scheduled_at=appointment.requested_date,
+                duration_minutes=30,
+                status="completed" if new_status == "completed" else "scheduled",
+                google_event_id=appointment.google_event_id,
+                meet_link=appointment.meet_link,
+                notes=appointment.doctor_notes,
+                chief_complaint=appointment.reason,
+                visit_state="completed" if new_status == "completed" else "scheduled"
+            )
+            db.add(linked_consultation)
+            print(f"[Appointments] ✅ Automatically created linked consultation for appointment {appointment.id}")
+    except Exception as e:
+        print(f"[Appointments] ⚠ Could not auto-create linked consultation: {e}")
+    # ─────────────────────────────────────────────────────────────────────
+
+    # If it was pending and now accepted/completed, 'update' in calendar_service 
+    from app.services.calendar_service import CalendarService
+    await CalendarService(db).sync_appointment_to_calendar(appointment, "update")
+
+    if new_status != "accepted":
+        return None
+    return {
+        "user_id": _other_party_id(appointment, actor),
+        "type": "appointment_accepted",
+        "title": "Appointment Accepted",
+        "message": f"{_actor_name(appointment, actor)} has accepted the appointment for {appointment.requested_date.strftime('%Y-%m-%d %H:%M')}.",
+        "action_url": f"/appointments/{appointment.id}",
+    }
+
+
+@router.post("/bulk-accept", response_model=List[AppointmentResponse])
+async def bulk_accept_appointments(
+    bulk_in: AppointmentBulkAccept,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Doctor accepts many pending appointments at once.
+
+    Google Meet links for all of them are created with one batched Calendar
+    request. As with a single accept, an appointment whose meeting could not
+    be created is still accepted, without a link.
+    """
+    if current_user.role != "doctor":
+        raise HTTPException(status_code=403, detail="Only doctors can accept appointments")
+
+    result = await db.execute(
+        select(Appointment).options(
+            selectinload(Appointment.doctor),
+            selectinload(Appointment.patient)
+        ).where(
+            Appointment.id.in_(bulk_in.appointment_ids),
+            Appointment.doctor_id == current_user.id,
+            Appointment.status == "pending"
+        ).order_by(Appointment.requested_date)
+    )
+    appointments = result.scalars().all()
+    if not appointments:
+        raise HTTPException(status_code=404, detail="No pending appointments found")
+
+    from app.services.google_meet_service import google_meet_service
+
+    pending_meet = [appointment for appointment in appointments if not appointment.meet_link]
+    try:
+        meeting_results = await google_meet_service.create_meetings_batch(
+            [_meeting_request(appointment) for appointment in pending_meet]
+        )
+    except Exception as e:
+        print(f"[Appointments] ❌ Batched Google Meet creation failed ({type(e).__name__}): {e}")
+        meeting_results = [e] * len(pending_meet)
+
+    for appointment, meeting in zip(pending_meet, meeting_results):
+        if isinstance(meeting, Exception):
+            print(f"[Appointments] ⚠ Google Meet creation failed for appointment {appointment.id}: {meeting}")
+        else:
+            appointment.google_event_id, appointment.meet_link = meeting
+
+    notifications = []
+    for appointment in appointments:
+        notification = await _accept_appointment(
+            db, appointment, current_user, doctor_notes=bulk_in.doctor_notes
+        )
+        if notification:
+            notifications.append(notification)
+    await NotificationService(db).create_notifications_bulk(notifications)
+
+    await db.commit()
+    for appointment in appointments:
+        await db.refresh(appointment)
+
+    print(f"[Appointments] Bulk-accepted {len(appointments)} appointments for doctor {current_user.id}")
+    return appointments
+
+
 @router.post("/{appointment_id}/approve", response_model=AppointmentResponse)
 async def approve_appointment(
     appointment_id: UUID,
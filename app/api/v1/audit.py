@@ -4,15 +4,23 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user, get_organization_id, require_any_role
-from app.database import get_db
+from app.database import get_db, get_readonly_db
 from app.models.user import User
 from app.schemas.audit import AuditLogListResponse, AuditLogResponse, ComplianceReport
 from app.schemas.document import MessageResponse
-from app.services.audit_service import generate_csv_export, get_audit_logs, get_compliance_stats, log_action
+from app.services.audit_service import (
+    decode_audit_cursor,
+    encode_audit_cursor,
+    get_audit_logs,
+    get_compliance_stats,
+    log_action,
+    stream_audit_export,
+)
 from app.services.compliance_service import ComplianceService
 
 # Router 1: Audit (Admin only)
@@ -24,17 +32,33 @@ async def list_audit_logs(
     end_date: Optional[datetime] = Query(None),
     user_id: Optional[UUID] = Query(None),
     action: Optional[str] = Query(None),
-    limit: int = 100,
-    offset: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count: str = Query("estimate", pattern="^(exact|estimate|none)$", description="How to compute total"),
     current_user: User = Depends(require_any_role("admin", "hospital")),
     organization_id: UUID = Depends(get_organization_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
 ):
     """
     View audit logs (Admin only)
+
+    Paginate by passing `next_cursor` back as `cursor`. The total defaults to
+    a planner estimate; request `count=exact` when a precise number is needed.
     """
+    position = None
+    if cursor:
+        try:
+            position = decode_audit_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
     logs, total = await get_audit_logs(
-        db, organization_id, start_date, end_date, user_id, action, limit, offset
+        db, organization_id, start_date, end_date, user_id, action, limit, offset,
+        cursor=position, count=count
+    )
+    next_cursor = (
+        encode_audit_cursor(logs[-1].timestamp, logs[-1].id) if len(logs) == limit else None
     )
     
     # Audit this access! (Meta-audit)
@@ -43,32 +67,67 @@ async def list_audit_logs(
     )
     await db.commit()
     
-    return AuditLogListResponse(logs=logs, total=total)
+    return AuditLogListResponse(
+        logs=logs,
+        total=total,
+        total_is_estimate=count == "estimate" and total is not None,
+        next_cursor=next_cursor,
+    )
 
 
 @audit_router.get("/export")
 async def export_audit_logs(
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    user_id: Optional[UUID] = Query(None),
+    action: Optional[str] = Query(None),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    compress: bool = Query(False, description="gzip-compress the export"),
+    after: Optional[str] = Query(None, description="Resume cursor from a previous export"),
     current_user: User = Depends(require_any_role("admin", "hospital")),
     organization_id: UUID = Depends(get_organization_id),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Download audit logs as CSV
+    Stream audit logs as CSV or NDJSON (oldest first).
+
+    The export is produced in keyset batches and streamed, so arbitrarily
+    large date ranges run in constant memory. Pass the cursor of the last
+    received row as `after` to resume an interrupted download.
     """
-    # Fetch all recent (limit 1000 for safety in MVP)
-    logs, _ = await get_audit_logs(db, organization_id, limit=1000)
-    
-    csv_content = generate_csv_export(logs)
-    
+    resume_from = None
+    if after:
+        try:
+            resume_from = decode_audit_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid export cursor")
+
     await log_action(
-        db, current_user.id, organization_id, "export_audit_logs", "audit_log", None
+        db, current_user.id, organization_id, "export_audit_logs", "audit_log", None,
+        metadata={"format": export_format, "compress": compress, "resumed": bool(after)}
     )
     await db.commit()
-    
-    return Response(
-        content=csv_content,
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=audit_logs_{datetime.utcnow().date()}.csv"}
+
+    extension = "csv" if export_format == "csv" else "ndjson"
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"audit_logs_{datetime.utcnow().date()}.{extension}"
+    if compress:
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        stream_audit_export(
+            organization_id,
+            export_format=export_format,
+            compress=compress,
+            start_date=start_date,
+            end_date=end_date,
+            user_id=user_id,
+            action=action,
+            after=resume_from,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
@@ -76,7 +135,7 @@ async def export_audit_logs(
 async def get_stats(
     current_user: User = Depends(require_any_role("admin", "hospital")),
     organization_id: UUID = Depends(get_organization_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
 ):
     """
     Get compliance dashboard stats
@@ -31,9 +31,9 @@ from app.core.security import (
     decode_token,
     generate_password_reset_token,
     generate_verification_token,
-    hash_password,
+    hash_password_async,
     hash_token,
-    verify_password,
+    verify_and_rehash_password,
     verify_token_hash,
 )
 from app.database import get_db
@@ -69,19 +69,7 @@ from fastapi import HTTPException
 from google.oauth2 import id_token as google_id_token
 from google.auth.transport import requests as google_requests
 
-# Rate limiting
-try:
-    from slowapi import Limiter
-    from slowapi.util import get_remote_address
-    limiter = Limiter(key_func=get_remote_address)
-except ImportError:
-    # Fallback: no-op limiter if slowapi not installed
-    class NoOpLimiter:
-        def limit(self, rate_limit):
-            def decorator(func):
-                return func
-            return decorator
-    limiter = NoOpLimiter()
+from app.core.rate_limit import client_ip, hashed_identity, limiter
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -127,7 +115,7 @@ async def onboarding_signup(
         )
         
     # Hash password
-    password_hash_val = hash_password(request.password)
+    password_hash_val = await hash_password_async(request.password)
     
     # Organization handling (minimal default for onboarding phase)
     # The existing generic organization can be used or we can create one
@@ -205,7 +193,7 @@ async def onboard_doctor(
 
     # Overwrite password only if provided (social auth users may not have one)
     if request.password:
-        current_user.password_hash = hash_password(request.password)
+        current_user.password_hash = await hash_password_async(request.password)
     
     # Store phone number
     pii_encryption = PIIEncryption()
@@ -294,7 +282,7 @@ async def onboard_hospital(
         
     # Overwrite password only if provided (social auth users may not have one)
     if request.password:
-        current_user.password_hash = hash_password(request.password)
+        current_user.password_hash = await hash_password_async(request.password)
     
     # Store phone number
     pii_encryption = PIIEncryption()
@@ -737,8 +725,8 @@ async def register(
         db.add(organization)
         await db.flush()  # Get organization ID
     
-    # Hash password (Fixed: using hash_password from imports)
-    password_hash = hash_password(user_data.password)
+    # Hash password (on the bounded password pool)
+    password_hash = await hash_password_async(user_data.password)
     
     # Generate verification token
     verification_token = generate_verification_token()
@@ -915,8 +903,15 @@ async def verify_email(
     return MessageResponse(message="Email verified successfully")
 
 
+def _login_rate_key(request: Request, credentials: LoginRequest, **_) -> str:
+    # Per address and account: users behind one clinic NAT do not lock each other out
+    email = hashed_identity(credentials.email.strip().lower())
+    return f"ip:{client_ip(request.scope)}:email:{email}"
+
+
 @router.post("/login", response_model=LoginResponse | MFARequiredResponse)
-@limiter.limit("10/minute")
+@limiter.limit(f"{settings.LOGIN_IP_RATE_LIMIT_PER_MINUTE}/minute")
+@limiter.limit(f"{settings.LOGIN_RATE_LIMIT_PER_MINUTE}/minute", key=_login_rate_key)
 async def login(
     request: Request,
     credentials: LoginRequest,
@@ -967,11 +962,15 @@ async def login(
             detail="Account is not active"
         )
         
-    if not verify_password(credentials.password, user.password_hash):
+    password_ok, rehashed = await verify_and_rehash_password(credentials.password, user.password_hash)
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
+    if rehashed:
+        # Stored hash used an outdated bcrypt cost; saved with the login below
+        user.password_hash = rehashed
     
     # Check if email is verified
     if not user.email_verified:
@@ -1385,7 +1384,7 @@ async def reset_password(
         )
     
     # Update password
-    user.password_hash = hash_password(request.new_password)
+    user.password_hash = await hash_password_async(request.new_password)
     user.password_reset_token = None
     user.password_reset_expires = None
     
@@ -2705,7 +2704,7 @@ async def register_hospital(
         # 3. Create the Root Hospital Admin User
         new_admin = User(
             email=data.email,
-            password_hash=hash_password(data.password),
+            password_hash=await hash_password_async(data.password),
             full_name=pii_encryption.encrypt(data.admin_name),
             phone_number=pii_encryption.encrypt(data.phone_number) if data.phone_number else None,
             role="hospital", # Assign the root hospital role
@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.deps import get_current_user, get_organization_id
 from app.core.security import pii_encryption
 
-from app.database import get_db
+from app.database import get_db, get_readonly_db
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.services.calendar_service import CalendarService
@@ -258,7 +258,7 @@ async def delete_calendar_event(
 async def get_day_view(
     date: date,
     doctor_id: Optional[UUID] = Query(None, description="Filter by doctor ID (Hospital/Admin only)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -289,7 +289,7 @@ async def get_month_view(
     year: int = Path(..., ge=2000, le=2100, description="Year (e.g., 2024)"),
     month: int = Path(..., ge=1, le=12, description="Month (1-12)"),
     doctor_id: Optional[UUID] = Query(None, description="Filter by doctor ID (Hospital/Admin only)"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     current_user: User = Depends(get_current_user)
 ):
     """
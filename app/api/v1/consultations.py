@@ -319,6 +319,11 @@ async def update_consultation(
         metadata={"fields": list(update_data.keys())}
     )
     await db.commit()
+
+    # These fields make up the consultation's chat retrieval chunks
+    if update_data.keys() & {"diagnosis", "prescription", "soap_note"}:
+        from app.workers.tasks import index_consultation
+        index_consultation.delay(str(consultation_id))
     
     return await _consultation_to_response(consultation)
 
@@ -402,6 +407,10 @@ async def patch_soap_note(
     )
     await db.commit()
 
+    # Re-embed the edited note for chat retrieval
+    from app.workers.tasks import index_consultation
+    index_consultation.delay(str(consultation_id))
+
     return {
         "message": "SOAP note updated successfully.",
         "consultation_id": str(consultation_id),
@@ -588,6 +597,9 @@ async def generate_demo_soap(
             consultation.status = "completed"
         await db.commit()
 
+        from app.workers.tasks import index_consultation
+        index_consultation.delay(str(consultation_id))
+
         return {
             "message": "Demo SOAP note generated successfully.",
             "consultation_id": str(consultation_id),
@@ -608,12 +620,14 @@ async def get_transcript_status(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Check whether the Google Meet transcript is available in Google Drive.
+    Check whether the Google Meet transcript has been ingested.
+
+    Transcripts are pulled from Google Drive by the ingest_meeting_transcripts
+    sweep, so this is a database read only.
 
     Returns:
         { "status": "available" | "processing" | "not_found", ... }
     """
-    from app.services.google_meet_service import google_meet_service
     from app.services.consultation_service import ConsultationService
 
     service = ConsultationService(db)
@@ -653,32 +667,21 @@ async def get_transcript_status(
             "message": "No Google Meet event linked to this consultation."
         }
 
-    # Live check: try to fetch transcript from Google Drive
-    try:
-        transcript_text = await google_meet_service.get_meeting_transcript(consultation.google_event_id)
-        if transcript_text and transcript_text.strip():
-            return {
-                "status": "available",
-                "has_google_event": True,
-                "transcript_in_db": False,
-                "message": "Transcript found in Google Drive and ready for processing."
-            }
-        else:
-            return {
-                "status": "processing",
-                "has_google_event": True,
-                "transcript_in_db": False,
-                "message": "Transcript not yet available in Google Drive. Google Meet typically takes 2-5 minutes to upload it."
-            }
-    except Exception as e:
-        print(f"[transcript-status] Error checking Google Drive: {e}")
+    if consultation.ai_status == "no_transcript":
         return {
             "status": "not_found",
             "has_google_event": True,
             "transcript_in_db": False,
-            "message": f"Could not reach Google Drive: {str(e)}"
+            "message": "No transcript was captured for this meeting. Ensure Google Meet transcription is enabled."
         }
 
+    return {
+        "status": "processing",
+        "has_google_event": True,
+        "transcript_in_db": False,
+        "message": "Transcript not yet available in Google Drive. Google Meet typically takes 2-5 minutes to upload it."
+    }
+
 
 @router.post("/{consultation_id}/generate-soap")
 async def generate_soap_from_transcript(
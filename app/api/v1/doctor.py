@@ -40,6 +40,7 @@ from sqlalchemy import cast, String, or_
 import json
 import re
 from app.schemas.consultation import ConsultationSearchRow
+from app.schemas.search import ClinicalSearchResponse, ClinicalSearchResult
 
 router = APIRouter(prefix="/doctor", tags=["Doctor Dashboard"])
 
@@ -517,33 +518,42 @@ async def get_doctor_consultation_history(
 async def search_doctor_records(
     doctor_id: UUID,
     q: str = Query(..., min_length=2, description="Search term for notes, diagnosis, or prescriptions"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Search through all consultation records (SOAP Notes, Prescriptions, Diagnosis).
+
+    Uses the GIN-indexed full-text `search_vector` (prefix matching, so partial
+    words still match), ranked by relevance then date.
     """
     # 1. Security Check
     if current_user.role != "admin" and current_user.id != doctor_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
     # 2. Construct Search Query
-    search_term = f"%{q}%"
-    
+    from app.services.clinical_search_service import build_tsquery
+
+    raw_tsquery = build_tsquery(q)
+    if not raw_tsquery:
+        return []
+    tsquery = func.to_tsquery("english", raw_tsquery)
+
     stmt = (
         select(Consultation)
         .where(
             Consultation.doctor_id == doctor_id,
-            or_(
-                Consultation.diagnosis.ilike(search_term),
-                Consultation.prescription.ilike(search_term),
-                Consultation.notes.ilike(search_term),
-                # Cast JSONB SOAP note to string for text searching
-                cast(Consultation.soap_note, String).ilike(search_term) 
-            )
+            Consultation.search_vector.op("@@")(tsquery),
         )
         .options(selectinload(Consultation.patient)) # Load patient for the response name
-        .order_by(Consultation.scheduled_at.desc())
+        .order_by(
+            func.ts_rank_cd(Consultation.search_vector, tsquery).desc(),
+            Consultation.scheduled_at.desc(),
+        )
+        .offset((page - 1) * page_size)
+        .limit(page_size)
     )
     
     result = await db.execute(stmt)
@@ -571,6 +581,60 @@ async def search_doctor_records(
         
     return response
 
+
+@router.get("/{doctor_id}/clinical-search", response_model=ClinicalSearchResponse)
+async def clinical_search(
+    doctor_id: UUID,
+    q: str = Query(..., min_length=2, description="Free-text clinical query"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=50),
+    semantic: bool = Query(True, description="Also rank document passages by embedding similarity"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Hybrid search across the doctor's consultations (diagnosis, prescription,
+    notes, SOAP note) and the documents of patients they can access.
+
+    Full-text and vector results are merged with reciprocal rank fusion.
+    `total` counts fused hits over the top candidates of each retriever.
+    """
+    if current_user.role != "admin" and current_user.id != doctor_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    from app.services.clinical_search_service import ClinicalSearchService
+
+    hits, total = await ClinicalSearchService(db).search(
+        doctor_id=doctor_id, q=q, page=page, page_size=page_size, semantic=semantic
+    )
+
+    return ClinicalSearchResponse(
+        query=q,
+        page=page,
+        page_size=page_size,
+        total=total,
+        results=[
+            ClinicalSearchResult(
+                type=h.kind,
+                id=h.id,
+                score=round(h.score, 6),
+                matched_by=h.ranks,
+                patient_id=h.patient_id,
+                patient_name=h.data.get("patient_name", "Unknown"),
+                patient_mrn=h.data.get("patient_mrn"),
+                date=h.data.get("scheduled_at"),
+                snippet=h.data.get("snippet"),
+                status=h.data.get("status"),
+                diagnosis=h.data.get("diagnosis"),
+                prescription=h.data.get("prescription"),
+                file_name=h.data.get("file_name"),
+                page_number=h.data.get("page_number"),
+                chunk_id=h.data.get("chunk_id"),
+            )
+            for h in hits
+        ],
+    )
+
 @router.get("/me/dashboard", response_model=ClinicalDashboardMetrics)
 async def get_doctor_dashboard_metrics(
     db: AsyncSession = Depends(get_db),
@@ -5,7 +5,7 @@ from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.database import get_db, get_readonly_db
 from app.core.deps import get_current_user, get_current_active_user
 from app.models.user import User
 from app.schemas.doctor import DoctorSearchResponse, DoctorSearchItem
@@ -19,7 +19,7 @@ router = APIRouter(prefix="/doctors", tags=["Public Directory"])
 async def search_doctors(
     query: Optional[str] = Query(None, description="Search by doctor name"),
     specialty: Optional[str] = Query(None, description="Filter by specialty"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -89,7 +89,7 @@ async def search_global_doctor_directory(
     query: Optional[str] = Query(None, description="Search by doctor name"),
     specialty: Optional[str] = Query(None, description="Filter by specialty"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
 ):
     """
     Patient-facing Directory Search.
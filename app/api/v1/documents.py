@@ -114,6 +114,10 @@ async def upload_document(
             new_doc.file_size = os.path.getsize(local_path)
             new_doc.storage_path = storage_path
             new_doc.uploaded_at = datetime.utcnow()
+
+            # The file was replaced: its stored AI timeline no longer applies
+            from app.services.timeline_service import TimelineService
+            await TimelineService(db).invalidate(new_doc.id)
         else:
             # If ID provided but not found, create new (safe fallback)
             new_doc = Document(
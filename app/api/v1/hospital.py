@@ -6,14 +6,14 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from fastapi import BackgroundTasks
-from app.core.security import hash_password, pii_encryption
+from app.core.security import hash_password_async, pii_encryption
 from app.schemas.hospital import DoctorCreateRequest, DoctorCreateResponse, DoctorUpdateRequest, DoctorUpdateResponse
 from app.services.email import send_doctor_credentials_email
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.hospital import PatientRecordsResponse
 
 from app.core.deps import get_current_active_user, get_organization_id
-from app.database import get_db
+from app.database import get_db, get_readonly_db
 from fastapi import File, UploadFile
 from app.models.user import User, Organization
 from app.schemas.hospital import (
@@ -45,7 +45,7 @@ router = APIRouter(prefix="/hospital", tags=["Hospital Dashboard"])
 async def get_hospital_overview(
     current_user: User = Depends(get_current_active_user),
     organization_id: UUID = Depends(get_organization_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
 ):
     """
     Get the high-level overview metrics and recent activities for the hospital dashboard.
@@ -104,7 +104,7 @@ async def get_appointments_overview(
 async def get_hospital_directory(
     current_user: User = Depends(get_current_active_user),
     organization_id: UUID = Depends(get_organization_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_readonly_db),
 ):
     """
     Get the directory of all doctors and patients for the hospital.
@@ -230,7 +230,7 @@ async def create_doctor_account(
     # 5. Create the Doctor Account
     new_doctor = User(
         email=request.email.lower(),
-        password_hash=hash_password(request.password),
+        password_hash=await hash_password_async(request.password),
         full_name=pii_encryption.encrypt(request.name),
         role="doctor",
         organization_id=organization_id,
@@ -620,7 +620,7 @@ async def update_hospital_profile(
         current_user.phone_number = pii_encryption.encrypt(profile_in.phone_number) if profile_in.phone_number else None
 
     if profile_in.password:
-        current_user.password_hash = hash_password(profile_in.password)
+        current_user.password_hash = await hash_password_async(profile_in.password)
 
     await db.commit()
     return {"message": "Profile updated successfully"}
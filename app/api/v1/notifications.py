@@ -4,7 +4,7 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -25,21 +25,45 @@ router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 @router.get("", response_model=List[NotificationResponse])
 async def get_notifications(
+    response: Response,
     is_read: Optional[bool] = Query(None, description="Filter by read status"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    since: Optional[int] = Query(
+        None, ge=0, description="X-Notifications-Cursor from a previous call; returns only newer notifications"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Fetch notifications for the current user."""
+    """
+    Fetch notifications for the current user.
+
+    Served from a per-user Redis feed. The unread total is returned in the
+    `X-Unread-Count` header, and `X-Notifications-Cursor` can be passed back
+    as `since` so that polling only transfers new notifications.
+    """
     service = NotificationService(db)
-    notifications = await service.get_user_notifications(
+    feed = await service.get_feed(
         user_id=current_user.id,
         is_read=is_read,
         limit=limit,
-        offset=offset
+        offset=offset,
+        since=since
     )
-    return notifications
+    response.headers["X-Unread-Count"] = str(feed.unread_count)
+    if feed.cursor is not None:
+        response.headers["X-Notifications-Cursor"] = str(feed.cursor)
+    return feed.items
+
+
+@router.get("/unread-count", response_model=dict)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Return the number of unread notifications for the current user."""
+    service = NotificationService(db)
+    return {"unread_count": await service.get_unread_count(current_user.id)}
 
 
 @router.patch("/{notification_id}/read", response_model=dict)
@@ -335,6 +359,4 @@ async def reject_ai_access_from_notification(
 
 async def _mark_notification_read(db: AsyncSession, notification: Notification) -> None:
     """Mark a notification as read (mutates in-place, commit handled by caller)."""
-    if not notification.is_read:
-        notification.is_read = True
-        notification.updated_at = datetime.now(timezone.utc)
+    NotificationService(db).mark_loaded_as_read(notification)
@@ -3,7 +3,7 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_current_active_user, get_organization_id, require_doctor, require_role
@@ -12,6 +12,7 @@ from app.models.user import User
 from app.models.patient import Patient
 from app.schemas.patient import (
     PatientCreate,
+    PatientImportResponse,
     PatientListResponse,
     PatientOnboard,
     PatientResponse,
@@ -89,7 +90,7 @@ async def create_patient(
     Onboard a new patient by creating both User account and Patient profile.
     Requires 'doctor', 'admin', or 'hospital' role.
     """
-    from app.core.security import hash_password, PIIEncryption
+    from app.core.security import hash_password_async, PIIEncryption
     from app.models.user import User as UserModel
     from sqlalchemy import select
     
@@ -121,7 +122,7 @@ async def create_patient(
     
     new_user = UserModel(
         email=patient_in.email.lower(),
-        password_hash=hash_password(patient_in.password),
+        password_hash=await hash_password_async(patient_in.password),
         full_name=encrypted_name,
         phone_number=encrypted_phone,
         role="patient",
@@ -207,6 +208,98 @@ async def get_my_consultations(
     )
 
 
+@router.post("/imports", response_model=PatientImportResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_patients(
+    file: UploadFile = File(...),
+    current_user: User = Depends(require_role(["hospital", "admin"])),
+    organization_id: UUID = Depends(get_organization_id),
+    db: AsyncSession = Depends(get_db),
+    request: Request = None,
+):
+    """
+    Bulk-onboard patients from a CSV or NDJSON file (one patient per row/line).
+
+    Rows use the fields of a single patient creation; CSV files flatten the
+    nested ones (street, city, state, zipCode, emergencyContactName,
+    emergencyContactRelationship, emergencyContactPhone) and separate
+    allergies/medications with ";". The file is processed in the background:
+    poll GET /patients/imports/{import_id} for progress and the per-row report.
+    """
+    import asyncio
+    from uuid import uuid4
+    from app.config import settings
+    from app.models.patient_import import PatientImport
+    from app.services.minio_service import minio_service
+    from app.services.patient_import_service import IMPORT_FORMATS, import_format
+    from app.workers.tasks import import_patients as import_patients_task
+
+    file_format = import_format(file.filename or "")
+    if not file_format:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type. Upload one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    data = await file.read()
+    if not data.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The uploaded file is empty")
+
+    import_id = uuid4()
+    storage_path = f"patient-imports/{organization_id}/{import_id}.{file_format}"
+    uploaded = await asyncio.to_thread(
+        minio_service.upload_bytes, data, settings.MINIO_BUCKET_UPLOADS, storage_path,
+        file.content_type or "application/octet-stream",
+    )
+    if not uploaded:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="File storage unavailable")
+
+    job = PatientImport(
+        id=import_id,
+        organization_id=organization_id,
+        created_by=current_user.id,
+        file_name=file.filename,
+        file_format=file_format,
+        storage_path=storage_path,
+        status="pending",
+        total_rows=0,
+        processed_rows=0,
+        imported_rows=0,
+        failed_rows=0,
+        errors=[],
+    )
+    db.add(job)
+    await log_action(
+        db=db,
+        user_id=current_user.id,
+        organization_id=organization_id,
+        action="upload_import",
+        resource_type="patient",
+        resource_id=None,
+        request=request,
+        metadata={"import_id": str(import_id), "file_name": file.filename, "bytes": len(data)}
+    )
+    await db.commit()
+    await db.refresh(job)
+
+    import_patients_task.delay(str(import_id))
+    return job
+
+
+@router.get("/imports/{import_id}", response_model=PatientImportResponse)
+async def get_patient_import(
+    import_id: UUID,
+    current_user: User = Depends(require_role(["hospital", "admin"])),
+    organization_id: UUID = Depends(get_organization_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """Progress and per-row validation report of a bulk import"""
+    from app.models.patient_import import PatientImport
+
+    job = await db.get(PatientImport, import_id)
+    if not job or job.organization_id != organization_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    return job
+
+
 @router.get("/{patient_id}", response_model=PatientResponse)
 async def get_patient(
     patient_id: UUID,
@@ -1,6 +1,7 @@
+import asyncio
 import logging
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
@@ -38,6 +39,16 @@ class ConnectionManager:
             for connection in self.active_connections[organization_id][user_id]:
                 await connection.send_json(message)
                 
+    async def send_personal_messages(self, messages: List[Tuple[UUID, UUID, dict]]):
+        """Send a batch of (organization_id, user_id, message) concurrently"""
+        sends = [
+            connection.send_json(message)
+            for organization_id, user_id, message in messages
+            for connection in self.active_connections.get(organization_id, {}).get(user_id, [])
+        ]
+        if sends:
+            await asyncio.gather(*sends, return_exceptions=True)
+
     async def broadcast_to_org(self, message: dict, organization_id: UUID):
         """Broadcast message to all users in an organization"""
         if organization_id in self.active_connections:
@@ -38,6 +38,12 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # 15 minutes for security
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+
+    # Password hashing (bcrypt on a bounded thread pool, see core.security)
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Changing it rehashes users' passwords at their next login
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Waiting hashes beyond this are rejected with 503
+
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     ENCRYPTION_KEY: str  # Fernet key for PII encryption
     
@@ -46,6 +52,15 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
     DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_ECHO: bool = False             # Log every SQL statement (slow; debugging only)
+    DB_SLOW_QUERY_MS: float = 200           # Statements at least this slow go to the slow-query log
+    DB_N_PLUS_ONE_THRESHOLD: int = 10       # Same statement this often in one request is logged as N+1
+    DB_QUERY_STATS_HEADERS: bool = True     # X-DB-Query-Count / X-DB-Time-Ms response headers
+    # Read replicas (comma-separated URLs); used by get_readonly_db routes
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_REPLICA_POOL_SIZE: int = 20
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: float = 2.0
     
     # Redis
     REDIS_URL: str
@@ -86,6 +101,7 @@ class Settings(BaseSettings):
     CELERY_TASK_SERIALIZER: str = "json"
     CELERY_ACCEPT_CONTENT: str = "json"
     CELERY_TIMEZONE: str = "UTC"
+    CELERY_METRICS_PORT: int = 0  # Prometheus endpoint of each worker; 0 disables it
     
     # MFA
     MFA_ENABLED: bool = True
@@ -95,13 +111,24 @@ class Settings(BaseSettings):
     OTP_RESEND_COOLDOWN_SECONDS: int = 60
     OTP_MAX_ATTEMPTS: int = 5
     
-    # Rate Limiting
-    RATE_LIMIT_PER_MINUTE: int = 60
-    LOGIN_RATE_LIMIT_PER_MINUTE: int = 5
+    # Rate Limiting (Redis sliding windows shared by all workers)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_MINUTE: int = 60             # Per user, or per IP when anonymous
+    RATE_LIMIT_IP_PER_MINUTE: int = 600         # Per IP for authenticated traffic
+    RATE_LIMIT_ORG_PER_MINUTE: int = 3000       # Per organization
+    RATE_LIMIT_TRUST_FORWARDED: bool = False    # Key on X-Forwarded-For (only behind a trusted proxy)
+    LOGIN_RATE_LIMIT_PER_MINUTE: int = 5        # Per IP + submitted email
+    LOGIN_IP_RATE_LIMIT_PER_MINUTE: int = 30    # Per IP, any email
     
     # File Uploads
-    MAX_UPLOAD_SIZE_MB: int = 100
+    MAX_UPLOAD_SIZE_MB: int = 100       # Document uploads
+    MAX_REQUEST_BODY_MB: int = 10       # Every other request body
     ALLOWED_FILE_EXTENSIONS: str = "pdf,jpg,jpeg,png,gif,wav,mp3,m4a,webm,dicom,docx,txt"
+
+    # Bulk patient import (CSV / NDJSON, see services.patient_import_service)
+    PATIENT_IMPORT_BATCH_SIZE: int = 1000  # Rows per INSERT and progress update
+    PATIENT_IMPORT_ENCRYPT_WORKERS: int = 4  # Encryption processes per import; 1 encrypts inline
+    PATIENT_IMPORT_MAX_ERRORS: int = 1000  # Row errors kept in the import report
     
     @property
     def allowed_extensions_list(self) -> List[str]:
@@ -110,6 +137,19 @@ class Settings(BaseSettings):
     # Audit Logging
     AUDIT_LOG_ENABLED: bool = True
     AUDIT_LOG_RETENTION_DAYS: int = 2555
+    AUDIT_ROLLUP_BACKFILL_DAYS: int = 90  # Days rolled up on the first rollup run
+    
+    # Doctor availability (see services.scheduling_service)
+    SCHEDULING_SLOT_MINUTES: int = 30  # Appointment length, as on the calendar
+    SCHEDULING_WORKDAY_START_HOUR: int = 9  # Organization-local working hours
+    SCHEDULING_WORKDAY_END_HOUR: int = 17
+    SCHEDULING_WORKDAYS: str = "0,1,2,3,4"  # Monday=0
+    SCHEDULING_HORIZON_DAYS: int = 60  # How far ahead free slots are searched (and busy time cached)
+    SCHEDULING_CACHE_TTL_SECONDS: int = 300
+
+    # Notification Feed Cache
+    NOTIFICATION_FEED_SIZE: int = 200  # Newest notifications kept per user in Redis
+    NOTIFICATION_FEED_TTL_SECONDS: int = 300
     
     # Session Management
     SESSION_EXPIRY_HOURS: int = 24
@@ -146,6 +186,26 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/v1/auth/google/callback"
     GOOGLE_REFRESH_TOKEN: str = ""
+    GOOGLE_API_MAX_WORKERS: int = 8  # Threads running blocking Google API calls
+    TRANSCRIPT_WAIT_MINUTES: int = 120  # Give up on a meeting transcript after this long
+
+    # SOAP note generation (map-reduce over long transcripts)
+    SOAP_SEGMENT_CHARS: int = 12000  # ~3k tokens per transcript segment
+    SOAP_MAX_CONCURRENCY: int = 6  # Concurrent Bedrock calls per SOAP note
+
+    # AI chat context assembly (token estimates)
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 6000  # Memory + history + retrieved passages
+    CHAT_HISTORY_TOKEN_BUDGET: int = 1500  # Recent turns kept verbatim
+    CHAT_MAX_PASSAGE_TOKENS: int = 700  # Longer chunks are cut to their most relevant window
+    CHAT_MEMORY_MAX_WORDS: int = 200  # Size of the rolling session summary
+
+    # Bedrock caching
+    BEDROCK_PROMPT_CACHING: bool = True  # Mark stable chat prefixes with cache_control
+    BEDROCK_RESPONSE_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Reuse of idempotent responses
+
+    # Embedding search (see services.vector_search)
+    EMBEDDING_STORAGE_MODE: str = "vector"  # vector | halfvec | binary
+    EMBEDDING_RERANK_FACTOR: int = 4  # binary mode: candidates re-ranked per result
     APPLE_CLIENT_ID: Optional[str] = None
     APPLE_TEAM_ID: Optional[str] = None
     APPLE_KEY_ID: Optional[str] = None
@@ -0,0 +1,205 @@
+"""Statement-level database instrumentation
+
+SQLAlchemy cursor events time every statement on every engine:
+
+    per request   query count and total DB time (QueryStatsMiddleware puts
+                  them in X-DB-Query-Count / X-DB-Time-Ms headers)
+    N+1           the same statement fingerprint executed DB_N_PLUS_ONE_THRESHOLD
+                  or more times in one request is logged with its route
+    slow queries  statements slower than DB_SLOW_QUERY_MS are aggregated by
+                  fingerprint in Redis (shared by API and Celery processes):
+
+    db:slow:count       hash fingerprint -> executions
+    db:slow:total_ms    hash fingerprint -> summed duration
+    db:slow:sample      hash fingerprint -> last occurrence (statement, route, ms, at)
+    db:slow:recent      list of the latest slow statements, newest first
+
+Request-scoped state lives in a contextvar; SQLAlchemy's async greenlets run
+in the caller's context, so events see the request that issued the query.
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+
+SLOW_KEYS = ("db:slow:count", "db:slow:total_ms", "db:slow:sample")
+SLOW_RECENT_KEY = "db:slow:recent"
+SLOW_RECENT_MAX = 200
+SLOW_TTL_SECONDS = 7 * 86400      # Refreshed on every slow query; a quiet week resets the log
+MAX_STATEMENT_CHARS = 2000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|__\[POSTCOMPILE_\w+\]")  # asyncpg, psycopg2, expanding IN
+_LIST = re.compile(r"\(\s*\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so executions differing only in values compare equal"""
+    text = _STRING.sub("?", statement)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(?)", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+@dataclass
+class SlowQuery:
+    fingerprint: str
+    statement: str
+    ms: float
+    route: Optional[str]
+    at: str
+
+    def sample(self) -> dict:
+        return {"statement": self.statement, "route": self.route, "ms": round(self.ms, 1), "at": self.at}
+
+
+@dataclass
+class RequestQueryStats:
+    scope: Optional[dict] = None        # ASGI scope of the request
+    count: int = 0
+    total_ms: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    slow: List[SlowQuery] = field(default_factory=list)
+
+    @property
+    def route(self) -> Optional[str]:
+        """'GET /api/v1/patients/{patient_id}' once routed, else the raw path"""
+        if not self.scope:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope.get('method')} {getattr(route, 'path', self.scope.get('path'))}"
+
+    def repeated(self) -> Dict[str, int]:
+        """Fingerprints executed at least DB_N_PLUS_ONE_THRESHOLD times"""
+        return {fp: n for fp, n in self.statements.items() if n >= settings.DB_N_PLUS_ONE_THRESHOLD}
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = current_query_stats.get()
+    fp = None
+    if stats is not None:
+        fp = fingerprint(statement)
+        stats.count += 1
+        stats.total_ms += ms
+        stats.statements[fp] += 1
+
+    if ms >= settings.DB_SLOW_QUERY_MS:
+        slow = SlowQuery(
+            fingerprint=fp or fingerprint(statement),
+            statement=statement[:MAX_STATEMENT_CHARS],
+            ms=ms,
+            route=stats.route if stats else None,
+            at=datetime.utcnow().isoformat(),
+        )
+        if stats is not None:
+            stats.slow.append(slow)
+            _dispatch_slow(slow)
+        else:
+            record_slow_queries_sync([slow])  # Celery / scripts / background work
+
+
+def instrument_engine(sync_engine) -> None:
+    """Attach the timing events to an Engine (for async engines, pass .sync_engine)"""
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _write_slow(pipe, slow_queries: List[SlowQuery]) -> None:
+    count_key, total_key, sample_key = SLOW_KEYS
+    for slow in slow_queries:
+        pipe.hincrby(count_key, slow.fingerprint, 1)
+        pipe.hincrbyfloat(total_key, slow.fingerprint, round(slow.ms, 3))
+        pipe.hset(sample_key, slow.fingerprint, json.dumps(slow.sample()))
+        pipe.lpush(SLOW_RECENT_KEY, json.dumps({"fingerprint": slow.fingerprint, **slow.sample()}))
+    pipe.ltrim(SLOW_RECENT_KEY, 0, SLOW_RECENT_MAX - 1)
+    for key in (*SLOW_KEYS, SLOW_RECENT_KEY):
+        pipe.expire(key, SLOW_TTL_SECONDS)
+
+
+_pending_writes = set()
+
+
+def _dispatch_slow(slow: SlowQuery) -> None:
+    """Log a request's slow query in the background, off the request path"""
+    task = asyncio.get_running_loop().create_task(record_slow_queries([slow]))
+    _pending_writes.add(task)
+    task.add_done_callback(_pending_writes.discard)
+
+
+async def record_slow_queries(slow_queries: List[SlowQuery]) -> None:
+    from app.core.redis import get_redis
+
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        _write_slow(pipe, slow_queries)
+        await pipe.execute()
+    except Exception as e:
+        print(f"Slow query log write failed: {e}")
+
+
+def record_slow_queries_sync(slow_queries: List[SlowQuery]) -> None:
+    from app.core.redis import get_sync_redis
+
+    try:
+        pipe = get_sync_redis().pipeline(transaction=False)
+        _write_slow(pipe, slow_queries)
+        pipe.execute()
+    except Exception as e:
+        print(f"Slow query log write failed: {e}")
+
+
+async def slow_query_report(limit: int = 50) -> dict:
+    """Slowest fingerprints by total time, plus the most recent slow statements"""
+    from app.core.redis import get_redis
+
+    redis = get_redis()
+    count_key, total_key, sample_key = SLOW_KEYS
+    counts = await redis.hgetall(count_key)
+    totals = await redis.hgetall(total_key)
+    top = sorted(totals.items(), key=lambda item: float(item[1]), reverse=True)[:limit]
+    samples = await redis.hmget(sample_key, [fp for fp, _ in top]) if top else []
+
+    fingerprints = []
+    for (fp, total), sample in zip(top, samples):
+        calls = int(counts.get(fp, 0)) or 1
+        fingerprints.append({
+            "fingerprint": fp,
+            "calls": calls,
+            "total_ms": round(float(total), 1),
+            "avg_ms": round(float(total) / calls, 1),
+            "last": json.loads(sample) if sample else None,
+        })
+    recent = [json.loads(item) for item in await redis.lrange(SLOW_RECENT_KEY, 0, limit - 1)]
+    return {"threshold_ms": settings.DB_SLOW_QUERY_MS, "fingerprints": fingerprints, "recent": recent}
+
+
+async def reset_slow_query_log() -> None:
+    from app.core.redis import get_redis
+
+    await get_redis().delete(*SLOW_KEYS, SLOW_RECENT_KEY)
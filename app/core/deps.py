@@ -86,7 +86,11 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    
+
+    # Lets the rate-limit middleware apply the org limit to this user's next requests
+    from app.core.rate_limit import remember_user_org
+    remember_user_org(user.id, user.organization_id)
+
     return user
 
 
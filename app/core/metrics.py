@@ -0,0 +1,238 @@
+"""Prometheus metrics
+
+Everything the API and workers measure, served in the OpenMetrics text format:
+
+    API       GET /metrics (MetricsMiddleware records requests and WebSockets)
+    Celery    its own endpoint on CELERY_METRICS_PORT (see workers.celery_app)
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty,
+per-container directory (the Docker image wipes it on start): each worker
+writes its samples there and /metrics aggregates all of them. Gauges use
+"livesum" so only running workers count.
+
+Bedrock calls are measured through botocore events on the client, MinIO
+calls through an instrumented urllib3 pool, so call sites stay unchanged.
+"""
+
+import os
+import time
+from typing import Optional
+
+import urllib3
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+
+from app.config import settings
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 900, 1800)
+
+# ── HTTP / WebSocket ──────────────────────────────────────────────────────────
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to complete an HTTP request (full body sent)",
+    ["method", "route"], buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum"
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections", "Open WebSocket connections", multiprocess_mode="livesum"
+)
+
+# ── Database / password pool ──────────────────────────────────────────────────
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Connection pool usage per engine", ["engine", "state"], multiprocess_mode="livesum"
+)
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_depth", "bcrypt jobs waiting for a pool thread", multiprocess_mode="livesum"
+)
+
+# ── Celery ────────────────────────────────────────────────────────────────────
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds", "Celery task run time", ["task", "state"], buckets=_SLOW_BUCKETS
+)
+CELERY_QUEUE_DEPTH = Gauge(
+    "celery_queue_depth", "Messages waiting in a Celery queue", ["queue"], multiprocess_mode="livemostrecent"
+)
+
+# ── Bedrock ───────────────────────────────────────────────────────────────────
+BEDROCK_LATENCY = Histogram(
+    "bedrock_request_duration_seconds", "Bedrock call latency (streams: until the stream opens)",
+    ["model", "operation"], buckets=_SLOW_BUCKETS,
+)
+BEDROCK_REQUESTS = Counter(
+    "bedrock_requests_total", "Bedrock calls by outcome (ok or AWS error code)", ["model", "operation", "outcome"]
+)
+BEDROCK_TOKENS = Counter(
+    "bedrock_tokens_total", "Tokens processed by Bedrock", ["model", "kind"]
+)
+
+# ── MinIO ─────────────────────────────────────────────────────────────────────
+MINIO_LATENCY = Histogram(
+    "minio_request_duration_seconds", "MinIO request latency (until response headers)",
+    ["operation", "bucket"], buckets=_LATENCY_BUCKETS,
+)
+MINIO_ERRORS = Counter(
+    "minio_request_errors_total", "MinIO requests that failed or returned an error status", ["operation", "bucket"]
+)
+
+
+# ── Updaters ──────────────────────────────────────────────────────────────────
+
+def update_db_pool_metrics(include_async: bool = True) -> None:
+    """Snapshot pool usage of this process's engines (cheap attribute reads)"""
+    from app import database
+
+    engines = [("sync", database._sync_engine)]
+    if include_async:
+        engines.append(("primary", database.engine))
+        engines += [(replica.name, replica.engine) for replica in database.replicas]
+    for name, engine in engines:
+        pool = engine.pool
+        DB_POOL_CONNECTIONS.labels(name, "checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels(name, "checked_in").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels(name, "overflow").set(max(pool.overflow(), 0))
+        DB_POOL_CONNECTIONS.labels(name, "size").set(pool.size())
+
+
+def update_password_hash_metrics() -> None:
+    from app.core.security import password_hasher
+
+    PASSWORD_HASH_QUEUE.set(password_hasher.queue_depth)
+
+
+async def update_celery_queue_metrics() -> None:
+    """Queue lengths straight from the Redis broker"""
+    import redis.asyncio as redis
+
+    from app.workers.celery_app import celery_app
+
+    client = redis.from_url(settings.CELERY_BROKER_URL)
+    try:
+        queue = celery_app.conf.task_default_queue or "celery"
+        CELERY_QUEUE_DEPTH.labels(queue).set(await client.llen(queue))
+    except Exception as e:
+        print(f"Celery queue depth unavailable: {e}")
+    finally:
+        await client.aclose()
+
+
+def record_bedrock_tokens(model: str, usage: Optional[dict]) -> None:
+    """Count tokens from an Anthropic `usage` block (streams report usage in their events)"""
+    if not usage:
+        return
+    for field, kind in (
+        ("input_tokens", "input"),
+        ("output_tokens", "output"),
+        ("cache_read_input_tokens", "cache_read"),
+        ("cache_creation_input_tokens", "cache_write"),
+    ):
+        if usage.get(field):
+            BEDROCK_TOKENS.labels(model, kind).inc(usage[field])
+
+
+# ── Bedrock (botocore events) ─────────────────────────────────────────────────
+
+def _bedrock_params(params, context, **kwargs):
+    context["metrics_model"] = params.get("modelId", "unknown")
+    context["metrics_start"] = time.perf_counter()
+
+
+def _bedrock_done(context, model, outcome: str):
+    start = context.get("metrics_start")
+    model_id = context.get("metrics_model", "unknown")
+    if start is not None:
+        BEDROCK_LATENCY.labels(model_id, model.name).observe(time.perf_counter() - start)
+    BEDROCK_REQUESTS.labels(model_id, model.name, outcome).inc()
+
+
+def _bedrock_after_call(http_response, parsed, model, context, **kwargs):
+    error = (parsed or {}).get("Error", {}).get("Code")
+    _bedrock_done(context, model, error or "ok")
+    if error:
+        return
+    # InvokeModel reports token counts in headers; streams report them in events
+    headers = http_response.headers
+    model_id = context.get("metrics_model", "unknown")
+    for header, kind in (
+        ("x-amzn-bedrock-input-token-count", "input"),
+        ("x-amzn-bedrock-output-token-count", "output"),
+    ):
+        if headers.get(header):
+            BEDROCK_TOKENS.labels(model_id, kind).inc(int(headers[header]))
+
+
+def _bedrock_after_call_error(exception, model, context, **kwargs):
+    _bedrock_done(context, model, type(exception).__name__)
+
+
+def instrument_bedrock_client(client) -> None:
+    events = client.meta.events
+    events.register("provide-client-params.bedrock-runtime", _bedrock_params)
+    events.register("after-call.bedrock-runtime", _bedrock_after_call)
+    events.register("after-call-error.bedrock-runtime", _bedrock_after_call_error)
+
+
+# ── MinIO (urllib3 pool) ──────────────────────────────────────────────────────
+
+_MINIO_OPERATIONS = {"GET": "get", "PUT": "put", "HEAD": "stat", "DELETE": "delete", "POST": "post"}
+
+
+class InstrumentedPoolManager(urllib3.PoolManager):
+    """urllib3 pool for the Minio client that times every request"""
+
+    def urlopen(self, method, url, *args, **kwargs):
+        operation = _MINIO_OPERATIONS.get(method.upper(), method.lower())
+        path = urllib3.util.parse_url(url).path or "/"
+        bucket = path.lstrip("/").split("/", 1)[0] or "-"
+        start = time.perf_counter()
+        try:
+            response = super().urlopen(method, url, *args, **kwargs)
+        except Exception:
+            MINIO_ERRORS.labels(operation, bucket).inc()
+            raise
+        finally:
+            MINIO_LATENCY.labels(operation, bucket).observe(time.perf_counter() - start)
+        if response.status >= 400 and not (operation == "stat" and response.status == 404):
+            MINIO_ERRORS.labels(operation, bucket).inc()
+        return response
+
+
+def minio_http_client() -> InstrumentedPoolManager:
+    """Same settings as the Minio SDK's default pool"""
+    timeout = 300
+    return InstrumentedPoolManager(
+        timeout=urllib3.Timeout(connect=timeout, read=timeout),
+        maxsize=10,
+        retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def metrics_registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+async def render_metrics():
+    """(body, content type) for GET /metrics"""
+    update_db_pool_metrics()
+    update_password_hash_metrics()
+    await update_celery_queue_metrics()
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
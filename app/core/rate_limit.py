@@ -0,0 +1,243 @@
+"""Distributed rate limiting (Redis sliding windows)
+
+Every limit is a sliding-window log in Redis:
+
+    ratelimit:{scope}:{id}:{window}   sorted set of request timestamps (ms)
+
+A request is checked against all of its windows (e.g. user + IP + org) by
+one Lua script, atomically: it is admitted only if every window has room,
+and only admitted requests are recorded, so a client hammering a closed
+window does not extend its own lockout. Counters are shared by all API
+workers and survive restarts.
+
+Limits come from two places:
+    - RateLimitMiddleware (app.middleware.rate_limit) applies the global
+      RATE_LIMIT_* settings to every API request
+    - @limiter.limit("5/minute") adds a stricter per-route limit
+
+If Redis is unreachable, requests are let through (fail open).
+"""
+
+import functools
+import hashlib
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+
+from app.config import settings
+
+# KEYS: one sorted set per window
+# ARGV: now_ms, member, then (limit, window_ms) for each key
+# Returns: allowed, then (count, ms until a slot frees) for each key
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local allowed = 1
+local result = {}
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local window = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local count = redis.call('ZCARD', key)
+    local reset = window
+    if count > 0 then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        reset = tonumber(oldest[2]) + window - now
+    end
+    if count >= limit then
+        allowed = 0
+    end
+    result[#result + 1] = count
+    result[#result + 1] = reset
+end
+if allowed == 1 then
+    for i, key in ipairs(KEYS) do
+        redis.call('ZADD', key, now, member)
+        redis.call('PEXPIRE', key, tonumber(ARGV[2 + 2 * i]))
+    end
+end
+table.insert(result, 1, allowed)
+return result
+"""
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RATE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+# user_id -> (organization_id, expires_at); filled by get_current_user so the
+# middleware can apply the org limit without a database lookup
+USER_ORG_TTL_SECONDS = 300
+_user_orgs: Dict[str, Tuple[str, float]] = {}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'5/minute', '100/hour', '10/30second' -> (limit, window seconds)"""
+    match = _RATE.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate limit '{rate}'")
+    count, multiplier, period = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[period]
+
+
+def remember_user_org(user_id, organization_id) -> None:
+    if organization_id:
+        _user_orgs[str(user_id)] = (str(organization_id), time.monotonic() + USER_ORG_TTL_SECONDS)
+
+
+def user_org(user_id: str) -> Optional[str]:
+    entry = _user_orgs.get(user_id)
+    if not entry:
+        return None
+    if entry[1] < time.monotonic():
+        _user_orgs.pop(user_id, None)
+        return None
+    return entry[0]
+
+
+def client_ip(scope) -> str:
+    """Client address; X-Forwarded-For is only trusted behind a known proxy"""
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope.get("headers") or []:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def hashed_identity(value: str) -> str:
+    """Short digest of a client-supplied identity (e.g. an email), so keys hold no PII"""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class Limit:
+    scope: str          # "user" | "ip_anon" | "ip_auth" | "org" | "route:<name>"
+    identity: str
+    limit: int
+    window: int         # Seconds
+
+    @property
+    def key(self) -> str:
+        return f"ratelimit:{self.scope}:{self.identity}:{self.window}"
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int          # Seconds until the most restrictive window frees a slot
+    policy: str         # RateLimit-Policy value, e.g. "60;w=60"
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": self.policy,
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.reset)
+        return headers
+
+
+class RateLimiter:
+    """Checks requests against Redis sliding windows"""
+
+    def __init__(self):
+        self._script = None
+
+    async def hit(self, limits: List[Limit]) -> Optional[RateLimitResult]:
+        """
+        Count one request against all `limits`. Returns the state of the most
+        restrictive window, or None if limiting is disabled or Redis failed.
+        """
+        if not limits or not settings.RATE_LIMIT_ENABLED:
+            return None
+
+        from app.core.redis import get_redis
+
+        args: List = [int(time.time() * 1000), uuid.uuid4().hex]
+        for limit in limits:
+            args += [limit.limit, limit.window * 1000]
+        try:
+            client = get_redis()
+            if self._script is None:
+                self._script = client.register_script(SLIDING_WINDOW_LUA)
+            # Clients are per event loop, so pass the current one explicitly
+            raw = await self._script(keys=[limit.key for limit in limits], args=args, client=client)
+        except Exception as e:
+            print(f"Rate limiter unavailable, allowing request: {e}")
+            return None
+
+        allowed = bool(int(raw[0]))
+        tightest = None
+        for i, limit in enumerate(limits):
+            count, reset_ms = int(raw[1 + 2 * i]), int(raw[2 + 2 * i])
+            remaining = max(limit.limit - count - (1 if allowed else 0), 0)
+            candidate = RateLimitResult(
+                allowed=allowed,
+                limit=limit.limit,
+                remaining=remaining,
+                reset=max(-(-reset_ms // 1000), 1),
+                policy=f"{limit.limit};w={limit.window}",
+            )
+            if tightest is None or (candidate.remaining, -candidate.reset) < (tightest.remaining, -tightest.reset):
+                tightest = candidate
+        return tightest
+
+    def limit(self, rate: str, key: Union[str, Callable[..., str]] = "ip"):
+        """
+        Per-route limit on top of the global ones, keyed by client IP
+        ("ip"), authenticated user ("user", falling back to IP) or a
+        callable that gets the request and the endpoint's keyword
+        arguments and returns the identity:
+
+            @router.post("/login")
+            @limiter.limit("10/minute")
+            async def login(request: Request, ...):
+
+        The endpoint must take a `request: Request` argument. Stack
+        decorators to combine limits.
+        """
+        count, window = parse_rate(rate)
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                request = kwargs.get("request")
+                if not isinstance(request, Request):
+                    request = next((a for a in args if isinstance(a, Request)), None)
+                if request is None:
+                    raise RuntimeError(f"{func.__name__} needs a 'request: Request' parameter to be rate limited")
+
+                identity = None
+                if callable(key):
+                    identity = key(request, **kwargs)
+                elif key == "user":
+                    identity = getattr(request.state, "rate_limit_user", None)
+                identity = identity or f"ip:{client_ip(request.scope)}"
+
+                result = await self.hit([Limit(f"route:{func.__name__}", identity, count, window)])
+                if result is not None:
+                    # The middleware adds the tightest window's headers to the response
+                    previous = getattr(request.state, "rate_limit", None)
+                    if previous is None or result.remaining < previous.remaining:
+                        request.state.rate_limit = result
+                    if not result.allowed:
+                        raise HTTPException(
+                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Too many requests, please try again later",
+                            headers=result.headers(),
+                        )
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+limiter = RateLimiter()
@@ -0,0 +1,46 @@
+"""Shared Redis client"""
+
+import asyncio
+import weakref
+from functools import lru_cache
+
+import redis as sync_redis
+import redis.asyncio as redis
+
+from app.config import settings
+
+# redis.asyncio connections are bound to the event loop that opened them, and
+# Celery's run_async() spins up short-lived loops, so keep one client per loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_redis() -> redis.Redis:
+    """
+    Return the cache-database Redis client for the running event loop.
+
+    Must be called from within a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = redis.from_url(
+            settings.REDIS_URL,
+            db=settings.REDIS_DB_CACHE,
+            encoding="utf-8",
+            decode_responses=True,
+        )
+        _clients[loop] = client
+    return client
+
+
+@lru_cache()
+def get_sync_redis() -> sync_redis.Redis:
+    """Blocking cache-database Redis client for Celery tasks and scripts"""
+    return sync_redis.Redis.from_url(
+        settings.REDIS_URL,
+        db=settings.REDIS_DB_CACHE,
+        encoding="utf-8",
+        decode_responses=True,
+    )
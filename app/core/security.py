@@ -1,8 +1,12 @@
 """Security utilities for authentication and encryption"""
 
+import asyncio
 import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 import bcrypt
 from cryptography.fernet import Fernet
@@ -16,14 +20,14 @@ from app.config import settings
 # ==========================================
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt(rounds=12)
+    """Hash a password using bcrypt (blocking; use hash_password_async in handlers)"""
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking; use verify_password_async in handlers)"""
     try:
         if not hashed_password or not hashed_password.startswith('$2b$'):
             return False
@@ -37,6 +41,116 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a bcrypt cost other than the configured one"""
+    try:
+        return int(hashed_password.split('$')[2]) != settings.PASSWORD_BCRYPT_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+class PasswordHasherBusy(Exception):
+    """The password hashing queue is full; the caller should retry shortly"""
+
+
+class PasswordHasher:
+    """
+    Bounded thread pool for bcrypt work.
+
+    bcrypt releases the GIL, so hashing runs in parallel on the pool's
+    threads while the event loop keeps serving other requests. At most
+    `max_workers` hashes run at once and `max_queue` more may wait; beyond
+    that calls fail fast with PasswordHasherBusy (HTTP 503) instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0       # Queued + running
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_ms_total = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._pending - self._running, 0)
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += 1
+        submitted = time.monotonic()
+
+        def _timed():
+            with self._lock:
+                self._running += 1
+                self._wait_ms_total += (time.monotonic() - submitted) * 1000
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _timed)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": max(self._pending - self._running, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": round(self._wait_ms_total / self._completed, 2) if self._completed else 0.0,
+            }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the bounded password pool"""
+    return await password_hasher.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bounded password pool"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_rehash_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if it is correct but was hashed with a different
+    cost than PASSWORD_BCRYPT_ROUNDS, return a fresh hash to store.
+
+    The rehash is skipped (left for a later login) while the pool has a
+    backlog, so a cost change never doubles the work of a login storm.
+    """
+    if not await verify_password_async(plain_password, hashed_password):
+        return False, None
+    if not password_needs_rehash(hashed_password) or password_hasher.queue_depth > 0:
+        return True, None
+    try:
+        return True, await hash_password_async(plain_password)
+    except PasswordHasherBusy:
+        return True, None
+
+
 # ==========================================
 # JWT Token Management
 # ==========================================
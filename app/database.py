@@ -1,27 +1,125 @@
-"""Database Configuration and Session Management"""
+"""Database Configuration and Session Management
 
-from typing import AsyncGenerator
+Requests use the primary by default (get_db). Read-heavy routes can take
+get_readonly_db instead: their sessions send SELECTs to a read replica
+(DATABASE_REPLICA_URLS) and everything else to the primary. Once such a
+session writes, runs raw SQL or locks rows, it stays on the primary for
+the rest of its life, so it always reads its own writes. Replicas are
+only used while a background check sees them caught up to within
+DATABASE_REPLICA_MAX_LAG_SECONDS; otherwise reads fall back to the
+primary.
+"""
 
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 from app.config import settings
+from app.core.db_instrumentation import instrument_engine
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.APP_DEBUG,
+    echo=settings.DATABASE_ECHO,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_timeout=settings.DATABASE_POOL_TIMEOUT,
     pool_pre_ping=True,  # Verify connections before using
 )
+instrument_engine(engine.sync_engine)
+
+
+class Replica:
+    """A read replica engine and its last observed replication lag"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_async_engine(
+            url,
+            echo=settings.DATABASE_ECHO,
+            pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_pre_ping=True,
+        )
+        instrument_engine(self.engine.sync_engine)
+        self.lag_seconds: Optional[float] = None   # None until the first successful check
+        self.checked_at: float = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        fresh = time.monotonic() - self.checked_at < settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS * 3
+        return (
+            fresh
+            and self.lag_seconds is not None
+            and self.lag_seconds <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+        )
+
+
+replicas: List[Replica] = [
+    Replica(f"replica-{i}", url.strip())
+    for i, url in enumerate(settings.DATABASE_REPLICA_URLS.split(","), start=1)
+    if url.strip()
+]
+_replica_cycle = itertools.count()
+
+
+def _pick_replica() -> Optional[Replica]:
+    healthy = [r for r in replicas if r.healthy]
+    if not healthy:
+        return None
+    return healthy[next(_replica_cycle) % len(healthy)]
+
+
+class ReadOnlyWrapper(Executable, ClauseElement):
+    """
+    Base for read-only constructs around a statement (e.g. EXPLAIN).
+    RoutingSession routes them like the statement they wrap.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica when opened read-only
+    (info["readonly"]) and pins itself to the primary after any write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.info.get("readonly") or self.info.get("pinned_primary"):
+            return engine.sync_engine
+        while isinstance(clause, ReadOnlyWrapper):
+            clause = clause.statement
+        if self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            # Writes, raw SQL (SET LOCAL, UPDATE ...) and row locks: primary from here on
+            self.info["pinned_primary"] = True
+            return engine.sync_engine
+
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = _pick_replica()
+            if replica is None:
+                return engine.sync_engine
+            self.info["replica"] = replica  # One replica per session, for consistent reads
+        return replica.engine.sync_engine
+
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -41,6 +139,7 @@ _sync_engine = create_engine(
     max_overflow=2,
     pool_pre_ping=True,
 )
+instrument_engine(_sync_engine)
 SyncSessionLocal = sessionmaker(
     bind=_sync_engine,
     autocommit=False,
@@ -72,6 +171,80 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_readonly_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Like get_db, but SELECTs may be served by a read replica. For read-heavy
+    routes (dashboards, directories, audit queries, calendar views):
+
+        @router.get("/overview")
+        async def overview(db: AsyncSession = Depends(get_readonly_db)):
+            ...
+    """
+    async with AsyncSessionLocal(info={"readonly": True}) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+# ── Replica lag monitoring ────────────────────────────────────────────────────
+# Zero when the replica has replayed everything it received; otherwise the age
+# of the last replayed transaction
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+async def check_replicas() -> None:
+    """Refresh the replication lag of every replica"""
+    for replica in replicas:
+        try:
+            async with replica.engine.connect() as conn:
+                replica.lag_seconds = float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0)
+            replica.error = None
+        except Exception as e:
+            replica.lag_seconds = None
+            replica.error = str(e)
+            print(f"⚠️ Replica {replica.name} check failed: {e}")
+        replica.checked_at = time.monotonic()
+
+
+async def monitor_replicas() -> None:
+    """Background task (started in the app lifespan) keeping replica lag current"""
+    while True:
+        await check_replicas()
+        await asyncio.sleep(settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS)
+
+
+def _pool_stats(async_engine) -> Dict[str, int]:
+    pool = async_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def pool_stats() -> Dict[str, dict]:
+    """Connection pool usage per engine, with replica lag and health"""
+    stats = {"primary": _pool_stats(engine)}
+    for replica in replicas:
+        stats[replica.name] = {
+            **_pool_stats(replica.engine),
+            "healthy": replica.healthy,
+            "lag_seconds": replica.lag_seconds,
+            "error": replica.error,
+        }
+    return stats
+
+
 async def init_db():
     """Initialize database tables (for development only)"""
     from app import models  # Ensure all models are loaded
@@ -83,3 +256,5 @@ async def init_db():
 async def close_db():
     """Close database connections"""
     await engine.dispose()
+    for replica in replicas:
+        await replica.engine.dispose()
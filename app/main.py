@@ -5,7 +5,7 @@ from typing import Dict, Any
 
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -24,11 +24,18 @@ async def lifespan(app: FastAPI):
     if settings.APP_ENV == "development":
         await init_db()
         print("✅ Database initialized")
+
+    # Replica lag checks gate read routing; without replicas nothing runs
+    import asyncio
+    from app.database import monitor_replicas, replicas
+    replica_monitor = asyncio.create_task(monitor_replicas()) if replicas else None
     
     yield
     
     # Shutdown
     print("👋 Shutting down Saramedico Backend...")
+    if replica_monitor:
+        replica_monitor.cancel()
     await close_db()
     print("✅ Database connections closed")
 
@@ -47,10 +54,22 @@ app = FastAPI(
     redirect_slashes=False,
 )
 
-# Custom Validation Middleware
+# Per-request query counts/DB time, N+1 warnings and the slow-query log
+from app.middleware.query_stats import QueryStatsMiddleware
+app.add_middleware(QueryStatsMiddleware)
+
+# Content-Type and body size validation (pure ASGI; responses pass through untouched)
 from app.middleware.validation import ValidationMiddleware
 app.add_middleware(ValidationMiddleware)
 
+# Distributed rate limiting (outside validation, inside CORS so 429s stay readable)
+from app.middleware.rate_limit import RateLimitMiddleware
+app.add_middleware(RateLimitMiddleware)
+
+# Prometheus request metrics (outside the limiter so 429s are counted)
+from app.middleware.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
 # Configure CORS (Added last to be the outermost layer)
 import re as _re
 
@@ -73,6 +92,10 @@ app.add_middleware(
     allow_credentials=False,  # must be False when allow_origins=["*"]
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Unread-Count", "X-Notifications-Cursor",
+        "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After",
+    ],
 )
 
 # Include API routers
@@ -92,6 +115,15 @@ async def health_check() -> Dict[str, Any]:
     return await check_all_services()
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    """Prometheus/OpenMetrics scrape endpoint (all uvicorn workers aggregated)"""
+    from app.core.metrics import render_metrics
+
+    body, content_type = await render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/health/database", tags=["Health"])
 async def health_check_database(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
     """Database connectivity check"""
@@ -178,6 +210,17 @@ async def onboarding_exception_handler(request: Request, exc: OnboardingRequired
         }
     )
 
+from app.core.security import PasswordHasherBusy
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Password pool saturated: shed load instead of queueing logins indefinitely"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,53 @@
+"""Request metrics (pure ASGI)
+
+Per-route latency histograms, status counters and the in-flight gauge for
+HTTP, and the open-connection gauge for WebSockets. Routes are labelled by their
+template ("/api/v1/patients/{patient_id}"), never the raw path, so label
+cardinality stays bounded.
+"""
+
+import time
+
+from app.core import metrics
+
+
+def _route(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            metrics.WEBSOCKET_CONNECTIONS.inc()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                metrics.WEBSOCKET_CONNECTIONS.dec()
+            return
+
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.HTTP_IN_FLIGHT.dec()
+            route = _route(scope)
+            metrics.HTTP_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - start)
+            metrics.HTTP_REQUESTS.labels(scope["method"], route, str(status_code)).inc()
+            metrics.update_db_pool_metrics()
@@ -0,0 +1,38 @@
+"""Per-request database statistics (pure ASGI)
+
+Collects the statements a request runs (see app.core.db_instrumentation),
+adds X-DB-Query-Count and X-DB-Time-Ms to the response and logs requests
+that repeat a statement enough to look like an N+1 query pattern.
+"""
+
+from app.config import settings
+from app.core.db_instrumentation import RequestQueryStats, current_query_stats
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope=scope)
+        token = current_query_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and settings.DB_QUERY_STATS_HEADERS:
+                # Counted so far: a dependency's closing COMMIT may still follow
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_ms:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_query_stats.reset(token)
+            for fp, times in stats.repeated().items():
+                print(f"⚠️ Possible N+1 in {stats.route}: statement ran {times}x: {fp[:300]}")
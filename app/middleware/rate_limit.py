@@ -0,0 +1,99 @@
+"""Global rate limits for every API request (pure ASGI)
+
+Each /api request is counted, in one Redis round trip, against:
+
+    user   RATE_LIMIT_PER_MINUTE per authenticated user (from the JWT, no DB)
+    ip     RATE_LIMIT_PER_MINUTE per anonymous client, RATE_LIMIT_IP_PER_MINUTE
+           per address for authenticated traffic (clinics share NAT addresses);
+           separate windows, so signed-in staff never use up the anonymous
+           budget that login and password reset depend on
+    org    RATE_LIMIT_ORG_PER_MINUTE per organization, once the user's
+           organization is known to this worker
+
+Rejected requests get a 429 before routing, body parsing or any database
+work. Responses carry RateLimit-Limit/-Remaining/-Reset/-Policy headers for
+the tightest window, including the per-route limits of @limiter.limit.
+"""
+
+import json
+
+from app.config import settings
+from app.core.rate_limit import Limit, client_ip, limiter, user_org
+
+EXEMPT_PATHS = ("/health", "/docs", "/redoc", "/openapi.json")
+
+
+def _bearer_subject(scope):
+    """User ID of a valid access token, without touching the database"""
+    for name, value in scope.get("headers") or []:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            from app.core.security import decode_token
+
+            payload = decode_token(token.strip())
+            if payload and payload.get("type") == "access":
+                return payload.get("sub")
+            return None
+    return None
+
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith("/api")
+            or scope["path"].startswith(EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        ip = client_ip(scope)
+        user_id = _bearer_subject(scope)
+        if user_id:
+            limits = [
+                Limit("user", user_id, settings.RATE_LIMIT_PER_MINUTE, 60),
+                Limit("ip_auth", ip, settings.RATE_LIMIT_IP_PER_MINUTE, 60),
+            ]
+            org_id = user_org(user_id)
+            if org_id:
+                limits.append(Limit("org", org_id, settings.RATE_LIMIT_ORG_PER_MINUTE, 60))
+        else:
+            limits = [Limit("ip_anon", ip, settings.RATE_LIMIT_PER_MINUTE, 60)]
+
+        result = await limiter.hit(limits)
+        if result is not None and not result.allowed:
+            body = json.dumps({"detail": "Too many requests, please try again later"}).encode()
+            headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+            headers += [(k.lower().encode(), v.encode()) for k, v in result.headers().items()]
+            await send({"type": "http.response.start", "status": 429, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # Read by @limiter.limit (user-keyed route limits) and updated with its result
+        state = scope.setdefault("state", {})
+        if user_id:
+            state["rate_limit_user"] = f"user:{user_id}"
+        if result is not None:
+            state["rate_limit"] = result
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                current = state.get("rate_limit")
+                if current is not None:
+                    names = {name.lower() for name, _ in message.get("headers", [])}
+                    extra = [
+                        (k.lower().encode(), v.encode())
+                        for k, v in current.headers().items()
+                        if k.lower().encode() not in names
+                    ]
+                    message["headers"] = list(message.get("headers", [])) + extra
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,26 +1,134 @@
+"""Request validation middleware (pure ASGI)
 
-from fastapi import Request, UploadFile, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
-
-class ValidationMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # 1. Content-Type Check for POST/PUT
-        if request.method in ["POST", "PUT", "PATCH"]:
-            content_type = request.headers.get("content-type", "")
-            if not content_type:
-                 # Some requests might not have body, but let's be strict for /api/v1/ai
-                 if request.url.path.startswith("/api/v1/doctor/ai"):
-                     return JSONResponse(status_code=400, content={"detail": "Content-Type header missing"})
-            
-            # 2. Content-Length Check (Prevents oversized payloads early)
-            content_length = request.headers.get("content-length")
-            if content_length and int(content_length) > 10 * 1024 * 1024:  # 10 MB limit
-                return JSONResponse(status_code=413, content={"detail": "Request entity too large"})
-        
-        # 2. Size validation (Basic) can be done here or in Nginx. 
-        # Python middleware reading body for size is tricky as it consumes the stream.
-        # We'll rely on Starlette/FastAPI limits or specific file upload endpoints checks.
-        
-        response = await call_next(request)
-        return response
+For requests with a body (POST/PUT/PATCH):
+
+1. Content-Type must be one the API can parse: JSON, form or multipart,
+   and multipart on file upload routes. A missing Content-Type is
+   tolerated except on the AI routes.
+2. The body may not exceed the route's size limit: MAX_REQUEST_BODY_MB,
+   or MAX_UPLOAD_SIZE_MB on file upload routes. An oversized
+   Content-Length is refused up front; chunked bodies are counted as they
+   stream in and cut off with a 413 once they pass the limit.
+
+Responses are never touched, so streaming (SSE) responses go straight to
+the server with normal backpressure.
+"""
+
+import json
+import re
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+BODY_METHODS = ("POST", "PUT", "PATCH")
+ALLOWED_CONTENT_TYPES = (
+    "application/json",
+    "application/x-www-form-urlencoded",
+    "multipart/form-data",
+)
+_JSON_SUFFIX = re.compile(r"^application/[\w.+-]+\+json$")
+
+# File upload routes: (method, path pattern)
+UPLOAD_ROUTES = (
+    ("POST", re.compile(r"^/api/v1/documents/upload$")),
+    ("POST", re.compile(r"^/api/v1/doctor/medical-history$")),
+    ("POST", re.compile(r"^/api/v1/patients/imports$")),
+    ("POST", re.compile(r"^/api/v1/users/me/avatar$")),
+    ("POST", re.compile(r"^/api/v1/(hospital|admin)/settings/avatar$")),
+    ("POST", re.compile(r"^/api/v1/doctor/extract-credentials$")),
+)
+# Clinical documents and patient imports may be large; images keep the default
+LARGE_UPLOAD_ROUTES = UPLOAD_ROUTES[:3]
+
+
+def _matches(routes, method: str, path: str) -> bool:
+    return any(method == m and pattern.match(path) for m, pattern in routes)
+
+
+def body_limit(method: str, path: str) -> int:
+    """Maximum request body size in bytes for a route"""
+    if _matches(LARGE_UPLOAD_ROUTES, method, path):
+        return settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    return settings.MAX_REQUEST_BODY_MB * 1024 * 1024
+
+
+def content_type_error(method: str, path: str, content_type: str, has_body: bool):
+    """(status, detail) if the Content-Type is unacceptable for the route, else None"""
+    media_type = content_type.split(";")[0].strip().lower()
+    if not media_type:
+        if path.startswith("/api/v1/doctor/ai"):
+            return status.HTTP_400_BAD_REQUEST, "Content-Type header missing"
+        return None
+    if not has_body:
+        return None
+    if _matches(UPLOAD_ROUTES, method, path):
+        if media_type != "multipart/form-data":
+            return status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "File uploads must be sent as multipart/form-data"
+        return None
+    if media_type in ALLOWED_CONTENT_TYPES or _JSON_SUFFIX.match(media_type):
+        return None
+    return status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, f"Unsupported Content-Type '{media_type}'"
+
+
+async def _reject(send, status_code: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class ValidationMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in BODY_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        headers = {name: value for name, value in scope.get("headers") or []}
+        content_length = headers.get(b"content-length")
+        chunked = b"chunked" in headers.get(b"transfer-encoding", b"").lower()
+
+        try:
+            declared = int(content_length) if content_length is not None else None
+        except ValueError:
+            await _reject(send, status.HTTP_400_BAD_REQUEST, "Invalid Content-Length header")
+            return
+
+        error = content_type_error(
+            method,
+            path,
+            headers.get(b"content-type", b"").decode("latin-1"),
+            has_body=chunked or bool(declared),
+        )
+        if error:
+            await _reject(send, *error)
+            return
+
+        limit = body_limit(method, path)
+        if declared is not None and declared > limit:
+            await _reject(send, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Request entity too large")
+            return
+
+        received = 0
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so this becomes a 413 response
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Request entity too large",
+                    )
+            return message
+
+        await self.app(scope, receive_limited, send)
@@ -3,10 +3,13 @@
 # Import all models here to ensure they're registered with Base.metadata
 # This is required for Alembic's autogenerate feature
 
-from app.models.audit import AuditLog
+from app.models.audit import AuditDailyRollup, AuditLog
 from app.models.consultation import Consultation
 from app.models.document import Document
+from app.models.document_timeline import DocumentTimeline
+from app.models.mrn_counter import MrnCounter
 from app.models.patient import Patient
+from app.models.patient_import import PatientImport
 from app.models.task import Task
 from app.models.appointment import Appointment
 from app.models.activity_log import ActivityLog
@@ -22,11 +25,11 @@ from app.models.notification import Notification
 from app.models.doctor_status import DoctorStatus  # ← Required: creates doctor_statuses table on startup
 
 __all__ = [
-    "Organization", "User", "RefreshToken", "Patient", "AuditLog",
-    "Document", "Consultation", "Task", "Appointment", "ActivityLog",
+    "Organization", "User", "RefreshToken", "Patient", "AuditLog", "AuditDailyRollup",
+    "Document", "DocumentTimeline", "Consultation", "Task", "Appointment", "ActivityLog",
     "CalendarEvent", "RecentDoctor", "RecentPatient", "HealthMetric",
     "ChatHistory", "DataAccessGrant", "ChatSession", "ChatMessage",
-    "Notification", "DoctorStatus"
+    "Notification", "DoctorStatus", "MrnCounter", "PatientImport"
 ]
 
 
@@ -1,9 +1,9 @@
 """Audit Log Model"""
 
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, func
+from sqlalchemy import BigInteger, Date, ForeignKey, Index, LargeBinary, String, func
 from sqlalchemy.dialects.postgresql import INET, JSONB, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -38,3 +38,30 @@ class AuditLog(Base):
     # Relationships
     user = relationship("User")
     organization = relationship("Organization")
+
+    __table_args__ = (
+        # Keyset scans (exports, cursor pagination) walk (timestamp, id) per org
+        Index("ix_audit_logs_org_timestamp_id", "organization_id", "timestamp", "id"),
+    )
+
+
+class AuditDailyRollup(Base):
+    """
+    Per-organization daily audit counters for compliance reporting.
+
+    Maintained by the rollup_audit_stats Celery task. active_users_sketch is a
+    HyperLogLog sketch of the day's distinct user IDs, so distinct users over
+    any window can be estimated by merging daily sketches.
+    """
+    __tablename__ = "audit_daily_rollups"
+
+    organization_id: Mapped[UUID] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    total_events: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    phi_access_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    active_users_sketch: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
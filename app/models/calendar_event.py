@@ -1,7 +1,7 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Text, Boolean, Integer
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Text, Boolean, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -55,6 +55,12 @@ class CalendarEvent(Base):
     organization = relationship("Organization")
     appointment = relationship("Appointment", backref="calendar_events")
     task = relationship("Task", backref="calendar_events")
+
+    __table_args__ = (
+        # Range scans of one calendar or a whole organization (day/month views)
+        Index("ix_calendar_events_org_start_time", "organization_id", "start_time"),
+        Index("ix_calendar_events_user_start_time", "user_id", "start_time"),
+    )
     
     def __repr__(self):
         return f"<CalendarEvent {self.title} ({self.event_type})>"
@@ -26,6 +26,11 @@ class ChatSession(Base):
     # Metadata
     title = Column(String(255), nullable=True, default=None)  # Null until first message auto-generates it
 
+    # Rolling memory: summary of the messages up to memory_through, which are
+    # no longer sent to the model verbatim
+    memory_summary = Column(Text, nullable=True)
+    memory_through = Column(DateTime(timezone=True), nullable=True)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -4,9 +4,9 @@ import uuid
 from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import Column, ForeignKey, String, Text, Integer, Float, DateTime, Index
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy import CheckConstraint, Column, Computed, ForeignKey, String, Text, Integer, Float, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from pgvector.sqlalchemy import Vector
 
 from app.database import Base
@@ -15,24 +15,31 @@ from app.database import Base
 class Chunk(Base):
     """
     Stores processed chunks of documents for AI retrieval.
+
+    A chunk comes either from a document (document_id) or from a completed
+    consultation's SOAP note / diagnosis / prescription (consultation_id).
     """
     __tablename__ = "chunks"
 
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Relationships
-    document_id = Column(PG_UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    document_id = Column(PG_UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=True, index=True)
+    consultation_id = Column(PG_UUID(as_uuid=True), ForeignKey("consultations.id", ondelete="CASCADE"), nullable=True, index=True)
     patient_id = Column(PG_UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Chunk Content
     content = Column(Text, nullable=False)
-    source = Column(String(50), nullable=False)  # 'TIER_1_TEXT', 'TIER_3_IMAGE_ANALYSIS'
-    chunk_type = Column(String(50), nullable=False) # 'text', 'table', 'form', 'image_analysis'
+    source = Column(String(50), nullable=False)  # 'TIER_1_TEXT', 'TIER_3_IMAGE_ANALYSIS', 'SOAP_ASSESSMENT', ...
+    chunk_type = Column(String(50), nullable=False) # 'text', 'table', 'form', 'image_analysis', 'soap_note'
     page_number = Column(Integer, nullable=True)
     
     # AI Metadata
     medical_keywords = Column(JSONB, nullable=True) # List of keywords
     embedding = Column(Vector(1536), nullable=True) # Titan dimension is 1536
+    search_vector = deferred(Column(
+        TSVECTOR, Computed("to_tsvector('english', content)", persisted=True), nullable=True
+    ))  # Full-text search, maintained by Postgres
     
     # Audit
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
@@ -49,7 +56,9 @@ class Chunk(Base):
             postgresql_with={'m': 16, 'ef_construction': 64},
             postgresql_ops={'embedding': 'vector_cosine_ops'}
         ),
+        Index('ix_chunks_search_vector', 'search_vector', postgresql_using='gin'),
+        CheckConstraint('num_nonnulls(document_id, consultation_id) = 1', name='chk_chunk_origin'),
     )
 
     def __repr__(self):
-        return f"<Chunk {self.id} Doc:{self.document_id} Type:{self.chunk_type}>"
+        return f"<Chunk {self.id} Doc:{self.document_id or self.consultation_id} Type:{self.chunk_type}>"
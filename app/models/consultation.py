@@ -3,9 +3,9 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text, func
+from sqlalchemy import Boolean, Computed, DateTime, ForeignKey, Index, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -16,6 +16,16 @@ class Consultation(Base):
     Consultation model for video appointments
     """
     __tablename__ = "consultations"
+    __table_args__ = (
+        # Backs the transcript watcher sweep (see workers.tasks.ingest_meeting_transcripts)
+        Index(
+            "ix_consultations_awaiting_transcript",
+            "updated_at",
+            postgresql_where=text("ai_status = 'awaiting_transcript'"),
+        ),
+        # Full-text clinical search (see services.clinical_search_service)
+        Index("ix_consultations_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid()
@@ -47,6 +57,21 @@ class Consultation(Base):
     transcript: Mapped[str] = mapped_column(Text, nullable=True)
     soap_note: Mapped[dict] = mapped_column(JSONB, nullable=True)  # Structured SOAP note from AI
     ai_status: Mapped[str] = mapped_column(String(20), default="pending")  # pending, processing, completed, failed
+
+    # Full-text search document, maintained by Postgres on every write
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(diagnosis, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(prescription, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(chief_complaint, '')), 'B') || "
+            "setweight(jsonb_to_tsvector('english', coalesce(soap_note, '{}'::jsonb), '[\"string\"]'), 'C') || "
+            "setweight(to_tsvector('english', coalesce(notes, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+        deferred=True,
+    )
     
     # Metadata
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
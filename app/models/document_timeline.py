@@ -0,0 +1,32 @@
+"""Document Timeline Model"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.database import Base
+
+
+class DocumentTimeline(Base):
+    """
+    AI-extracted timeline of a document, computed once per document version.
+
+    document_version holds the Document.uploaded_at the events were extracted
+    from; replacing the file bumps uploaded_at and so invalidates the row.
+    status is 'pending' while a worker or request holds the generation claim
+    (claimed_at), then 'ready' or 'failed'.
+    """
+
+    __tablename__ = "document_timelines"
+
+    document_id = Column(
+        UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True
+    )
+    document_version = Column(DateTime(timezone=True), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    events = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    claimed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    generated_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<DocumentTimeline {self.document_id} {self.status}>"
@@ -0,0 +1,32 @@
+"""MRN Counter Model"""
+
+from sqlalchemy import BigInteger, Column, Integer, Sequence
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+# Hands each organization a short, never-reused code for its MRN prefix
+mrn_org_code_seq = Sequence("mrn_org_code_seq", metadata=Base.metadata)
+
+
+class MrnCounter(Base):
+    """
+    Per-organization MRN sequence (see PatientService.allocate_mrns).
+
+    next_value is the next number to hand out; allocation bumps it by the
+    block size in a single UPDATE ... RETURNING. No foreign key on purpose: the
+    row is written on its own connection, before the organization that a
+    registration is creating has been committed.
+    """
+
+    __tablename__ = "mrn_counters"
+
+    organization_id = Column(UUID(as_uuid=True), primary_key=True)
+    org_code = Column(
+        Integer, mrn_org_code_seq, server_default=mrn_org_code_seq.next_value(),
+        unique=True, nullable=False,
+    )
+    next_value = Column(BigInteger, nullable=False, server_default="1")
+
+    def __repr__(self):
+        return f"<MrnCounter {self.organization_id} {self.org_code}:{self.next_value}>"
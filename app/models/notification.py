@@ -1,14 +1,22 @@
 
+import time
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import BigInteger, Column, String, DateTime, Boolean, ForeignKey, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy import JSON
 from app.database import Base
 
+def _epoch_micros() -> int:
+    return time.time_ns() // 1000
+
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_feed_score", "user_id", "feed_score"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -30,6 +38,9 @@ class Notification(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Feed position (epoch microseconds), re-stamped as the inserting
+    # transaction commits so `since` cursors follow commit order
+    feed_score = Column(BigInteger, default=_epoch_micros, nullable=False)
 
     # Relationships
     user = relationship("User", backref="notifications")
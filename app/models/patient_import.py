@@ -0,0 +1,44 @@
+"""Patient Import Model"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from app.database import Base
+
+
+class PatientImport(Base):
+    """
+    A bulk patient import (CSV or NDJSON upload) and its progress.
+
+    The upload sits in MinIO at storage_path until the import_patients
+    Celery task has loaded it, then it is deleted. status goes
+    'pending' -> 'processing' -> 'completed' (or 'failed' when the file
+    itself could not be processed). Counters are committed after every batch,
+    so they double as the progress report; errors holds the per-row
+    validation failures ({"row", "error"}), capped at
+    PATIENT_IMPORT_MAX_ERRORS entries.
+    """
+
+    __tablename__ = "patient_imports"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
+    organization_id = Column(
+        UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    file_name = Column(String(255), nullable=False)
+    file_format = Column(String(10), nullable=False)  # csv | ndjson
+    storage_path = Column(String(500), nullable=True)
+    status = Column(String(20), nullable=False, default="pending")
+    total_rows = Column(Integer, nullable=False, default=0)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    failed_rows = Column(Integer, nullable=False, default=0)
+    errors = Column(JSONB, nullable=False, default=list)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<PatientImport {self.id} {self.status} {self.processed_rows}/{self.total_rows}>"
@@ -240,7 +240,9 @@ class AuditInsights(BaseModel):
 class AdminAuditResponse(BaseModel):
     """Composite response for the enhanced audit page"""
     logs: List[AuditLogItem]
-    insights: AuditInsights
+    insights: Optional[AuditInsights] = None  # First page only
+    next_cursor: Optional[str] = None
+
 class AdminAccountDetail(BaseModel):
     """Detailed profile data for granular admin editing"""
     id: UUID
@@ -51,7 +51,17 @@ class AppointmentApproval(BaseModel):
     appointment_time: datetime = Field(..., description="Confirmed time for the appointment")
     doctor_notes: Optional[str] = None
 
+class AppointmentBulkAccept(BaseModel):
+    appointment_ids: List[UUID] = Field(..., min_length=1, max_length=100, description="Pending appointments to accept")
+    doctor_notes: Optional[str] = None
+
 class AppointmentStatusUpdate(BaseModel):
     status: str = Field(..., pattern="^(accepted|declined|cancelled|completed|rejected|pending_hospital_approval|approved)$")
     doctor_notes: Optional[str] = None
     reschedule_note: Optional[str] = None
+
+class AvailableSlot(BaseModel):
+    doctor_id: UUID
+    department: Optional[str] = None
+    start: datetime
+    end: datetime
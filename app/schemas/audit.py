@@ -36,7 +36,9 @@ class AuditLogResponse(BaseModel):
 class AuditLogListResponse(BaseModel):
     """Schema for paginated audit logs"""
     logs: List[AuditLogResponse]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class ComplianceReport(BaseModel):
@@ -177,4 +177,28 @@ class PatientDetailResponse(BaseModel):
     last_consultation: Optional[Dict[str, Any]] = None # e.g., {"date": "2024-02-10", "diagnosis": "Flu"}
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PatientImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class PatientImportResponse(BaseModel):
+    """Bulk import status; counters advance as each batch commits"""
+    id: UUID
+    status: str
+    file_name: str
+    file_format: str
+    total_rows: int
+    processed_rows: int
+    imported_rows: int
+    failed_rows: int
+    errors: List[PatientImportRowError] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
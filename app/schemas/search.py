@@ -0,0 +1,42 @@
+"""Schemas for Clinical Search"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ClinicalSearchResult(BaseModel):
+    """One fused search hit: a consultation or a document"""
+    type: str  # 'consultation' | 'document'
+    id: UUID  # Consultation ID or document ID
+    score: float  # Reciprocal-rank-fusion score
+    matched_by: Dict[str, int]  # Retriever name -> rank in that retriever
+
+    # Patient Info
+    patient_id: UUID
+    patient_name: str
+    patient_mrn: Optional[str] = None
+
+    # Consultation date, or document upload date
+    date: Optional[datetime] = None
+    snippet: Optional[str] = None
+
+    # Consultation hits
+    status: Optional[str] = None
+    diagnosis: Optional[str] = None
+    prescription: Optional[str] = None
+
+    # Document hits
+    file_name: Optional[str] = None
+    page_number: Optional[int] = None
+    chunk_id: Optional[UUID] = None
+
+
+class ClinicalSearchResponse(BaseModel):
+    query: str
+    page: int
+    page_size: int
+    total: int
+    results: List[ClinicalSearchResult]
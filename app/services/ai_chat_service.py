@@ -1,24 +1,26 @@
 """AI Chat Service - Session-aware RAG with Medical Guardrails"""
 
 import json
-from typing import List, AsyncGenerator, Optional
+from typing import List, AsyncGenerator, Optional, Sequence
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_
 
 from app.models.chunk import Chunk
-from app.models.document import Document
 from app.models.consultation import Consultation
+from app.models.document import Document
 from app.models.user import User
 from app.services.aws_service import aws_service
+from app.services.context_assembler import ContextAssembler, ContextItem
+from app.services.vector_search import ef_search_statement, rank_by_similarity
 
 
 # ── Constants ──────────────────────────────────────────────────────────────────
 
-MAX_CHUNKS = 5           # Top-N document chunks to pass to LLM
-MAX_SOAP_NOTES = 3       # Top-N SOAP notes to include
-MAX_HISTORY_MESSAGES = 10  # Last-N messages from chat session
+# Candidate pools; the context assembler picks what fits the token budget
+CANDIDATE_CHUNKS = 20               # Vector-ranked document + SOAP note chunks
+CANDIDATE_RECENT_SOAP_NOTES = 1     # Latest notes, always offered in full
 
 # Confidence thresholds
 HIGH_CONFIDENCE_THRESHOLD = 3   # 3+ chunks → High
@@ -88,72 +90,112 @@ class AIChatService:
 
     # ── Private Helpers ────────────────────────────────────────────────────────
 
-    async def _fetch_chunk_context(
+    async def _fetch_chunk_candidates(
         self,
         patient_id: UUID,
+        query: str,
         document_id: Optional[UUID] = None,
-    ) -> tuple[List[Chunk], str]:
+        include_consultations: bool = False,
+        exclude_consultation_ids: Sequence[UUID] = (),
+    ) -> List[ContextItem]:
         """
-        Fetch top MAX_CHUNKS document chunks for RAG.
-        Returns (chunks list, formatted context string with source attribution).
+        Fetch up to CANDIDATE_CHUNKS chunks as context candidates, each
+        labelled with its source for citation.
+
+        With a document in focus, that document's chunks are taken in page
+        order. Otherwise one vector query ranks the patient's document chunks
+        (and, if `include_consultations`, indexed SOAP note chunks) by
+        similarity to the query. Documents are joined in the same query, which
+        drops deleted ones and supplies the name and upload date for citations.
         """
-        chunks = []
+
+        columns = (
+            Chunk.document_id,
+            Chunk.consultation_id,
+            Chunk.content,
+            Chunk.source,
+            Chunk.page_number,
+            Chunk.created_at,
+            Document.file_name,
+            Document.uploaded_at,
+            Consultation.scheduled_at,
+        )
+        rows = []
 
         if document_id:
             stmt = (
-                select(Chunk)
+                select(*columns)
                 .join(Document, Chunk.document_id == Document.id)
+                .outerjoin(Consultation, Chunk.consultation_id == Consultation.id)
                 .where(
                     and_(
                         Chunk.document_id == document_id,
-                        Document.deleted_at.is_(None)
+                        Document.deleted_at.is_(None),
                     )
                 )
                 .order_by(Chunk.page_number.asc())
-                .limit(MAX_CHUNKS)
+                .limit(CANDIDATE_CHUNKS)
             )
-            result = await self.db.execute(stmt)
-            chunks = result.scalars().all()
+            rows = (await self.db.execute(stmt)).all()
 
-        if not chunks:
-            stmt = (
-                select(Chunk)
-                .join(Document, Chunk.document_id == Document.id)
-                .where(
+        if not rows:
+            origin = and_(Chunk.document_id.isnot(None), Document.deleted_at.is_(None))
+            if include_consultations:
+                origin = or_(
+                    origin,
                     and_(
-                        Chunk.patient_id == patient_id,
-                        Document.deleted_at.is_(None)
-                    )
+                        Chunk.consultation_id.isnot(None),
+                        Consultation.deleted_at.is_(None),
+                        Chunk.consultation_id.notin_(exclude_consultation_ids),
+                    ),
                 )
-                .order_by(Chunk.created_at.desc())
-                .limit(MAX_CHUNKS)
-            )
-            result = await self.db.execute(stmt)
-            chunks = result.scalars().all()
-
-        if not chunks:
-            return [], ""
-
-        # Build context with source attribution for each chunk
-        parts = []
-        for c in chunks:
-            # Fetch the document name for citation
-            doc_stmt = select(Document.file_name).where(Document.id == c.document_id)
-            doc_result = await self.db.execute(doc_stmt)
-            doc_name = doc_result.scalar_one_or_none() or "Unknown Document"
-
-            parts.append(
-                f"[Source: {doc_name} | Section: {c.source} | Page: {c.page_number or 'N/A'}]\n"
-                f"{c.content}"
-            )
-
-        print(f"[AIChatService] Fetched {len(chunks)} document chunks.")
-        return chunks, "\n\n---\n\n".join(parts)
 
-    async def _fetch_soap_context(self, patient_id: UUID) -> str:
+            stmt = (
+                select(*columns)
+                .outerjoin(Document, Chunk.document_id == Document.id)
+                .outerjoin(Consultation, Chunk.consultation_id == Consultation.id)
+                .where(Chunk.patient_id == patient_id, origin)
+            )
+            query_embedding = await aws_service.generate_embeddings(query)
+            if query_embedding:
+                await self.db.execute(ef_search_statement(CANDIDATE_CHUNKS))
+                stmt = rank_by_similarity(stmt, query_embedding, CANDIDATE_CHUNKS)
+            else:
+                stmt = stmt.order_by(Chunk.created_at.desc()).limit(CANDIDATE_CHUNKS)
+            rows = (await self.db.execute(stmt)).all()
+
+        candidates = []
+        for row in rows:
+            if row.consultation_id:
+                date_str = row.scheduled_at.strftime("%Y-%m-%d") if row.scheduled_at else "Unknown date"
+                candidates.append(ContextItem(
+                    kind="soap",
+                    text=row.content,
+                    label=f"[SOAP Note — Consultation on {date_str} | Section: {row.source}]",
+                    timestamp=row.scheduled_at,
+                    ref=row,
+                ))
+                continue
+
+            doc_name = row.file_name or "Unknown Document"
+            if row.uploaded_at:
+                doc_name = f"{doc_name}, uploaded {row.uploaded_at.strftime('%Y-%m-%d')}"
+            candidates.append(ContextItem(
+                kind="chunk",
+                text=row.content,
+                label=f"[Source: {doc_name} | Section: {row.source} | Page: {row.page_number or 'N/A'}]",
+                timestamp=row.created_at,
+                ref=row,
+            ))
+
+        print(f"[AIChatService] Fetched {len(rows)} candidate chunks.")
+        return candidates
+
+    async def _fetch_soap_candidates(self, patient_id: UUID) -> List[ContextItem]:
         """
-        Fetch completed SOAP notes (up to MAX_SOAP_NOTES most recent).
-        Returns formatted string ready for inclusion in the prompt.
+        Fetch the CANDIDATE_RECENT_SOAP_NOTES most recent completed SOAP notes
+        in full, so "latest visit" questions work whatever their wording.
+        Older notes reach the prompt through the vector query instead.
         """
         stmt = (
             select(Consultation)
@@ -162,18 +204,16 @@ class AIChatService:
                     Consultation.patient_id == patient_id,
                     Consultation.ai_status == "completed",
                     Consultation.soap_note.isnot(None),
+                    Consultation.deleted_at.is_(None),
                 )
             )
             .order_by(Consultation.scheduled_at.desc())
-            .limit(MAX_SOAP_NOTES)
+            .limit(CANDIDATE_RECENT_SOAP_NOTES)
         )
         result = await self.db.execute(stmt)
         consultations = result.scalars().all()
 
-        if not consultations:
-            return ""
-
-        parts = []
+        candidates = []
         for c in consultations:
             date_str = c.scheduled_at.strftime("%Y-%m-%d") if c.scheduled_at else "Unknown date"
             soap = c.soap_note
@@ -185,19 +225,24 @@ class AIChatService:
 
             if isinstance(soap, dict):
                 formatted = (
-                    f"[SOAP Note — Consultation on {date_str}]\n"
                     f"Subjective : {soap.get('subjective', 'N/A')}\n"
                     f"Objective  : {soap.get('objective', 'N/A')}\n"
                     f"Assessment : {soap.get('assessment', 'N/A')}\n"
                     f"Plan       : {soap.get('plan', 'N/A')}"
                 )
             else:
-                formatted = f"[SOAP Note — Consultation on {date_str}]\n{soap}"
+                formatted = str(soap)
 
-            parts.append(formatted)
+            candidates.append(ContextItem(
+                kind="soap",
+                text=formatted,
+                label=f"[SOAP Note — Consultation on {date_str}]",
+                timestamp=c.scheduled_at,
+                ref=c,
+            ))
 
-        print(f"[AIChatService] Fetched {len(consultations)} SOAP note(s).")
-        return "\n\n---\n\n".join(parts)
+        print(f"[AIChatService] Fetched {len(consultations)} recent SOAP note(s).")
+        return candidates
 
     def _compute_confidence(self, chunk_count: int) -> str:
         """Determine confidence level based on retrieved context volume."""
@@ -217,14 +262,16 @@ class AIChatService:
         requesting_user: User,
         document_id: Optional[UUID] = None,
         session_history: Optional[List[dict]] = None,
+        session_memory: Optional[str] = None,
     ) -> AsyncGenerator[str, None]:
         """
         Session-aware, guardrailed RAG chat.
 
-        Context Sources (in priority order):
-        1. Document chunks (RAG vector search)
-        2. SOAP notes (clinical consultation summaries)
-        3. Session history (conversation memory)
+        Context Sources (packed by ContextAssembler within CHAT_CONTEXT_TOKEN_BUDGET):
+        1. Document and SOAP note chunks (one vector search over the patient)
+        2. The most recent SOAP note(s) in full
+        3. Session history: recent turns verbatim, older turns via the rolling
+           session_memory summary (and recalled when relevant)
 
         Returns a streaming generator of response tokens.
         Also yields a final metadata dict as the last event:
@@ -239,64 +286,91 @@ class AIChatService:
                 allow_all = True
                 print(f"[AIChatService] Cross-document permission granted via query: '{query}'")
 
-        # ── 2. Retrieve Context ──────────────────────────────────────────────
+        # ── 2. Retrieve Candidate Context ────────────────────────────────────
         effective_doc_id = None if allow_all else document_id
-        chunks, doc_context = await self._fetch_chunk_context(patient_id, effective_doc_id)
-        
         # Only fetch SOAP context if we're not focusing on a specific document (or if permission granted)
-        soap_context = ""
-        if not document_id or allow_all:
-            soap_context = await self._fetch_soap_context(patient_id)
+        use_soap = not document_id or allow_all
+
+        candidates = await self._fetch_soap_candidates(patient_id) if use_soap else []
+        candidates += await self._fetch_chunk_candidates(
+            patient_id,
+            query,
+            document_id=effective_doc_id,
+            include_consultations=use_soap,
+            exclude_consultation_ids=[c.ref.id for c in candidates],
+        )
+
+        # ── 3. Assemble Context Within the Token Budget ──────────────────────
+        from app.config import settings
+        assembler = ContextAssembler(
+            token_budget=settings.CHAT_CONTEXT_TOKEN_BUDGET,
+            history_budget=settings.CHAT_HISTORY_TOKEN_BUDGET,
+            max_passage_tokens=settings.CHAT_MAX_PASSAGE_TOKENS,
+        )
+        assembled = assembler.assemble(
+            query=query,
+            candidates=candidates,
+            history=session_history,
+            memory=session_memory or "",
+        )
+        chunk_passages = assembled.passages_of("chunk")
+        soap_passages = assembled.passages_of("soap")
+        history_passages = assembled.passages_of("history")
 
-        chunk_count = len(chunks)
+        chunk_count = len(chunk_passages)
         confidence = self._compute_confidence(chunk_count)
 
         print(
-            f"[AIChatService] Context — chunks={chunk_count}, confidence={confidence}, "
-            f"soap={'yes' if soap_context else 'no'}, "
-            f"history_msgs={len(session_history) if session_history else 0}"
+            f"[AIChatService] Context — ~{assembled.tokens} tokens, chunks={chunk_count}/"
+            f"{sum(1 for c in candidates if c.kind == 'chunk')}, soap={len(soap_passages)}, "
+            f"confidence={confidence}, history_msgs={len(assembled.history)} "
+            f"(+{len(history_passages)} recalled, memory={'yes' if assembled.memory else 'no'})"
         )
 
-        # ── 3. Determine System Prompt based on Context ──────────────────────
+        # ── 4. Determine System Prompt based on Context ──────────────────────
         if document_id and not allow_all:
             system_prompt = DOCUMENT_SPECIFIC_SYSTEM_PROMPT
         else:
             system_prompt = MEDICAL_SYSTEM_PROMPT
             
-        if not chunks and not soap_context:
+        if not chunk_passages and not soap_passages:
             system_prompt = GENERAL_MEDICAL_PROMPT
 
-        # ── 3. Build Structured Context for Prompt ───────────────────────────
+        # ── 5. Build Structured Context for Prompt ───────────────────────────
         context_sections = []
 
-        if doc_context:
+        # The session memory is not part of it: it is sent (and cached) with the
+        # system prompt, while this context changes with every question.
+        if chunk_passages:
             context_sections.append(
                 "=== PATIENT MEDICAL DOCUMENTS ===\n"
                 "The following text was extracted from the patient's uploaded medical records.\n"
                 "Use ONLY this content to answer:\n\n"
-                + doc_context
+                + "\n\n---\n\n".join(p.render() for p in chunk_passages)
             )
 
-        if soap_context:
+        if soap_passages:
             context_sections.append(
                 "=== PAST CONSULTATION SOAP NOTES ===\n"
                 "The following SOAP notes are from the patient's previous consultations:\n\n"
-                + soap_context
+                + "\n\n---\n\n".join(p.render() for p in soap_passages)
             )
 
-        context_text = "\n\n".join(context_sections)
+        if history_passages:
+            context_sections.append(
+                "=== RELEVANT EARLIER MESSAGES ===\n"
+                + "\n\n".join(p.render() for p in history_passages)
+            )
 
-        # ── 4. Build Claude Message List with History ─────────────────────────
-        messages = []
+        context_text = "\n\n".join(context_sections)
 
-        # Inject prior session history as conversation context
-        if session_history:
-            messages.extend(session_history)
+        # ── 6. Build Claude Message List with Recent History ──────────────────
+        messages = list(assembled.history)
 
         # Add the current question
         messages.append({"role": "user", "content": query})
 
-        # ── 5. Stream from Bedrock with Guardrail Prompt ──────────────────────
+        # ── 7. Stream from Bedrock with Guardrail Prompt ──────────────────────
         full_response = ""
         bedrock_failed = False
 
@@ -305,6 +379,7 @@ class AIChatService:
                 messages=messages,
                 context=context_text,
                 system_prompt_override=system_prompt,
+                memory=assembled.memory,
             ):
                 full_response += token
                 yield token
@@ -317,8 +392,8 @@ class AIChatService:
             yield FALLBACK_BEDROCK_UNAVAILABLE
             return
 
-        # ── 6. Yield Metadata (so caller can persist sources + confidence) ────
-        source_labels = [c.source for c in chunks]
+        # ── 8. Yield Metadata (so caller can persist sources + confidence) ────
+        source_labels = [p.ref.source for p in chunk_passages]
 
         # Yield structured metadata as a special final event
         import json as _json
@@ -1,11 +1,15 @@
 """Audit Log Service"""
 
+import base64
 from datetime import datetime
+from typing import AsyncIterator
 from uuid import UUID
 
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
 
+from app.database import ReadOnlyWrapper
 from app.models.audit import AuditLog
 
 
@@ -64,23 +68,17 @@ async def log_action(
     return audit_log
 
 
-async def get_audit_logs(
-    db: AsyncSession,
+def _filter_audit_query(
+    query,
     organization_id: UUID,
     start_date: datetime = None,
     end_date: datetime = None,
     user_id: UUID = None,
     action: str = None,
-    limit: int = 100,
-    offset: int = 0
-) -> (list[AuditLog], int):
-    """
-    Fetch filtered audit logs
-    """
-    from sqlalchemy import select, func, and_
-    
-    query = select(AuditLog).where(AuditLog.organization_id == organization_id)
-    
+):
+    """Apply the shared audit log filters to a select()"""
+    query = query.where(AuditLog.organization_id == organization_id)
+
     if start_date:
         query = query.where(AuditLog.timestamp >= start_date)
     if end_date:
@@ -89,18 +87,162 @@ async def get_audit_logs(
         query = query.where(AuditLog.user_id == user_id)
     if action:
         query = query.where(AuditLog.action == action)
+
+    return query
+
+
+def encode_audit_cursor(timestamp: datetime, log_id: UUID) -> str:
+    """
+    Encode a (timestamp, id) position as an opaque, URL-safe cursor
+    """
+    raw = f"{timestamp.isoformat()}|{log_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_audit_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_audit_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        timestamp, log_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), UUID(log_id)
+    except Exception as e:
+        raise ValueError(f"Invalid audit cursor: {cursor}") from e
+
+
+def apply_audit_cursor(query, cursor: tuple[datetime, UUID] | None):
+    """
+    Order a query newest-first on (timestamp, id) and continue after `cursor`.
+
+    The redundant timestamp bound keeps the predicate indexable even where
+    the planner cannot use the row comparison directly.
+    """
+    from sqlalchemy import tuple_
+
+    if cursor:
+        cursor_ts, cursor_id = cursor
+        query = query.where(
+            AuditLog.timestamp <= cursor_ts,
+            tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(cursor_ts, cursor_id),
+        )
+    return query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+
+
+class _Explain(ReadOnlyWrapper):
+    """EXPLAIN wrapper that keeps the wrapped statement's bind parameters"""
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_row_count(db: AsyncSession, query) -> int | None:
+    """
+    Estimate how many rows a query returns from planner statistics.
+
+    Costs a plan, not a scan, so it stays flat as the table grows.
+    Returns None if the estimate is unavailable. Runs in a savepoint so a
+    failure does not abort the caller's transaction.
+    """
+    import json
+
+    try:
+        async with db.begin_nested():
+            plan = (await db.execute(_Explain(query))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        print(f"Audit row estimate failed: {e}")
+        return None
+
+
+async def get_audit_logs(
+    db: AsyncSession,
+    organization_id: UUID,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    user_id: UUID = None,
+    action: str = None,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: tuple[datetime, UUID] | None = None,
+    count: str = "exact",
+) -> (list[AuditLog], int | None):
+    """
+    Fetch filtered audit logs, newest first.
+
+    Pass `cursor` (the decoded position of the last row of the previous page)
+    for keyset pagination; `offset` is only honoured without a cursor.
+    `count` selects how the total is computed: "exact" (COUNT(*)),
+    "estimate" (planner statistics) or "none".
+    """
+    from sqlalchemy import select, func
+    
+    query = _filter_audit_query(
+        select(AuditLog), organization_id, start_date, end_date, user_id, action
+    )
         
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar_one()
+    total = None
+    if count == "exact":
+        count_query = select(func.count()).select_from(query.subquery())
+        total = (await db.execute(count_query)).scalar_one()
+    elif count == "estimate":
+        total = await estimate_row_count(db, query)
     
     # Apply pagination
-    query = query.order_by(AuditLog.timestamp.desc()).limit(limit).offset(offset)
+    query = apply_audit_cursor(query, cursor).limit(limit)
+    if cursor is None and offset:
+        query = query.offset(offset)
     
     result = await db.execute(query)
     return result.scalars().all(), total
 
 
+AUDIT_EXPORT_HEADER = [
+    "Timestamp", "Action", "User ID", "Resource Type", "Resource ID",
+    "IP Address", "User Agent", "Metadata"
+]
+
+# Rows fetched per keyset round-trip while streaming an export
+AUDIT_EXPORT_BATCH_SIZE = 2000
+
+
+def _audit_csv_row(log: AuditLog) -> list:
+    return [
+        log.timestamp.isoformat(),
+        log.action,
+        str(log.user_id) if log.user_id else "System",
+        log.resource_type,
+        str(log.resource_id) if log.resource_id else "",
+        str(log.ip_address) if log.ip_address else "",
+        log.user_agent or "",
+        str(log.metadata_) if log.metadata_ else ""
+    ]
+
+
+def _audit_json_record(log: AuditLog) -> dict:
+    return {
+        "id": str(log.id),
+        "timestamp": log.timestamp.isoformat(),
+        "action": log.action,
+        "user_id": str(log.user_id) if log.user_id else None,
+        "resource_type": log.resource_type,
+        "resource_id": str(log.resource_id) if log.resource_id else None,
+        "ip_address": str(log.ip_address) if log.ip_address else None,
+        "user_agent": log.user_agent,
+        "metadata": log.metadata_,
+        "cursor": encode_audit_cursor(log.timestamp, log.id),
+    }
+
+
 def generate_csv_export(logs: list[AuditLog]) -> str:
     """
     Generate CSV string from logs
@@ -112,75 +254,282 @@ def generate_csv_export(logs: list[AuditLog]) -> str:
     writer = csv.writer(output)
     
     # Headers
-    writer.writerow([
-        "Timestamp", "Action", "User ID", "Resource Type", "Resource ID", 
-        "IP Address", "User Agent", "Metadata"
-    ])
+    writer.writerow(AUDIT_EXPORT_HEADER)
     
     for log in logs:
-        writer.writerow([
-            log.timestamp.isoformat(),
-            log.action,
-            str(log.user_id) if log.user_id else "System",
-            log.resource_type,
-            str(log.resource_id) if log.resource_id else "",
-            str(log.ip_address) if log.ip_address else "",
-            log.user_agent or "",
-            str(log.metadata_) if log.metadata_ else ""
-        ])
+        writer.writerow(_audit_csv_row(log))
         
     return output.getvalue()
 
 
+async def iter_audit_log_batches(
+    organization_id: UUID,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    user_id: UUID = None,
+    action: str = None,
+    after: tuple[datetime, UUID] | None = None,
+    batch_size: int = AUDIT_EXPORT_BATCH_SIZE,
+) -> AsyncIterator[list[AuditLog]]:
+    """
+    Yield filtered audit logs oldest-first in keyset batches on (timestamp, id).
+
+    Uses its own session so it can outlive the request dependency while a
+    StreamingResponse is being sent. The transaction is released between
+    batches, so a slow client never pins a connection or a snapshot.
+    """
+    from sqlalchemy import select, tuple_
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        while True:
+            query = _filter_audit_query(
+                select(AuditLog), organization_id, start_date, end_date, user_id, action
+            )
+            if after:
+                query = query.where(tuple_(AuditLog.timestamp, AuditLog.id) > tuple_(*after))
+            query = query.order_by(AuditLog.timestamp.asc(), AuditLog.id.asc()).limit(batch_size)
+
+            batch = (await session.execute(query)).scalars().all()
+            if not batch:
+                return
+
+            after = (batch[-1].timestamp, batch[-1].id)
+            yield batch
+
+            session.expunge_all()
+            await session.rollback()
+            if len(batch) < batch_size:
+                return
+
+
+async def stream_audit_export(
+    organization_id: UUID,
+    export_format: str = "csv",
+    compress: bool = False,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    user_id: UUID = None,
+    action: str = None,
+    after: tuple[datetime, UUID] | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream an audit export as CSV or NDJSON bytes in constant memory.
+
+    Every CSV row carries a trailing "Cursor" column (every NDJSON record a
+    "cursor" field); passing the last one back as `after` resumes an
+    interrupted export. With compress=True the stream is gzip-encoded.
+    """
+    import csv
+    import io
+    import json
+    import zlib
+
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def _emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if export_format == "csv":
+        writer.writerow(AUDIT_EXPORT_HEADER + ["Cursor"])
+        yield _emit(buffer.getvalue())
+
+    async for batch in iter_audit_log_batches(
+        organization_id, start_date, end_date, user_id, action, after=after
+    ):
+        buffer.seek(0)
+        buffer.truncate()
+        for log in batch:
+            if export_format == "csv":
+                writer.writerow(_audit_csv_row(log) + [encode_audit_cursor(log.timestamp, log.id)])
+            else:
+                buffer.write(json.dumps(_audit_json_record(log), default=str))
+                buffer.write("\n")
+        chunk = _emit(buffer.getvalue())
+        if chunk:
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
+
+
+# PHI access = view/export/download of patients/documents/consultations
+PHI_RESOURCE_TYPES = ["patient", "document", "consultation"]
+PHI_ACTIONS = ["view", "download", "export"]
+
+
+def _phi_access_clause():
+    from sqlalchemy import and_
+
+    return and_(
+        AuditLog.resource_type.in_(PHI_RESOURCE_TYPES),
+        AuditLog.action.in_(PHI_ACTIONS),
+    )
+
+
 async def get_compliance_stats(
     db: AsyncSession,
     organization_id: UUID,
     days: int = 30
 ) -> dict:
     """
-    Get compliance statistics for the last N days
+    Get compliance statistics for the last N days (today included).
+
+    Completed days are read from audit_daily_rollups (at most N rows per
+    org); every day of the window without rollup rows - normally just
+    today, but also any day a stalled rollup task missed - is aggregated
+    live from audit_logs. Distinct active users are estimated by merging
+    the daily HyperLogLog sketches with the live user IDs.
     """
-    from sqlalchemy import select, func
+    from sqlalchemy import and_, or_, select, func
     from datetime import timedelta
+    from app.models.audit import AuditDailyRollup
+    from app.utils.hyperloglog import HyperLogLog
     
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Base query
-    base_query = select(AuditLog).where(
-        AuditLog.organization_id == organization_id,
-        AuditLog.timestamp >= start_date
-    )
-    
-    # Total events
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total_events = (await db.execute(count_query)).scalar_one()
-    
-    # PHI Access (view/export/download of patients/documents)
-    # Using simple string matching on action/resource for MVP
-    phi_query = select(func.count()).select_from(AuditLog).where(
-        AuditLog.organization_id == organization_id,
-        AuditLog.timestamp >= start_date,
-        AuditLog.resource_type.in_(["patient", "document", "consultation"]),
-        AuditLog.action.in_(["view", "download", "export"])
-    )
-    phi_count = (await db.execute(phi_query)).scalar_one()
-    
-    # Active users count
-    users_query = select(func.count(func.distinct(AuditLog.user_id))).where(
+    now = datetime.utcnow()
+    today = now.date()
+    first_day = today - timedelta(days=max(days, 1) - 1)
+    start_date = datetime.combine(first_day, datetime.min.time())
+
+    # Rollups are written for all organizations of a day at once, so a day
+    # with rows for any org is complete; the rest are read live.
+    rolled_days = set((await db.execute(
+        select(AuditDailyRollup.day).where(
+            AuditDailyRollup.day >= first_day,
+            AuditDailyRollup.day < today
+        ).distinct()
+    )).scalars())
+
+    total_events = 0
+    phi_count = 0
+    sketch = None
+
+    if rolled_days:
+        rollups = (await db.execute(
+            select(
+                AuditDailyRollup.total_events,
+                AuditDailyRollup.phi_access_count,
+                AuditDailyRollup.active_users_sketch,
+            ).where(
+                AuditDailyRollup.organization_id == organization_id,
+                AuditDailyRollup.day.in_(rolled_days)
+            )
+        )).all()
+
+        sketch = HyperLogLog()
+        for row in rollups:
+            total_events += row.total_events
+            phi_count += row.phi_access_count
+            sketch.merge(HyperLogLog(registers=row.active_users_sketch))
+
+    # Live ranges: runs of consecutive days without rollups, the last one open-ended
+    live_ranges = []
+    day = first_day
+    while day <= today:
+        if day in rolled_days:
+            day += timedelta(days=1)
+            continue
+        run_start = day
+        while day <= today and day not in rolled_days:
+            day += timedelta(days=1)
+        range_start = AuditLog.timestamp >= datetime.combine(run_start, datetime.min.time())
+        if day > today:
+            live_ranges.append(range_start)
+        else:
+            live_ranges.append(and_(range_start, AuditLog.timestamp < datetime.combine(day, datetime.min.time())))
+
+    live_filter = (
         AuditLog.organization_id == organization_id,
-        AuditLog.timestamp >= start_date
+        or_(*live_ranges)
     )
-    users_count = (await db.execute(users_query)).scalar_one()
+    live_query = select(
+        func.count(),
+        func.count().filter(_phi_access_clause()),
+    ).where(*live_filter)
+    live_total, live_phi = (await db.execute(live_query)).one()
+    total_events += live_total
+    phi_count += live_phi
+
+    if sketch is None:
+        users_query = select(func.count(func.distinct(AuditLog.user_id))).where(*live_filter)
+        users_count = (await db.execute(users_query)).scalar_one()
+    else:
+        live_users = await db.execute(
+            select(AuditLog.user_id).where(*live_filter, AuditLog.user_id.isnot(None)).distinct()
+        )
+        for user_id in live_users.scalars():
+            sketch.add(user_id)
+        users_count = sketch.count()
     
     return {
         "period_start": start_date,
-        "period_end": datetime.utcnow(),
+        "period_end": now,
         "total_events": total_events,
         "phi_access_count": phi_count,
         "users_active_count": users_count
     }
 
 
+def rollup_audit_day(db, day) -> int:
+    """
+    Recompute the audit_daily_rollups rows of every organization for `day`.
+
+    Takes a synchronous Session (Celery). Idempotent, so days that may still
+    receive late audit writes can safely be rolled up again.
+
+    Returns:
+        Number of organization rows written
+    """
+    from datetime import timedelta
+    from sqlalchemy import delete, func, insert, select
+    from app.models.audit import AuditDailyRollup
+    from app.utils.hyperloglog import HyperLogLog
+
+    day_start = datetime.combine(day, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+    in_day = (
+        AuditLog.organization_id.isnot(None),
+        AuditLog.timestamp >= day_start,
+        AuditLog.timestamp < day_end,
+    )
+
+    counts = db.execute(
+        select(
+            AuditLog.organization_id,
+            func.count(),
+            func.count().filter(_phi_access_clause()),
+        ).where(*in_day).group_by(AuditLog.organization_id)
+    ).all()
+
+    sketches: dict[UUID, HyperLogLog] = {}
+    user_rows = db.execute(
+        select(AuditLog.organization_id, AuditLog.user_id)
+        .where(*in_day, AuditLog.user_id.isnot(None))
+        .distinct()
+    )
+    for org_id, user_id in user_rows:
+        sketches.setdefault(org_id, HyperLogLog()).add(user_id)
+
+    db.execute(delete(AuditDailyRollup).where(AuditDailyRollup.day == day))
+    if counts:
+        db.execute(insert(AuditDailyRollup), [
+            {
+                "organization_id": org_id,
+                "day": day,
+                "total_events": total,
+                "phi_access_count": phi,
+                "active_users_sketch": sketches.get(org_id, HyperLogLog()).to_bytes(),
+            }
+            for org_id, total, phi in counts
+        ])
+    db.commit()
+    return len(counts)
+
+
 class AuditService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -1,13 +1,150 @@
 """AWS Service - Handles interactions with AWS Textract, Bedrock, and S3"""
 
+import asyncio
 import boto3
 import json
 import os
+import re
 import base64
 from typing import List, Dict, Any, Optional
 from botocore.exceptions import ClientError
 from fastapi import HTTPException
 
+
+SOAP_SYSTEM_PROMPT = (
+    "You are 'SaraMedico Clinical Scribe,' an expert medical documentation assistant. "
+    "Your task is to transform a doctor-patient consultation transcript into a highly precise, "
+    "professional SOAP note. Use standard medical terminology.\n\n"
+    "SECTION GUIDELINES:\n"
+    "- Subjective: Record the patient's chief complaint, history of present illness (HPI), "
+    "onset, duration, and any symptoms reported. Use phrases like 'Patient reports...' or 'Patient describes...'.\n"
+    "- Objective: Document observable data mentioned: vital signs, physical exam findings, "
+    "lab/imaging results, and general appearance. If none mentioned, state 'Visual exam consistent with history'.\n"
+    "- Assessment: Synthesize a clinical impression or diagnosis based on the encounter. "
+    "Include differential diagnoses if discussed.\n"
+    "- Plan: Detail the actionable next steps: medications (name, dose, frequency), "
+    "diagnostic tests ordered, lifestyle advice, and follow-up timing.\n"
+    "- Patient Summary: A concise, empathetic summary of the visit written in simple, non-clinical language "
+    "intended for the patient to understand their health status and next steps.\n\n"
+    "STRICT CONSTRAINTS:\n"
+    "1. Output ONLY a raw JSON object. No markdown blocks, no commentary.\n"
+    "2. Keys MUST be: 'subjective', 'objective', 'assessment', 'plan', 'patient_summary'.\n"
+    "3. Do NOT hallucinate data. If a section has no evidence, summarize as 'No data provided in transcript'.\n"
+    "4. Language for SOAP sections must be clinical and concise. Language for 'patient_summary' must be layperson-friendly.\n"
+)
+
+SOAP_SEGMENT_SYSTEM_PROMPT = (
+    "You are 'SaraMedico Clinical Scribe.' You will receive ONE segment of a longer "
+    "doctor-patient consultation transcript. Extract only the clinically relevant findings "
+    "stated in this segment; another step will combine all segments into a SOAP note.\n\n"
+    "STRICT CONSTRAINTS:\n"
+    "1. Output ONLY a raw JSON object. No markdown blocks, no commentary.\n"
+    "2. Keys MUST be: 'subjective', 'objective', 'assessment', 'plan', each a list of short "
+    "factual statements (empty list if the segment has none).\n"
+    "3. Do NOT hallucinate data or infer beyond what is said in the segment.\n"
+)
+
+# "Dr. Smith:", "Patient:", "Speaker 2:" ... at the start of a line begins a new turn
+_SPEAKER_TURN = re.compile(r"^\s*[\w .'()\[\]-]{1,40}:\s")
+
+
+def _split_long_turn(turn: str, max_chars: int) -> List[str]:
+    """Lines of an over-long turn, with lines over max_chars broken at the last space that fits."""
+    pieces: List[str] = []
+    for line in turn.splitlines():
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars  # One unbroken word longer than a segment
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip()
+        pieces.append(line)
+    return pieces
+
+
+def segment_transcript(transcript: str, max_chars: int) -> List[str]:
+    """
+    Split a transcript into segments of at most ~max_chars, breaking only
+    between speaker turns. A single turn longer than max_chars is split on
+    line boundaries instead, and a line that is still too long on whitespace.
+    """
+    turns: List[str] = []
+    for line in transcript.splitlines():
+        if turns and not _SPEAKER_TURN.match(line):
+            turns[-1] += "\n" + line  # Continuation of the previous speaker's turn
+        else:
+            turns.append(line)
+
+    segments: List[str] = []
+    current = ""
+    for turn in turns:
+        pieces = [turn]
+        if len(turn) > max_chars:
+            pieces = _split_long_turn(turn, max_chars)
+        for piece in pieces:
+            if current and len(current) + len(piece) + 1 > max_chars:
+                segments.append(current)
+                current = ""
+            current = f"{current}\n{piece}" if current else piece
+    if current.strip():
+        segments.append(current)
+    return segments
+
+def build_chat_request(
+    system_prompt: str,
+    messages: List[Dict[str, str]],
+    context: str = "",
+    memory: str = "",
+    prompt_caching: bool = True,
+) -> Dict[str, Any]:
+    """
+    Bedrock request body for a chat turn, laid out for prompt caching.
+
+    The cached prefix is the system prompt, then the rolling session memory,
+    then the history before the newest question, with a cache breakpoint
+    after each. The retrieved context changes with every question, so it goes
+    into the newest user turn, after the last breakpoint.
+    """
+    formatted = [
+        {"role": "assistant" if m["role"] in ("ai", "assistant") else "user", "content": m["content"]}
+        for m in messages
+    ]
+    history, question = formatted[:-1], formatted[-1]
+
+    system_blocks = [{"type": "text", "text": system_prompt}]
+    if memory:
+        system_blocks.append({
+            "type": "text",
+            "text": "--- CONVERSATION MEMORY ---\n"
+                    "Summary of the earlier part of this chat session:\n\n" + memory,
+        })
+
+    question_blocks = []
+    if context:
+        question_blocks.append({
+            "type": "text",
+            "text": f"--- PATIENT MEDICAL CONTEXT ---\n{context}\n--- END OF CONTEXT ---",
+        })
+    question_blocks.append({"type": "text", "text": question["content"]})
+
+    if prompt_caching:
+        for block in system_blocks:
+            block["cache_control"] = {"type": "ephemeral"}
+        if history:
+            tail = history[-1]
+            history = [*history[:-1], {
+                "role": tail["role"],
+                "content": [{"type": "text", "text": tail["content"], "cache_control": {"type": "ephemeral"}}],
+            }]
+
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 2048,
+        "system": system_blocks,
+        "messages": [*history, {"role": question["role"], "content": question_blocks}],
+    }
+
+
 class AWSService:
     def __init__(self):
         self.region_name = os.getenv("AWS_REGION", "us-east-1")
@@ -17,6 +154,9 @@ class AWSService:
         self.model_id = os.getenv("BEDROCK_MODEL_ID", "us.anthropic.claude-3-5-sonnet-20241022-v2:0")
         print(f"[AWSService] Using Bedrock Model ID: {self.model_id}")
 
+        from app.config import settings
+        self._prompt_caching_enabled = settings.BEDROCK_PROMPT_CACHING
+
         
         if not self.access_key or not self.secret_key:
 
@@ -24,27 +164,58 @@ class AWSService:
             pass
 
     def _get_client(self, service_name: str):
-        return boto3.client(
+        client = boto3.client(
             service_name,
             region_name=self.region_name,
             aws_access_key_id=self.access_key,
             aws_secret_access_key=self.secret_key
         )
+        if service_name == "bedrock-runtime":
+            from app.core.metrics import instrument_bedrock_client
+            instrument_bedrock_client(client)
+        return client
+
+    async def invoke_cached(self, body: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        """
+        Invoke the Bedrock model for an idempotent request, reusing the stored
+        response of an identical earlier request (same model, same body).
+
+        `kind` labels the call in the cache hit-rate counters (e.g. "timeline").
+        Returns the parsed response body. Errors from Bedrock propagate.
+        """
+        from app.services.bedrock_cache import bedrock_cache, canonical_body
+
+        body_json = canonical_body(body)
+        key = bedrock_cache.key_for(self.model_id, body_json)
+
+        cached = await bedrock_cache.get(key)
+        if cached is not None:
+            await bedrock_cache.record(kind, hit=True)
+            return cached
+
+        client = self._get_client("bedrock-runtime")
+        response = await asyncio.to_thread(client.invoke_model, modelId=self.model_id, body=body_json)
+        response_body = json.loads(response.get('body').read())
+
+        await bedrock_cache.record(kind, hit=False, usage=response_body.get("usage"))
+        await bedrock_cache.set(key, response_body)
+        return response_body
 
     async def generate_chat_stream(
         self,
         messages: List[Dict[str, str]],
         context: str,
         system_prompt_override: Optional[str] = None,
+        memory: str = "",
     ):
         """
         Streaming generator for chat responses.
 
         Args:
-            messages: Claude-formatted message list [{role, content}]
-            context: Medical context text appended to the system prompt
+            messages: Claude-formatted message list [{role, content}], newest question last
+            context: Retrieved medical context for the newest question
             system_prompt_override: If provided, replaces the default system prompt entirely.
-                                    The context is still appended at the end.
+            memory: Rolling summary of the earlier session (cached with the system prompt)
         """
         client = self._get_client("bedrock-runtime")
 
@@ -54,34 +225,50 @@ class AWSService:
         else:
             system_prompt = "You are a helpful medical assistant. Use the provided context to answer questions accurately."
 
-        if context:
-            system_prompt += f"\n\n--- PATIENT MEDICAL CONTEXT ---\n{context}\n--- END OF CONTEXT ---"
+        def _build_body(prompt_caching: bool) -> str:
+            return json.dumps(build_chat_request(system_prompt, messages, context, memory, prompt_caching))
 
-        # Format messages for Claude (normalize roles)
-        formatted_messages = []
-        for m in messages:
-            role = "assistant" if m["role"] in ("ai", "assistant") else "user"
-            formatted_messages.append({"role": role, "content": m["content"]})
-            
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2048,
-            "system": system_prompt,
-            "messages": formatted_messages
-        })
+        from app.core.metrics import record_bedrock_tokens
+        from app.services.bedrock_cache import bedrock_cache
 
         try:
-            response = client.invoke_model_with_response_stream(
-                modelId=self.model_id, 
-                body=body
-            )
+            prompt_caching = self._prompt_caching_enabled
+            try:
+                response = await asyncio.to_thread(
+                    client.invoke_model_with_response_stream,
+                    modelId=self.model_id,
+                    body=_build_body(prompt_caching)
+                )
+            except ClientError as e:
+                error = e.response.get("Error", {})
+                if not prompt_caching or error.get("Code") != "ValidationException":
+                    raise
+                if "cache_control" in (error.get("Message") or ""):
+                    # Model/region without prompt caching support: stop sending cache_control
+                    print(f"[AWSService] Prompt caching rejected by Bedrock, disabling it: {e}")
+                    self._prompt_caching_enabled = False
+                else:
+                    # Maybe unrelated to caching: retry this request once without it
+                    print(f"[AWSService] Bedrock rejected the request, retrying without prompt caching: {e}")
+                response = await asyncio.to_thread(
+                    client.invoke_model_with_response_stream,
+                    modelId=self.model_id,
+                    body=_build_body(False)
+                )
             stream = response.get('body')
             if stream:
                 for event in stream:
                     chunk = event.get('chunk')
                     if chunk:
                         chunk_json = json.loads(chunk.get('bytes').decode())
-                        if chunk_json.get('type') == 'content_block_delta':
+                        if chunk_json.get('type') == 'message_start':
+                            usage = chunk_json.get('message', {}).get('usage') or {}
+                            # Output tokens are reported by the closing message_delta
+                            record_bedrock_tokens(self.model_id, {k: v for k, v in usage.items() if k != 'output_tokens'})
+                            await bedrock_cache.record("chat", usage=usage)
+                        elif chunk_json.get('type') == 'message_delta':
+                            record_bedrock_tokens(self.model_id, chunk_json.get('usage'))
+                        elif chunk_json.get('type') == 'content_block_delta':
                             yield chunk_json['delta']['text']
         except Exception as e:
             # Fallback: show that context was received even if Bedrock is not configured
@@ -100,8 +287,6 @@ class AWSService:
         """
         Use Claude Vision via Bedrock to extract structured credentials from a certificate image.
         """
-        client = self._get_client("bedrock-runtime")
-        
         system_prompt = """You are an OCR and document information extraction system.
 Your job is to analyze a medical certificate image and extract structured information.
 The document may contain multiple languages including English and Marathi.
@@ -153,19 +338,16 @@ Expected JSON format:
             ]
         }
         
-        body = json.dumps({
+        body = {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": 1024,
             "system": system_prompt,
             "messages": [message]
-        })
+        }
         
         try:
-            response = client.invoke_model(
-                modelId=self.model_id, 
-                body=body
-            )
-            resp_body = json.loads(response.get('body').read().decode())
+            # The same certificate is often re-uploaded during onboarding
+            resp_body = await self.invoke_cached(body, kind="credentials")
             text_resp = resp_body['content'][0]['text']
             
             # Extract JSON block
@@ -262,13 +444,13 @@ Expected JSON format:
         except ClientError as e:
              raise HTTPException(status_code=500, detail=f"Bedrock analysis failed: {str(e)}")
 
-    async def generate_text(self, prompt: str) -> str:
+    async def generate_text(self, prompt: str, cache_kind: Optional[str] = None) -> str:
         """
         Generates text using Bedrock (Claude).
+
+        Pass `cache_kind` for idempotent prompts to reuse earlier responses.
         """
-        client = self._get_client("bedrock-runtime")
-        
-        body = json.dumps({
+        body = {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": 2048,
             "messages": [
@@ -277,33 +459,84 @@ Expected JSON format:
                     "content": prompt
                 }
             ]
-        })
+        }
 
         try:
-            response = client.invoke_model(
-                modelId=self.model_id, 
-                body=body
-            )
-            response_body = json.loads(response.get('body').read())
+            if cache_kind:
+                response_body = await self.invoke_cached(body, kind=cache_kind)
+            else:
+                client = self._get_client("bedrock-runtime")
+                response = await asyncio.to_thread(client.invoke_model, modelId=self.model_id, body=json.dumps(body))
+                response_body = json.loads(response.get('body').read())
             return response_body['content'][0]['text']
         except ClientError as e:
              # Fallback
              print(f"Bedrock generation failed: {e}")
              return "I apologize, but I am unable to generate a response at this time."
 
+    async def _invoke_json(self, client, system_prompt: str, user_message: str, max_tokens: int) -> dict:
+        """Run one Bedrock call off the event loop and parse its JSON object reply."""
+        body = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "system": system_prompt,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": user_message
+                }
+            ]
+        })
+        response = await asyncio.to_thread(client.invoke_model, modelId=self.model_id, body=body)
+        response_body = json.loads(response.get('body').read())
+        raw_text = response_body['content'][0]['text'].strip()
+
+        # Tolerate a markdown fence or stray prose around the JSON object
+        if "{" in raw_text and "}" in raw_text:
+            raw_text = raw_text[raw_text.find("{"):raw_text.rfind("}") + 1]
+        return json.loads(raw_text)
+
+    async def _extract_segment_findings(
+        self,
+        client,
+        semaphore: asyncio.Semaphore,
+        segment: str,
+        index: int,
+        total: int,
+    ) -> Optional[dict]:
+        """Map step: pull SOAP-relevant findings out of one transcript segment."""
+        async with semaphore:
+            try:
+                return await self._invoke_json(
+                    client,
+                    SOAP_SEGMENT_SYSTEM_PROMPT,
+                    f"TRANSCRIPT SEGMENT {index + 1} OF {total}:\n{segment}",
+                    max_tokens=1024,
+                )
+            except (ClientError, json.JSONDecodeError, KeyError, ValueError) as e:
+                print(f"[AWSService] Findings extraction failed for segment {index + 1}/{total}: {e}")
+                return None
+
     async def generate_soap_note(self, transcript: str, patient_info: Optional[dict] = None) -> dict:
         """
         Generates a structured SOAP note from a doctor-patient consultation transcript
         using AWS Bedrock (Claude 3 Sonnet).
 
+        Short transcripts are summarised in a single call. Longer ones are split
+        on speaker turns into segments whose findings are extracted concurrently
+        (map) and then merged into one note (reduce), so latency tracks the
+        slowest segment rather than the transcript length.
+
         Args:
             transcript: The full consultation transcript text (speaker-labeled dialogue).
             patient_info: Optional dict with context like name, age, conditions.
 
         Returns:
-            A dict with keys: subjective, objective, assessment, plan.
+            A dict with keys: subjective, objective, assessment, plan, patient_summary.
             Falls back to a mock SOAP note if Bedrock is unavailable.
         """
+        from app.config import settings
+
         client = self._get_client("bedrock-runtime")
 
         # Build optional patient context block
@@ -311,56 +544,41 @@ Expected JSON format:
         if patient_info:
             patient_context = f"\n\nPatient Context:\n{json.dumps(patient_info, indent=2)}\n"
 
-        system_prompt = (
-            "You are 'SaraMedico Clinical Scribe,' an expert medical documentation assistant. "
-            "Your task is to transform a doctor-patient consultation transcript into a highly precise, "
-            "professional SOAP note. Use standard medical terminology.\n\n"
-            "SECTION GUIDELINES:\n"
-            "- Subjective: Record the patient's chief complaint, history of present illness (HPI), "
-            "onset, duration, and any symptoms reported. Use phrases like 'Patient reports...' or 'Patient describes...'.\n"
-            "- Objective: Document observable data mentioned: vital signs, physical exam findings, "
-            "lab/imaging results, and general appearance. If none mentioned, state 'Visual exam consistent with history'.\n"
-            "- Assessment: Synthesize a clinical impression or diagnosis based on the encounter. "
-            "Include differential diagnoses if discussed.\n"
-            "- Plan: Detail the actionable next steps: medications (name, dose, frequency), "
-            "diagnostic tests ordered, lifestyle advice, and follow-up timing.\n"
-            "- Patient Summary: A concise, empathetic summary of the visit written in simple, non-clinical language "
-            "intended for the patient to understand their health status and next steps.\n\n"
-            "STRICT CONSTRAINTS:\n"
-            "1. Output ONLY a raw JSON object. No markdown blocks, no commentary.\n"
-            "2. Keys MUST be: 'subjective', 'objective', 'assessment', 'plan', 'patient_summary'.\n"
-            "3. Do NOT hallucinate data. If a section has no evidence, summarize as 'No data provided in transcript'.\n"
-            "4. Language for SOAP sections must be clinical and concise. Language for 'patient_summary' must be layperson-friendly.\n"
-        )
-
-        user_message = (
-            f"Please generate a SOAP note from the following consultation transcript."
-            f"{patient_context}\n\n"
-            f"TRANSCRIPT:\n{transcript}"
-        )
-
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2048,
-            "system": system_prompt,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": user_message
-                }
-            ]
-        })
+        segments = segment_transcript(transcript, settings.SOAP_SEGMENT_CHARS)
 
         try:
-            response = client.invoke_model(
-                modelId=self.model_id,
-                body=body
-            )
-            response_body = json.loads(response.get('body').read())
-            raw_text = response_body['content'][0]['text'].strip()
+            if len(segments) <= 1:
+                user_message = (
+                    f"Please generate a SOAP note from the following consultation transcript."
+                    f"{patient_context}\n\n"
+                    f"TRANSCRIPT:\n{transcript}"
+                )
+            else:
+                semaphore = asyncio.Semaphore(settings.SOAP_MAX_CONCURRENCY)
+                findings = await asyncio.gather(*[
+                    self._extract_segment_findings(client, semaphore, segment, index, len(segments))
+                    for index, segment in enumerate(segments)
+                ])
+                if not any(isinstance(finding, dict) and finding for finding in findings):
+                    raise ValueError("No findings could be extracted from any transcript segment")
+
+                print(f"[AWSService] Merging findings from {len(segments)} transcript segments")
+                user_message = (
+                    f"Please generate a SOAP note from the following findings, extracted in order from "
+                    f"consecutive segments of one consultation transcript. Merge duplicates and, where "
+                    f"segments disagree, prefer the later one."
+                    f"{patient_context}\n\n"
+                    f"SEGMENT FINDINGS:\n"
+                    + json.dumps([
+                        {
+                            "segment": index + 1,
+                            **(finding if isinstance(finding, dict) and finding else {"unavailable": True}),
+                        }
+                        for index, finding in enumerate(findings)
+                    ], indent=2)
+                )
 
-            # Parse the JSON response from Claude
-            soap_dict = json.loads(raw_text)
+            soap_dict = await self._invoke_json(client, SOAP_SYSTEM_PROMPT, user_message, max_tokens=2048)
 
             # Validate all five SOAP keys are present
             required_keys = {"subjective", "objective", "assessment", "plan", "patient_summary"}
@@ -425,7 +643,8 @@ Expected JSON format:
         })
 
         try:
-            response = client.invoke_model(
+            response = await asyncio.to_thread(
+                client.invoke_model,
                 modelId="amazon.titan-embed-text-v1",
                 body=body
             )
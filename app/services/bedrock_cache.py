@@ -0,0 +1,99 @@
+"""Bedrock response cache and cache-effectiveness counters (Redis)
+
+    bedrock:resp:{sha256}   Fernet-encrypted response body of an idempotent
+                            Bedrock request, keyed by model ID + canonical
+                            request body (responses quote patient data)
+    bedrock:stats           hash of per-call-kind counters:
+                              {kind}:hits, {kind}:misses          response cache
+                              {kind}:input_tokens,
+                              {kind}:cache_read_tokens,
+                              {kind}:cache_write_tokens           prompt cache
+
+Everything here fails soft: a Redis outage, or an entry that no longer
+decrypts, only means a cache miss.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.core.redis import get_redis
+from app.core.security import pii_encryption
+
+_STATS_KEY = "bedrock:stats"
+
+
+def canonical_body(body: Dict[str, Any]) -> str:
+    """Serialise a request body so identical requests hash identically"""
+    return json.dumps(body, sort_keys=True, separators=(",", ":"))
+
+
+class BedrockCache:
+    """Response reuse for idempotent calls plus hit-rate accounting"""
+
+    @staticmethod
+    def key_for(model_id: str, body_json: str) -> str:
+        digest = hashlib.sha256(f"{model_id}\n{body_json}".encode("utf-8")).hexdigest()
+        return f"bedrock:resp:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await get_redis().get(key)
+            return json.loads(pii_encryption.decrypt(raw)) if raw is not None else None
+        except Exception as e:
+            print(f"Bedrock cache read failed: {e}")
+            return None
+
+    async def set(self, key: str, response_body: Dict[str, Any]) -> None:
+        try:
+            await get_redis().set(
+                key, pii_encryption.encrypt(json.dumps(response_body)),
+                ex=settings.BEDROCK_RESPONSE_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            print(f"Bedrock cache write failed: {e}")
+
+    async def record(
+        self,
+        kind: str,
+        hit: Optional[bool] = None,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Count a response-cache hit/miss and/or the prompt-cache token usage of a call"""
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                if hit is not None:
+                    pipe.hincrby(_STATS_KEY, f"{kind}:{'hits' if hit else 'misses'}", 1)
+                if usage:
+                    pipe.hincrby(_STATS_KEY, f"{kind}:input_tokens", usage.get("input_tokens") or 0)
+                    pipe.hincrby(_STATS_KEY, f"{kind}:cache_read_tokens", usage.get("cache_read_input_tokens") or 0)
+                    pipe.hincrby(_STATS_KEY, f"{kind}:cache_write_tokens", usage.get("cache_creation_input_tokens") or 0)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Bedrock cache stats update failed: {e}")
+
+    async def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-kind counters with derived response and prompt cache hit rates"""
+        raw = await get_redis().hgetall(_STATS_KEY)
+
+        kinds: Dict[str, Dict[str, Any]] = {}
+        for field, value in raw.items():
+            kind, counter = field.rsplit(":", 1)
+            kinds.setdefault(kind, {})[counter] = int(value)
+
+        for counters in kinds.values():
+            lookups = counters.get("hits", 0) + counters.get("misses", 0)
+            if lookups:
+                counters["response_hit_rate"] = round(counters.get("hits", 0) / lookups, 4)
+            prompt_tokens = (
+                counters.get("input_tokens", 0)
+                + counters.get("cache_read_tokens", 0)
+                + counters.get("cache_write_tokens", 0)
+            )
+            if prompt_tokens:
+                counters["prompt_cache_hit_rate"] = round(counters.get("cache_read_tokens", 0) / prompt_tokens, 4)
+        return kinds
+
+
+bedrock_cache = BedrockCache()
@@ -10,6 +10,7 @@ from app.models.appointment import Appointment
 from app.models.task import Task
 from app.schemas.calendar import CalendarEventCreate
 from app.services.notification_service import NotificationService
+from app.services.scheduling_service import defer_busy_invalidation
 from app.core.security import pii_encryption
 
 
@@ -118,6 +119,7 @@ class CalendarService:
         self.db.add(event)
         await self.db.flush()
         await self.db.refresh(event)
+        defer_busy_invalidation(self.db, user_id)
         
         # Notify User of custom event
         notification_service = NotificationService(self.db)
@@ -154,6 +156,7 @@ class CalendarService:
         event.updated_at = datetime.utcnow()
         await self.db.flush()
         await self.db.refresh(event)
+        defer_busy_invalidation(self.db, event.user_id)
         
         return event
     
@@ -166,6 +169,7 @@ class CalendarService:
         """
         await self.db.delete(event)
         await self.db.flush()
+        defer_busy_invalidation(self.db, event.user_id)
 
     async def _get_org_tz_by_id(self, organization_id: UUID):
         """Helper to get organization timezone by ID"""
@@ -205,7 +209,7 @@ class CalendarService:
                 await self._create_appointment_events(appointment)
             elif appointment.created_by == "doctor":
                 # Don't create events for pending doctor requests
-                return
+                pass
             else:
                 # Normal patient request creation - maybe we want it on calendar as pending?
                 # User said "Appointment not showing in calendar" for doctor created ones.
@@ -228,6 +232,9 @@ class CalendarService:
         
         elif action == "cancel":
             await self._cancel_appointment_events(appointment)
+
+        # Pending requests hold their slot too, so every action changes free/busy
+        defer_busy_invalidation(self.db, appointment.doctor_id)
     
     async def _create_appointment_events(self, appointment: Appointment) -> None:
         """Create calendar events for both patient and doctor"""
@@ -479,58 +486,54 @@ class CalendarService:
         """
         Get summary of all days in a month with event counts.
         If organization_id is provided, returns counts for the entire organization.
+
+        Aggregated in SQL (one row per local day), so no events are loaded;
+        served by the (organization_id, start_time) / (user_id, start_time) indexes.
         """
         import pytz
+        from sqlalchemy import Integer, cast, literal
+        from app.models.user import User
+
         tz = await self._get_org_tz(user_id)
-        
-        # Calculate month range using user's timezone mapped to UTC
-        local_start_date = tz.localize(datetime(year, month, 1))
-        
-        if month == 12:
-            local_end_date = tz.localize(datetime(year + 1, 1, 1)) - timedelta(seconds=1)
-        else:
-            local_end_date = tz.localize(datetime(year, month + 1, 1)) - timedelta(seconds=1)
-            
-        start_date = local_start_date.astimezone(pytz.UTC)
-        end_date = local_end_date.astimezone(pytz.UTC)
-        
-        # Get all events for the month
+
+        # Month boundaries in the organization's timezone, as UTC instants
+        start_date = tz.localize(datetime(year, month, 1)).astimezone(pytz.UTC)
+        next_month = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        end_date = tz.localize(next_month).astimezone(pytz.UTC)
+
+        # Inlined zone name: GROUP BY must repeat the exact select expression
+        zone = literal(tz.zone, literal_execute=True)
+        local_day = cast(extract("day", func.timezone(zone, CalendarEvent.start_time)), Integer).label("day")
+        query = select(
+            local_day,
+            func.count().label("event_count"),
+            func.bool_or(CalendarEvent.event_type == "appointment").label("has_appointments"),
+            func.bool_or(CalendarEvent.event_type == "task").label("has_tasks"),
+            func.bool_or(CalendarEvent.event_type == "custom").label("has_custom_events"),
+        ).where(
+            CalendarEvent.start_time >= start_date,
+            CalendarEvent.start_time < end_date,
+        )
+
         if organization_id:
-            events = await self.get_organization_events(organization_id, start_date, end_date, doctor_id=doctor_id)
+            # Same scope as get_organization_events: staff calendars only
+            query = query.join(User, CalendarEvent.user_id == User.id).where(
+                CalendarEvent.organization_id == organization_id,
+                User.role != "patient",
+            )
+            if doctor_id:
+                query = query.where(CalendarEvent.user_id == doctor_id)
         else:
-            events = await self.get_events_by_date_range(user_id, start_date, end_date)
-        
-        # Group events by day based on the user's localized time
-        days_summary = {}
-        for event in events:
-            ev_start = event.start_time
-            if ev_start.tzinfo is None:
-                ev_start = pytz.UTC.localize(ev_start)
-            local_ev_start = ev_start.astimezone(tz)
-            
-            day = local_ev_start.day
-            if day not in days_summary:
-                days_summary[day] = {
-                    "day": day,
-                    "event_count": 0,
-                    "has_appointments": False,
-                    "has_tasks": False,
-                    "has_custom_events": False
-                }
-            
-            days_summary[day]["event_count"] += 1
-            if event.event_type == "appointment":
-                days_summary[day]["has_appointments"] = True
-            elif event.event_type == "task":
-                days_summary[day]["has_tasks"] = True
-            elif event.event_type == "custom":
-                days_summary[day]["has_custom_events"] = True
-        
+            query = query.where(CalendarEvent.user_id == user_id)
+
+        result = await self.db.execute(query.group_by(local_day).order_by(local_day))
+        days = [dict(row._mapping) for row in result]
+
         return {
             "year": year,
             "month": month,
-            "days": list(days_summary.values()),
-            "total_events": len(events)
+            "days": days,
+            "total_events": sum(day["event_count"] for day in days)
         }
 
     async def get_organization_events(
@@ -1,7 +1,7 @@
 """Chat Session Service - Manages persistent doctor-AI chat sessions"""
 
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from uuid import UUID
 
@@ -99,18 +99,22 @@ class ChatSessionService:
     async def get_session_history_for_prompt(
         self,
         session_id: UUID,
-        limit: int = 10,
+        since: Optional[datetime] = None,
+        limit: int = 50,
     ) -> List[dict]:
         """
-        Fetch last N messages formatted as Claude message dicts:
+        Fetch the last N messages (after `since`, i.e. not yet folded into the
+        session's rolling memory) formatted as Claude message dicts:
         [{"role": "user"|"assistant", "content": "..."}]
         """
         stmt = (
             select(ChatMessage)
             .where(ChatMessage.session_id == session_id)
-            .order_by(ChatMessage.created_at.desc())
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
             .limit(limit)
         )
+        if since is not None:
+            stmt = stmt.where(ChatMessage.created_at > since)
         result = await self.db.execute(stmt)
         messages = result.scalars().all()
 
@@ -125,6 +129,56 @@ class ChatSessionService:
             for m in messages
         ]
 
+    async def update_rolling_memory(self, session_id: UUID) -> None:
+        """
+        Fold messages that no longer fit the verbatim history budget into the
+        session's rolling summary, so prompt size stays bounded however long
+        the session runs. Called after each exchange is saved.
+        """
+        from app.config import settings
+        from app.services.context_assembler import history_tail_start
+
+        session = await self.db.get(ChatSession, session_id)
+        if not session:
+            return
+
+        stmt = (
+            select(ChatMessage)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+        )
+        if session.memory_through is not None:
+            stmt = stmt.where(ChatMessage.created_at > session.memory_through)
+        messages = (await self.db.execute(stmt)).scalars().all()
+
+        history = [
+            {"role": "user" if m.role == "doctor" else "assistant", "content": m.content}
+            for m in messages
+        ]
+        start = history_tail_start(history, settings.CHAT_HISTORY_TOKEN_BUDGET)
+        if start == 0:
+            return
+
+        transcript = "\n\n".join(
+            f"{'Doctor' if m['role'] == 'user' else 'Assistant'}: {m['content']}" for m in history[:start]
+        )
+        prompt = (
+            f"You maintain the running memory of a doctor's chat with a clinical AI assistant about one patient. "
+            f"Update the memory with the new messages below. Keep clinically relevant facts, the doctor's "
+            f"questions and the conclusions reached; drop pleasantries. Reply with ONLY the updated memory, "
+            f"at most {settings.CHAT_MEMORY_MAX_WORDS} words.\n\n"
+            f"CURRENT MEMORY:\n{session.memory_summary or '(empty)'}\n\n"
+            f"NEW MESSAGES:\n{transcript}"
+        )
+        summary = (await aws_service.generate_text(prompt)).strip()
+        if not summary or summary.startswith("I apologize, but I am unable"):
+            return  # Bedrock unavailable; retry after the next exchange
+
+        # Hard cap in case the model ignores the word limit
+        session.memory_summary = summary[:settings.CHAT_MEMORY_MAX_WORDS * 8]
+        session.memory_through = messages[start - 1].created_at
+        await self.db.commit()
+
     async def save_messages(
         self,
         session_id: UUID,
@@ -133,12 +187,20 @@ class ChatSessionService:
         sources: Optional[List[str]] = None,
         confidence: Optional[str] = None,
     ) -> None:
-        """Persist both the doctor's question and the AI's response."""
+        """
+        Persist both the doctor's question and the AI's response.
+
+        The response is stamped strictly after the question: server-side now()
+        would give both rows the same created_at, and the rolling-memory
+        watermark (memory_through) relies on timestamps to tell them apart.
+        """
+        asked_at = datetime.now(timezone.utc)
         doctor_msg = ChatMessage(
             id=uuid.uuid4(),
             session_id=session_id,
             role="doctor",
             content=doctor_message,
+            created_at=asked_at,
         )
         ai_msg = ChatMessage(
             id=uuid.uuid4(),
@@ -147,6 +209,7 @@ class ChatSessionService:
             content=ai_response,
             sources=sources,
             confidence=confidence,
+            created_at=asked_at + timedelta(microseconds=1),
         )
         self.db.add(doctor_msg)
         self.db.add(ai_msg)
@@ -155,7 +218,7 @@ class ChatSessionService:
         await self.db.execute(
             update(ChatSession)
             .where(ChatSession.id == session_id)
-            .values(updated_at=datetime.now(timezone.utc))
+            .values(updated_at=asked_at)
         )
         await self.db.commit()
 
@@ -215,7 +278,7 @@ class ChatSessionService:
             f"Reply with ONLY the title, no quotes, no punctuation at the end."
         )
         try:
-            title = await aws_service.generate_text(prompt)
+            title = await aws_service.generate_text(prompt, cache_kind="title")
             # Trim to 255 chars and clean up whitespace
             title = title.strip()[:255]
             if not title:
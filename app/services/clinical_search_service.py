@@ -0,0 +1,258 @@
+"""Clinical Search Service - hybrid full-text + vector search over a doctor's records
+
+Two retrievers run over the doctor's scope and are merged with reciprocal
+rank fusion (RRF):
+
+    lexical   Postgres full-text search on the generated `search_vector`
+              columns of consultations and chunks (GIN-indexed)
+    semantic  pgvector similarity between the query embedding and chunk
+              embeddings (HNSW-indexed, see services.vector_search)
+
+Document chunks are grouped per document, so a result is either one
+consultation or one document (represented by its best-matching chunk).
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, or_, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.chunk import Chunk
+from app.models.consultation import Consultation
+from app.models.data_access_grant import DataAccessGrant
+from app.models.document import Document
+from app.models.patient import Patient
+
+RRF_K = 60                      # Standard RRF damping constant
+MAX_CANDIDATES = 200            # Per retriever; bounds how deep pagination can go
+MAX_VECTOR_DISTANCE = 0.6       # Cosine distance beyond which a chunk is not a semantic match
+SNIPPET_OPTIONS = "MaxWords=30, MinWords=10, MaxFragments=2, StartSel=**, StopSel=**"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def build_tsquery(q: str) -> Optional[str]:
+    """
+    Turn free text into a prefix-matching tsquery ("chest pai" -> "chest:* & pai:*"),
+    so partial words still match like the old ILIKE search did.
+    """
+    words = _WORD.findall(q.lower())
+    return " & ".join(f"{w}:*" for w in words) or None
+
+
+@dataclass
+class SearchHit:
+    kind: str                               # "consultation" | "document"
+    id: UUID                                # Consultation or document ID
+    patient_id: UUID
+    score: float = 0.0
+    ranks: Dict[str, int] = field(default_factory=dict)
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class ClinicalSearchService:
+    """Hybrid search over the consultations and documents a doctor can access"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _patient_scope(self, doctor_id: UUID):
+        """Patients whose documents the doctor may search: own consultations or an active grant"""
+        return union(
+            select(Consultation.patient_id).where(Consultation.doctor_id == doctor_id),
+            select(DataAccessGrant.patient_id).where(
+                DataAccessGrant.doctor_id == doctor_id,
+                DataAccessGrant.status == "active",
+                DataAccessGrant.is_active == True,
+                or_(DataAccessGrant.expires_at.is_(None), DataAccessGrant.expires_at > func.now()),
+            ),
+        )
+
+    # ── Retrievers ────────────────────────────────────────────────────────────
+
+    async def _lexical_consultations(self, doctor_id: UUID, tsquery, limit: int) -> List[SearchHit]:
+        rank = func.ts_rank_cd(Consultation.search_vector, tsquery)
+        stmt = (
+            select(
+                Consultation.id,
+                Consultation.patient_id,
+                Consultation.scheduled_at,
+                Consultation.status,
+                Consultation.diagnosis,
+                Consultation.prescription,
+                func.ts_headline(
+                    "english",
+                    func.concat_ws(
+                        " ",
+                        Consultation.diagnosis,
+                        Consultation.prescription,
+                        Consultation.chief_complaint,
+                        Consultation.notes,
+                        literal_column("consultations.soap_note::text"),
+                    ),
+                    tsquery,
+                    SNIPPET_OPTIONS,
+                ).label("snippet"),
+            )
+            .where(
+                Consultation.doctor_id == doctor_id,
+                Consultation.deleted_at.is_(None),
+                Consultation.search_vector.op("@@")(tsquery),
+            )
+            .order_by(rank.desc(), Consultation.scheduled_at.desc())
+            .limit(limit)
+        )
+        rows = (await self.db.execute(stmt)).all()
+        return [
+            SearchHit(
+                kind="consultation",
+                id=r.id,
+                patient_id=r.patient_id,
+                data={
+                    "scheduled_at": r.scheduled_at,
+                    "status": r.status,
+                    "diagnosis": r.diagnosis,
+                    "prescription": r.prescription,
+                    "snippet": r.snippet,
+                },
+            )
+            for r in rows
+        ]
+
+    def _chunk_columns(self):
+        return (
+            Chunk.id,
+            Chunk.document_id,
+            Chunk.patient_id,
+            Chunk.page_number,
+            Document.file_name,
+            Document.uploaded_at,
+        )
+
+    def _chunk_hits(self, rows) -> List[SearchHit]:
+        """One hit per document, at the rank of its best chunk"""
+        hits: Dict[UUID, SearchHit] = {}
+        for r in rows:
+            if r.document_id in hits:
+                continue
+            hits[r.document_id] = SearchHit(
+                kind="document",
+                id=r.document_id,
+                patient_id=r.patient_id,
+                data={
+                    "chunk_id": r.id,
+                    "file_name": r.file_name,
+                    "page_number": r.page_number,
+                    "scheduled_at": r.uploaded_at,
+                    "snippet": r.snippet,
+                },
+            )
+        return list(hits.values())
+
+    async def _lexical_chunks(self, doctor_id: UUID, tsquery, limit: int) -> List[SearchHit]:
+        rank = func.ts_rank_cd(Chunk.search_vector, tsquery)
+        stmt = (
+            select(
+                *self._chunk_columns(),
+                func.ts_headline("english", Chunk.content, tsquery, SNIPPET_OPTIONS).label("snippet"),
+            )
+            .join(Document, Chunk.document_id == Document.id)
+            .where(
+                Chunk.patient_id.in_(self._patient_scope(doctor_id)),
+                Document.deleted_at.is_(None),
+                Chunk.search_vector.op("@@")(tsquery),
+            )
+            .order_by(rank.desc())
+            .limit(limit)
+        )
+        return self._chunk_hits((await self.db.execute(stmt)).all())
+
+    async def _semantic_chunks(self, doctor_id: UUID, embedding: List[float], limit: int) -> List[SearchHit]:
+        from app.services.vector_search import cosine_distance, ef_search_statement, rank_by_similarity
+
+        stmt = (
+            select(*self._chunk_columns(), func.left(Chunk.content, 240).label("snippet"))
+            .join(Document, Chunk.document_id == Document.id)
+            .where(
+                Chunk.patient_id.in_(self._patient_scope(doctor_id)),
+                Document.deleted_at.is_(None),
+                cosine_distance(embedding) <= MAX_VECTOR_DISTANCE,
+            )
+        )
+        await self.db.execute(ef_search_statement(limit))
+        stmt = rank_by_similarity(stmt, embedding, limit)
+        return self._chunk_hits((await self.db.execute(stmt)).all())
+
+    # ── Fusion ────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def fuse(ranked_lists: Dict[str, List[SearchHit]]) -> List[SearchHit]:
+        """Reciprocal rank fusion: score = sum over retrievers of 1 / (RRF_K + rank)"""
+        fused: Dict[Tuple[str, UUID], SearchHit] = {}
+        for retriever, hits in ranked_lists.items():
+            for rank, hit in enumerate(hits, start=1):
+                key = (hit.kind, hit.id)
+                merged = fused.setdefault(key, hit)
+                if merged is not hit:
+                    # Prefer the highlighted lexical snippet over a raw prefix
+                    if retriever.startswith("lexical"):
+                        merged.data["snippet"] = hit.data.get("snippet") or merged.data.get("snippet")
+                merged.ranks[retriever] = rank
+                merged.score += 1.0 / (RRF_K + rank)
+        return sorted(fused.values(), key=lambda h: h.score, reverse=True)
+
+    # ── Entry point ───────────────────────────────────────────────────────────
+
+    async def search(
+        self,
+        doctor_id: UUID,
+        q: str,
+        page: int = 1,
+        page_size: int = 20,
+        semantic: bool = True,
+    ) -> Tuple[List[SearchHit], int]:
+        """
+        Return one page of fused results and the total number of fused hits
+        (counted over at most MAX_CANDIDATES candidates per retriever).
+
+        Every retriever is read to the same fixed depth whatever the page, so
+        the fused order and the total stay stable while paging.
+        """
+        raw_tsquery = build_tsquery(q)
+        if not raw_tsquery:
+            return [], 0
+        tsquery = func.to_tsquery("english", raw_tsquery)
+
+        ranked_lists = {
+            "lexical_consultations": await self._lexical_consultations(doctor_id, tsquery, MAX_CANDIDATES),
+            "lexical_chunks": await self._lexical_chunks(doctor_id, tsquery, MAX_CANDIDATES),
+        }
+        if semantic:
+            from app.services.aws_service import aws_service
+            embedding = await aws_service.generate_embeddings(q)
+            if embedding:
+                ranked_lists["semantic_chunks"] = await self._semantic_chunks(doctor_id, embedding, MAX_CANDIDATES)
+
+        fused = self.fuse(ranked_lists)
+        page_hits = fused[(page - 1) * page_size: page * page_size]
+
+        # Patient names/MRNs only for the page being returned
+        patient_ids = {h.patient_id for h in page_hits}
+        if patient_ids:
+            result = await self.db.execute(
+                select(Patient.id, Patient.full_name, Patient.mrn).where(Patient.id.in_(patient_ids))
+            )
+            patients = {row.id: row for row in result.all()}
+            from app.core.security import pii_encryption
+            for hit in page_hits:
+                patient = patients.get(hit.patient_id)
+                try:
+                    hit.data["patient_name"] = pii_encryption.decrypt(patient.full_name)
+                except Exception:
+                    hit.data["patient_name"] = "Unknown"
+                hit.data["patient_mrn"] = patient.mrn if patient else None
+
+        return page_hits, len(fused)
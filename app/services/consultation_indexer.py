@@ -0,0 +1,133 @@
+"""Consultation Indexer - SOAP notes, diagnoses and prescriptions as RAG chunks
+
+A completed consultation is split into one chunk per SOAP section plus one
+for the diagnosis/prescription, embedded with the same Titan model as
+document pages and stored in `chunks` (consultation_id set, document_id
+NULL). Chat retrieval can then find the relevant encounter among years of
+history with the same vector query it uses for documents.
+
+Re-indexing replaces all of a consultation's chunks, so it is safe to run
+after every edit.
+"""
+
+import asyncio
+import json
+import uuid as uuid_mod
+from datetime import datetime
+from typing import List, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models.chunk import Chunk
+from app.models.consultation import Consultation
+
+SOAP_SECTIONS = ("subjective", "objective", "assessment", "plan")
+MAX_CHUNK_CHARS = 2000  # Titan v1 accepts far more; keeps passages focused
+
+
+def _split(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Split on paragraph boundaries into pieces of at most max_chars"""
+    pieces: List[str] = []
+    current = ""
+    for para in text.split("\n"):
+        while len(para) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(para[:max_chars])
+            para = para[max_chars:]
+        if current and len(current) + len(para) + 1 > max_chars:
+            pieces.append(current)
+            current = para
+        else:
+            current = f"{current}\n{para}" if current else para
+    if current.strip():
+        pieces.append(current)
+    return [p.strip() for p in pieces if p.strip()]
+
+
+def consultation_chunk_texts(consultation: Consultation, include_soap: bool = True) -> List[Tuple[str, str]]:
+    """
+    (source, text) pairs to index for a consultation.
+
+    Each text starts with the visit date and section name, so a chunk is
+    self-describing both to the embedding model and in the chat prompt.
+    """
+    date_str = consultation.scheduled_at.strftime("%Y-%m-%d") if consultation.scheduled_at else "unknown date"
+
+    soap = consultation.soap_note if include_soap else None
+    if isinstance(soap, str):
+        try:
+            soap = json.loads(soap)
+        except Exception:
+            soap = {"assessment": soap}
+    soap = soap if isinstance(soap, dict) else {}
+
+    texts: List[Tuple[str, str]] = []
+    for section in SOAP_SECTIONS:
+        value = soap.get(section)
+        if not value:
+            continue
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        for piece in _split(value):
+            texts.append((f"SOAP_{section.upper()}", f"Consultation {date_str} — {section.title()}: {piece}"))
+
+    orders = []
+    if consultation.chief_complaint:
+        orders.append(f"Chief complaint: {consultation.chief_complaint}")
+    if consultation.diagnosis:
+        orders.append(f"Diagnosis: {consultation.diagnosis}")
+    if consultation.prescription:
+        orders.append(f"Prescription: {consultation.prescription}")
+    if orders:
+        for piece in _split("\n".join(orders)):
+            texts.append(("CONSULTATION_ORDERS", f"Consultation {date_str} — {piece}"))
+
+    return texts
+
+
+def index_consultation_sync(db: Session, consultation_id: UUID) -> int:
+    """
+    (Re)build a consultation's chunks from a Celery worker. Returns the
+    number of chunks stored; consultations without a completed SOAP note or
+    any diagnosis/prescription just have their chunks removed.
+    """
+    from app.services.aws_service import aws_service
+    from app.workers.tasks import run_async
+
+    consultation = db.query(Consultation).filter(
+        Consultation.id == consultation_id, Consultation.deleted_at.is_(None)
+    ).first()
+
+    texts: List[Tuple[str, str]] = []
+    if consultation:
+        # Only completed SOAP notes are indexed, never one still being generated
+        texts = consultation_chunk_texts(consultation, include_soap=consultation.ai_status == "completed")
+
+    async def _embed_all():
+        return await asyncio.gather(*(aws_service.generate_embeddings(text) for _, text in texts))
+
+    embeddings = run_async(_embed_all()) if texts else []
+
+    db.execute(delete(Chunk).where(Chunk.consultation_id == consultation_id))
+    if texts:
+        now = datetime.utcnow()
+        db.execute(insert(Chunk).values([
+            {
+                "id": uuid_mod.uuid4(),
+                "consultation_id": consultation.id,
+                "patient_id": consultation.patient_id,
+                "content": text,
+                "source": source,
+                "chunk_type": "soap_note",
+                "page_number": None,
+                "embedding": embedding,
+                "created_at": now,
+            }
+            for (source, text), embedding in zip(texts, embeddings)
+        ]))
+    db.commit()
+    return len(texts)
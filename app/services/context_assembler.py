@@ -0,0 +1,229 @@
+"""RAG context assembly under a token budget
+
+Turns the candidate material for one chat turn (document chunks, SOAP notes,
+older session turns) plus the session history into a prompt context whose
+size is bounded regardless of how many records or messages exist:
+
+1. The rolling memory (summary of already-folded history) goes first.
+2. The most recent history turns are kept verbatim within the history budget.
+3. Candidates are scored by lexical relevance to the query and recency,
+   near-duplicates are dropped, over-long passages are cut down to their most
+   relevant window, and the rest are packed greedily into what remains.
+
+Token counts are estimated (~4 characters per token); no tokenizer needed.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Set
+
+CHARS_PER_TOKEN = 4
+DUPLICATE_JACCARD = 0.8     # Shingle overlap above which two passages count as duplicates
+RELEVANCE_WEIGHT = 0.7      # Share of the score from query relevance (rest is recency)
+RECENCY_HALF_LIFE_DAYS = 180
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "are", "was", "were", "has", "have",
+    "had", "not", "but", "you", "your", "his", "her", "their", "they", "she", "him",
+    "from", "what", "when", "which", "who", "how", "does", "did", "any", "all", "can",
+    "patient", "please", "there", "about", "into", "been", "will", "would", "should",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 2 and w not in _STOPWORDS]
+
+
+def _shingles(text: str, size: int = 5) -> Set[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def history_tail_start(history: List[dict], budget: int) -> int:
+    """
+    Index from which the newest turns of `history` fit in `budget` tokens.
+    The tail always opens on a user turn, as Claude expects.
+    """
+    used = 0
+    start = len(history)
+    for i in range(len(history) - 1, -1, -1):
+        cost = estimate_tokens(history[i]["content"])
+        if used + cost > budget:
+            break
+        used += cost
+        start = i
+    while start < len(history) and history[start]["role"] != "user":
+        start += 1
+    return start
+
+
+@dataclass
+class ContextItem:
+    """One candidate passage for the prompt"""
+    kind: str                           # "chunk" | "soap" | "history"
+    text: str
+    label: str = ""                     # Citation header shown above the passage
+    timestamp: Optional[datetime] = None
+    ref: Any = None                     # Originating row (e.g. Chunk), for sources
+    score: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.label) + estimate_tokens(self.text)
+
+    def render(self) -> str:
+        return f"{self.label}\n{self.text}" if self.label else self.text
+
+
+@dataclass
+class AssembledContext:
+    passages: List[ContextItem] = field(default_factory=list)
+    history: List[dict] = field(default_factory=list)   # Verbatim recent turns, chronological
+    memory: str = ""
+    overflow_history: int = 0                           # Turns that did not fit verbatim
+    tokens: int = 0
+
+    def passages_of(self, kind: str) -> List[ContextItem]:
+        return [p for p in self.passages if p.kind == kind]
+
+
+class ContextAssembler:
+    """Select and pack prompt context within a token budget"""
+
+    def __init__(self, token_budget: int, history_budget: int, max_passage_tokens: int):
+        self.token_budget = token_budget
+        self.history_budget = history_budget
+        self.max_passage_tokens = max_passage_tokens
+
+    # ── Scoring ───────────────────────────────────────────────────────────────
+
+    def _score(self, query: str, items: List[ContextItem]) -> None:
+        query_terms = set(_terms(query))
+        term_counts = [_terms(item.text) for item in items]
+
+        # Inverse document frequency over the candidate pool
+        doc_freq = {t: sum(1 for terms in term_counts if t in terms) for t in query_terms}
+        n = len(items)
+
+        raw = []
+        for terms in term_counts:
+            counts = {}
+            for t in terms:
+                if t in query_terms:
+                    counts[t] = counts.get(t, 0) + 1
+            raw.append(sum(
+                (min(c, 3) / 3) * math.log(1 + n / doc_freq[t]) for t, c in counts.items()
+            ))
+        top = max(raw, default=0) or 1.0
+
+        now = datetime.now(timezone.utc)
+        for item, relevance in zip(items, raw):
+            recency = 0.5  # Unknown age: neutral
+            if item.timestamp is not None:
+                ts = item.timestamp if item.timestamp.tzinfo else item.timestamp.replace(tzinfo=timezone.utc)
+                age_days = max((now - ts).total_seconds() / 86400, 0)
+                recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+            item.score = RELEVANCE_WEIGHT * (relevance / top) + (1 - RELEVANCE_WEIGHT) * recency
+
+    def _trim(self, query: str, item: ContextItem) -> None:
+        """Cut an over-long passage down to its most query-relevant window of lines"""
+        max_chars = self.max_passage_tokens * CHARS_PER_TOKEN
+        if len(item.text) <= max_chars:
+            return
+
+        query_terms = set(_terms(query))
+        lines = item.text.splitlines() or [item.text]
+        hits = [sum(1 for t in _terms(line) if t in query_terms) for line in lines]
+
+        # Grow a window outwards from the most relevant line (or the top if none)
+        anchor = max(range(len(lines)), key=lambda i: hits[i]) if any(hits) else 0
+        first = last = anchor
+        size = len(lines[anchor])
+        while True:
+            grew = False
+            for candidate in (last + 1, first - 1):
+                if 0 <= candidate < len(lines) and size + len(lines[candidate]) + 1 <= max_chars:
+                    size += len(lines[candidate]) + 1
+                    first, last = min(first, candidate), max(last, candidate)
+                    grew = True
+            if not grew:
+                break
+
+        excerpt = "\n".join(lines[first:last + 1])[:max_chars]
+        prefix = "… " if first > 0 else ""
+        suffix = " …" if last < len(lines) - 1 or len(excerpt) == max_chars else ""
+        item.text = f"{prefix}{excerpt}{suffix}"
+
+    @staticmethod
+    def _dedupe(items: List[ContextItem]) -> List[ContextItem]:
+        """Drop passages nearly identical to a higher-scoring one (items sorted by score)"""
+        kept: List[ContextItem] = []
+        kept_shingles: List[Set[str]] = []
+        for item in items:
+            shingles = _shingles(item.text)
+            if any(
+                len(shingles & other) / (len(shingles | other) or 1) >= DUPLICATE_JACCARD
+                for other in kept_shingles
+            ):
+                continue
+            kept.append(item)
+            kept_shingles.append(shingles)
+        return kept
+
+    # ── Entry point ───────────────────────────────────────────────────────────
+
+    def assemble(
+        self,
+        query: str,
+        candidates: List[ContextItem],
+        history: Optional[List[dict]] = None,
+        memory: str = "",
+    ) -> AssembledContext:
+        history = history or []
+        used = estimate_tokens(query)
+        if memory:
+            used += estimate_tokens(memory)
+
+        start = history_tail_start(history, min(self.history_budget, max(self.token_budget - used, 0)))
+        recent = history[start:]
+        used += sum(estimate_tokens(m["content"]) for m in recent)
+
+        # Older turns that did not fit verbatim compete with records for space
+        pool = list(candidates) + [
+            ContextItem(
+                kind="history",
+                text=m["content"],
+                label=f"[Earlier in this conversation — {'Doctor' if m['role'] == 'user' else 'Assistant'}]",
+            )
+            for m in history[:start]
+        ]
+        for item in pool:
+            self._trim(query, item)
+        self._score(query, pool)
+        pool.sort(key=lambda item: item.score, reverse=True)
+
+        passages: List[ContextItem] = []
+        for item in self._dedupe(pool):
+            if item.kind == "history" and item.score <= (1 - RELEVANCE_WEIGHT) * 0.5:
+                continue  # Older turns only come back when they match the question
+            if used + item.tokens > self.token_budget:
+                continue  # A smaller, lower-scored passage may still fit
+            passages.append(item)
+            used += item.tokens
+
+        return AssembledContext(
+            passages=passages,
+            history=recent,
+            memory=memory,
+            overflow_history=start,
+            tokens=used,
+        )
@@ -1,18 +1,65 @@
+import asyncio
+import threading
 import uuid
-from datetime import datetime, timedelta
-from typing import Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+import google_auth_httplib2
+import httplib2
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 
 from app.config import settings
 
+# Google's batch endpoint accepts at most 50 calls per HTTP request
+CALENDAR_BATCH_LIMIT = 50
+
+# A Drive transcript belongs to a meeting only if it was created between the
+# meeting's start and this long after its end
+TRANSCRIPT_MATCH_GRACE = timedelta(hours=2)
+
+
+def _utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _event_window(event: dict, scheduled_at: Optional[datetime]) -> Optional[Tuple[datetime, datetime]]:
+    """[start, latest transcript creation time] for a Calendar event, None if its time is unknown"""
+    try:
+        start = _utc(datetime.fromisoformat(event['start']['dateTime'].replace('Z', '+00:00')))
+        end = _utc(datetime.fromisoformat(event['end']['dateTime'].replace('Z', '+00:00')))
+    except (KeyError, TypeError, ValueError):
+        if scheduled_at is None:
+            return None
+        start = _utc(scheduled_at)
+        end = start + timedelta(minutes=30)
+    return start, end + TRANSCRIPT_MATCH_GRACE
+
+
 class GoogleMeetService:
+    """
+    Google Calendar/Meet/Drive client.
+
+    googleapiclient is blocking and its httplib2 transport is not thread-safe,
+    so every call runs on a bounded executor with per-thread Calendar/Drive
+    clients. All threads share one Credentials object whose access token is
+    refreshed once (under a lock) rather than per call.
+    """
+
     def __init__(self):
         scopes = [
             'https://www.googleapis.com/auth/calendar.events',
             'https://www.googleapis.com/auth/calendar.readonly',
             'https://www.googleapis.com/auth/drive.readonly'
         ]
+        self._local = threading.local()
+        self._token_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.GOOGLE_API_MAX_WORKERS, thread_name_prefix="google-api"
+        )
         try:
             self.creds = Credentials(
                 token=None,
@@ -22,15 +69,11 @@ class GoogleMeetService:
                 client_secret=settings.GOOGLE_CLIENT_SECRET,
                 scopes=scopes
             )
-            # Build both Calendar and Drive services
-            self.calendar_service = build('calendar', 'v3', credentials=self.creds)
-            self.drive_service    = build('drive', 'v3', credentials=self.creds)
             self._available = True
         except Exception as e:
             print(f"[GoogleMeetService] ⚠ Could not initialize Google API services: {e}")
             print("[GoogleMeetService] Calendar/Meet features will be unavailable until credentials are configured.")
-            self.calendar_service = None
-            self.drive_service    = None
+            self.creds = None
             self._available = False
 
     def _require_service(self):
@@ -42,77 +85,195 @@ class GoogleMeetService:
                 "and GOOGLE_REFRESH_TOKEN in your .env file."
             )
 
+    # ── Thread-side helpers (run on the executor) ─────────────────────────────
 
-    async def get_meeting_transcript(self, google_event_id: str) -> Optional[str]:
+    def _ensure_token(self):
+        """Refresh the shared access token if it is missing or expired."""
+        if self.creds.valid:
+            return
+        with self._token_lock:
+            if not self.creds.valid:
+                self.creds.refresh(google_auth_httplib2.Request(httplib2.Http(timeout=30)))
+
+    def _clients(self):
+        """Calendar and Drive clients owned by the current thread."""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http(timeout=30))
+            clients = (
+                build('calendar', 'v3', http=http, cache_discovery=False),
+                build('drive', 'v3', http=http, cache_discovery=False),
+            )
+            self._local.clients = clients
+        return clients
+
+    @property
+    def calendar_service(self):
+        self._require_service()
+        return self._clients()[0]
+
+    @property
+    def drive_service(self):
+        self._require_service()
+        return self._clients()[1]
+
+    async def _run(self, fn, *args):
+        """Run a blocking Google API call off the event loop."""
+        self._require_service()
+
+        def _call():
+            self._ensure_token()
+            return fn(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _call)
+
+    def _find_transcript_file_id(self, google_event_id: str) -> Optional[str]:
+        """Locate the Drive file ID of a meeting's transcript, if one exists."""
+        return self._find_transcript_files([(google_event_id, None)]).get(google_event_id)
+
+    def _find_transcript_files(self, events: List[Tuple[str, Optional[datetime]]]) -> Dict[str, str]:
         """
-        Checks the Calendar event for an attached transcript and downloads its text.
+        Locate transcripts for many events at once.
+
+        `events` holds (google_event_id, scheduled_at) pairs. Events are fetched
+        with batched Calendar requests; those without an attached transcript
+        are matched against a single Drive listing of transcripts. A file
+        matches an event when its name contains the event's summary and it
+        was created inside the event's own window (see _event_window). Repeat
+        meetings of a pair share a summary, so an event with several
+        candidates, or a file fitting several events, stays unmatched rather
+        than risk attaching another consultation's transcript.
+        Returns {google_event_id: file_id}.
         """
-        try:
-            # 1. Fetch the event to look for attachments
-            event = self.calendar_service.events().get(
-                calendarId='primary', 
-                eventId=google_event_id
-            ).execute()
-            
-            summary = event.get('summary', 'Consultation')
-            attachments = event.get('attachments', [])
-            transcript_file_id = None
-            
-            # 2. Primary check: Find the Google Doc attachment linked to the event
-            for att in attachments:
-                mime_type = att.get('mimeType', '')
-                title = att.get('title', '')
-                if 'application/vnd.google-apps' in mime_type and 'Transcript' in title:
-                    transcript_file_id = att.get('fileId')
-                    print(f"[GoogleMeetService] Found transcript attached to event: {title}")
+        calendar, drive = self._clients()
+        event_ids = [event_id for event_id, _ in events]
+        fetched: Dict[str, dict] = {}
+
+        def _callback(request_id, response, exception):
+            if exception is not None:
+                print(f"[GoogleMeetService] Could not fetch event {event_ids[int(request_id)]}: {exception}")
+                return
+            fetched[event_ids[int(request_id)]] = response
+
+        for start in range(0, len(event_ids), CALENDAR_BATCH_LIMIT):
+            batch = calendar.new_batch_http_request(callback=_callback)
+            for index in range(start, min(start + CALENDAR_BATCH_LIMIT, len(event_ids))):
+                batch.add(
+                    calendar.events().get(calendarId='primary', eventId=event_ids[index]),
+                    request_id=str(index)
+                )
+            batch.execute()
+
+        scheduled = dict(events)
+        found: Dict[str, str] = {}
+        unmatched: Dict[str, Tuple[str, datetime, datetime]] = {}
+        for event_id, event in fetched.items():
+            for att in event.get('attachments', []):
+                if 'application/vnd.google-apps' in att.get('mimeType', '') and 'Transcript' in att.get('title', ''):
+                    found[event_id] = att.get('fileId')
                     break
-                    
-            # 3. Fallback check: Search Drive for files matching the meeting summary
-            if not transcript_file_id:
-                print(f"[GoogleMeetService] Transcript not attached to event. Searching Drive for: {summary}")
-                # Search for files with the summary in name and 'Transcript'
-                # Google naming pattern is usually "[Summary] - [Date] [Time] - Transcript"
-                safe_summary = summary.replace("'", "\\'")
-                query = f"name contains '{safe_summary}' and name contains 'Transcript' and trashed = false"
-                drive_results = self.drive_service.files().list(
+            else:
+                window = _event_window(event, scheduled[event_id])
+                if window:
+                    unmatched[event_id] = (event.get('summary', 'Consultation'), *window)
+
+        if unmatched:
+            earliest = min(start for _, start, _ in unmatched.values())
+            latest = max(until for _, _, until in unmatched.values())
+            query = (
+                "name contains 'Transcript' and trashed = false and "
+                f"createdTime > '{earliest.strftime('%Y-%m-%dT%H:%M:%SZ')}' and "
+                f"createdTime < '{latest.strftime('%Y-%m-%dT%H:%M:%SZ')}'"
+            )
+            candidates: Dict[str, List[str]] = {event_id: [] for event_id in unmatched}
+            claims: Dict[str, int] = {}
+            page_token = None
+            while True:
+                drive_results = drive.files().list(
                     q=query,
-                    pageSize=5,
-                    fields="files(id, name, createdTime)",
+                    pageSize=100,
+                    pageToken=page_token,
+                    fields="nextPageToken, files(id, name, createdTime)",
                     orderBy="createdTime desc"
                 ).execute()
-                
-                drive_files = drive_results.get('files', [])
-                if drive_files:
-                    # Pick the most recent one
-                    transcript_file_id = drive_files[0].get('id')
-                    print(f"[GoogleMeetService] Found transcript in Drive search: {drive_files[0].get('name')}")
-
-            if not transcript_file_id:
-                print(f"[GoogleMeetService] No transcript found for Event ID {google_event_id}")
-                return None 
-                
-            # 4. Download and export as plain text
-            request = self.drive_service.files().export_media(
-                fileId=transcript_file_id, 
-                mimeType='text/plain'
-            )
-            transcript_bytes = request.execute()
-            
-            return transcript_bytes.decode('utf-8')
-            
-        except Exception as e:
-            print(f"Error fetching transcript: {e}")
+                for drive_file in drive_results.get('files', []):
+                    try:
+                        created = _utc(datetime.fromisoformat(drive_file['createdTime'].replace('Z', '+00:00')))
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    for event_id, (summary, start, until) in unmatched.items():
+                        if summary in drive_file.get('name', '') and start <= created <= until:
+                            candidates[event_id].append(drive_file['id'])
+                            claims[drive_file['id']] = claims.get(drive_file['id'], 0) + 1
+                page_token = drive_results.get('nextPageToken')
+                if not page_token:
+                    break
+
+            for event_id, file_ids in candidates.items():
+                if len(file_ids) == 1 and claims[file_ids[0]] == 1:
+                    found[event_id] = file_ids[0]
+                elif file_ids:
+                    print(f"[GoogleMeetService] Ambiguous transcripts for event {event_id}; leaving it unmatched")
+
+        return found
+
+    def _export_text(self, file_id: str) -> str:
+        """Download a Google Doc as plain text."""
+        _, drive = self._clients()
+        transcript_bytes = drive.files().export_media(
+            fileId=file_id, 
+            mimeType='text/plain'
+        ).execute()
+        return transcript_bytes.decode('utf-8')
+
+    def _fetch_transcript(self, google_event_id: str) -> Optional[str]:
+        transcript_file_id = self._find_transcript_file_id(google_event_id)
+        if not transcript_file_id:
+            print(f"[GoogleMeetService] No transcript found for Event ID {google_event_id}")
             return None
+        return self._export_text(transcript_file_id)
 
-    async def create_meeting(
-        self, 
-        start_time: datetime, 
-        duration_minutes: int, 
-        summary: str, 
+    def _insert_event(self, event_body: dict) -> dict:
+        calendar, _ = self._clients()
+        # The conferenceDataVersion=1 parameter is REQUIRED to generate the Meet link
+        return calendar.events().insert(
+            calendarId='primary', 
+            body=event_body, 
+            conferenceDataVersion=1,
+            sendUpdates="all"
+        ).execute()
+
+    def _insert_events_batch(self, event_bodies: List[dict]) -> list:
+        """Insert events via HTTP batch requests; returns a response or exception per body."""
+        calendar, _ = self._clients()
+        results: list = [None] * len(event_bodies)
+
+        def _callback(request_id, response, exception):
+            results[int(request_id)] = exception or response
+
+        for start in range(0, len(event_bodies), CALENDAR_BATCH_LIMIT):
+            batch = calendar.new_batch_http_request(callback=_callback)
+            for index in range(start, min(start + CALENDAR_BATCH_LIMIT, len(event_bodies))):
+                batch.add(
+                    calendar.events().insert(
+                        calendarId='primary',
+                        body=event_bodies[index],
+                        conferenceDataVersion=1,
+                        sendUpdates="all"
+                    ),
+                    request_id=str(index)
+                )
+            batch.execute()
+        return results
+
+    @staticmethod
+    def _build_event_body(
+        start_time: datetime,
+        duration_minutes: int,
+        summary: str,
         description: str = "",
-        attendees: list[str] = None # NEW PARAMETER
-    ) -> Tuple[str, str]:
-        
+        attendees: list[str] = None
+    ) -> dict:
         end_time = start_time + timedelta(minutes=duration_minutes)
         request_id = uuid.uuid4().hex
 
@@ -129,7 +290,6 @@ class GoogleMeetService:
             }
         }
 
-        # NEW: Add the attendees to the event body
         if attendees:
             cleaned_attendees = []
             for email in attendees:
@@ -142,14 +302,10 @@ class GoogleMeetService:
             if cleaned_attendees:
                 event_body['attendees'] = cleaned_attendees
 
-        # The conferenceDataVersion=1 parameter is REQUIRED to generate the Meet link
-        event = self.calendar_service.events().insert(
-            calendarId='primary', 
-            body=event_body, 
-            conferenceDataVersion=1,
-            sendUpdates="all"
-        ).execute()
+        return event_body
 
+    @staticmethod
+    def _meeting_from_event(event: dict) -> Tuple[str, str]:
         # Extract the ID and the Meet Link from the response
         google_event_id = event.get('id')
         meet_link = event.get('hangoutLink')
@@ -159,5 +315,78 @@ class GoogleMeetService:
 
         return google_event_id, meet_link
 
+    # ── Async API ─────────────────────────────────────────────────────────────
+
+    async def get_meeting_transcript(self, google_event_id: str) -> Optional[str]:
+        """
+        Checks the Calendar event for an attached transcript and downloads its text.
+        """
+        try:
+            return await self._run(self._fetch_transcript, google_event_id)
+        except Exception as e:
+            print(f"Error fetching transcript: {e}")
+            return None
+
+    async def find_transcripts(self, events: List[Tuple[str, datetime]]) -> Dict[str, str]:
+        """
+        Discover which meetings have a transcript, in one batched sweep.
+
+        Takes (google_event_id, scheduled_at) pairs and returns
+        {google_event_id: transcript text} for those whose transcript exists.
+        """
+        if not events:
+            return {}
+
+        file_ids = await self._run(self._find_transcript_files, events)
+        transcripts: Dict[str, str] = {}
+        for event_id, file_id in file_ids.items():
+            try:
+                text = await self._run(self._export_text, file_id)
+            except Exception as e:
+                print(f"[GoogleMeetService] Could not export transcript for event {event_id}: {e}")
+                continue
+            if text and text.strip():
+                transcripts[event_id] = text
+        return transcripts
+
+    async def create_meeting(
+        self, 
+        start_time: datetime, 
+        duration_minutes: int, 
+        summary: str, 
+        description: str = "",
+        attendees: list[str] = None
+    ) -> Tuple[str, str]:
+        event_body = self._build_event_body(start_time, duration_minutes, summary, description, attendees)
+        event = await self._run(self._insert_event, event_body)
+        return self._meeting_from_event(event)
+
+    async def create_meetings_batch(
+        self,
+        meetings: List[dict]
+    ) -> List[Union[Tuple[str, str], Exception]]:
+        """
+        Create many Meet-enabled events with batched HTTP requests.
+
+        Each item takes create_meeting's keyword arguments. Returns, in order,
+        either (google_event_id, meet_link) or the Exception for that meeting.
+        """
+        if not meetings:
+            return []
+
+        bodies = [self._build_event_body(**meeting) for meeting in meetings]
+        responses = await self._run(self._insert_events_batch, bodies)
+
+        results: List[Union[Tuple[str, str], Exception]] = []
+        for response in responses:
+            if isinstance(response, Exception):
+                results.append(response)
+                continue
+            try:
+                results.append(self._meeting_from_event(response))
+            except ValueError as e:
+                results.append(e)
+        return results
+
 # Export a singleton instance
 google_meet_service = GoogleMeetService()
\ No newline at end of file
@@ -704,6 +704,10 @@ class HospitalService:
             
         if kwargs.get("notes"):
             appointment.doctor_notes = kwargs.get("notes")
+
+        # Every action (decline/cancel included) changes the doctor's free/busy
+        from app.services.scheduling_service import defer_busy_invalidation
+        defer_busy_invalidation(self.db, appointment.doctor_id)
             
         await self.db.commit()
         return {"id": str(appointment.id), "status": appointment.status}
@@ -770,18 +774,24 @@ class HospitalService:
         result = await self.db.execute(stmt)
         appointments = result.scalars().all()
         
-        # We can also fetch availability slots if we have an Availability model
-        # For now, we return booked slots
+        from datetime import timedelta
+        from app.config import settings
+        from app.services.scheduling_service import SchedulingService
+
+        slot = timedelta(minutes=settings.SCHEDULING_SLOT_MINUTES)
         booked_slots = [{
             "id": str(apt.id),
             "start": apt.scheduled_at or apt.requested_date,
-            "end": apt.scheduled_at or apt.requested_date, # Add duration logic if exists
+            "end": (apt.scheduled_at or apt.requested_date) + slot,
             "status": apt.status,
             "title": "Booked"
         } for apt in appointments]
-        
+
+        # Free working-hour slots left after appointments, requests and events
+        availability = await SchedulingService(self.db).free_slots(organization_id, doctor_id, start_date, end_date)
+
         return {
             "doctor_id": str(doctor_id),
             "booked_slots": booked_slots,
-            "availability": [] # Place holder for availability patterns
+            "availability": availability
         }
\ No newline at end of file
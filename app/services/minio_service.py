@@ -17,11 +17,13 @@ class MinIOService:
     def __init__(self):
         # Internal client for backend-to-MinIO communication (bucket checks, uploads, etc.)
         # Internal Docker network does not use SSL, so secure=False always.
+        from app.core.metrics import minio_http_client
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ROOT_USER,
             secret_key=settings.MINIO_ROOT_PASSWORD,
-            secure=False
+            secure=False,
+            http_client=minio_http_client(),  # Times every request for /metrics
         )
         
         # Determine if MINIO_EXTERNAL_ENDPOINT is a plain host (host:port)
@@ -7,7 +7,18 @@ class MockGoogleMeetService:
         print(f"MOCK: Creating Google Meet for {summary}")
         return str(uuid4()), f"https://meet.google.com/mock-{uuid4().hex[:4]}-{uuid4().hex[:4]}"
 
+    async def create_meetings_batch(self, meetings):
+        return [
+            await self.create_meeting(
+                m["start_time"], m["duration_minutes"], m["summary"], m.get("description", ""), m.get("attendees")
+            )
+            for m in meetings
+        ]
+
     async def get_meeting_transcript(self, event_id):
         return "This is a mock transcript of the medical consultation."
 
+    async def find_transcripts(self, events):
+        return {event_id: await self.get_meeting_transcript(event_id) for event_id, _ in events}
+
 google_meet_service = MockGoogleMeetService()
@@ -0,0 +1,280 @@
+"""Per-user notification feed cache (Redis)
+
+Each user's feed is kept as three keys:
+
+    notif:feed:{user_id}    sorted set of notification IDs, scored by
+                            Notification.feed_score
+    notif:items:{user_id}   hash of notification ID -> NotificationResponse JSON
+    notif:unread:{user_id}  total unread count (also marks the feed as warm)
+
+Feeds are warmed from the database on first read and expire after
+NOTIFICATION_FEED_TTL_SECONDS, which bounds any drift. Writes are applied
+only after the surrounding DB transaction commits (see defer_feed_update),
+so rolled-back notifications never reach the cache.
+
+A notification's feed score (epoch microseconds) is stamped on its row as
+the inserting transaction commits (see defer_feed_push). Pushes, warm-ups
+and the database fallback all use that stored score, so a `since` cursor
+means the same thing whichever of them produced it.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.redis import get_redis, get_sync_redis
+from app.models.notification import Notification
+
+
+# Adds an item to a warm feed, bumps the unread counter and trims the feed.
+# KEYS: feed, items, unread   ARGV: id, score, payload, feed_size, is_unread
+_PUSH_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 0 then return 0 end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+if ARGV[5] == '1' then redis.call('INCR', KEYS[3]) end
+local overflow = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[4])
+if overflow > 0 then
+    local stale = redis.call('ZRANGE', KEYS[1], 0, overflow - 1)
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, overflow - 1)
+    redis.call('HDEL', KEYS[2], unpack(stale))
+end
+return 1
+"""
+
+# Flags a cached item as read and decrements the unread counter.
+# KEYS: items, unread   ARGV: id, updated_at
+_MARK_READ_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then return 0 end
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+if raw then
+    local item = cjson.decode(raw)
+    item['is_read'] = true
+    item['updated_at'] = ARGV[2]
+    redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(item))
+end
+if tonumber(redis.call('GET', KEYS[2])) > 0 then redis.call('DECR', KEYS[2]) end
+return 1
+"""
+
+
+@dataclass
+class NotificationFeed:
+    """A page of the feed plus the state needed for delta polling"""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    unread_count: int = 0
+    cursor: Optional[int] = None  # Pass back as `since` to fetch only newer items
+
+
+def _feed_key(user_id: UUID) -> str:
+    return f"notif:feed:{user_id}"
+
+
+def _items_key(user_id: UUID) -> str:
+    return f"notif:items:{user_id}"
+
+
+def _unread_key(user_id: UUID) -> str:
+    return f"notif:unread:{user_id}"
+
+
+def current_feed_score() -> int:
+    """Feed cursor value (UTC epoch microseconds) for now"""
+    return time.time_ns() // 1000
+
+
+class NotificationFeedCache:
+    """Redis-backed notification feed. All methods fail soft (cache miss)."""
+
+    async def push_many(self, entries: List[Tuple[UUID, Dict[str, Any]]], score: int) -> None:
+        """Push (user_id, payload) pairs, all with the feed score stamped at commit, in one round-trip"""
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for user_id, payload in entries:
+                    pipe.eval(
+                        _PUSH_SCRIPT, 3,
+                        _feed_key(user_id), _items_key(user_id), _unread_key(user_id),
+                        payload["id"], score, json.dumps(payload),
+                        settings.NOTIFICATION_FEED_SIZE, "0" if payload.get("is_read") else "1",
+                    )
+                await pipe.execute()
+        except Exception as e:
+            print(f"Notification cache batch push failed: {e}")
+            for user_id in {user_id for user_id, _ in entries}:
+                await self.invalidate(user_id)
+
+    async def mark_read(self, user_id: UUID, notification_id: UUID, updated_at: datetime) -> None:
+        try:
+            await get_redis().eval(
+                _MARK_READ_SCRIPT, 2,
+                _items_key(user_id), _unread_key(user_id),
+                str(notification_id), updated_at.isoformat(),
+            )
+        except Exception as e:
+            print(f"Notification cache mark_read failed for {user_id}: {e}")
+            await self.invalidate(user_id)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        try:
+            await get_redis().delete(_feed_key(user_id), _items_key(user_id), _unread_key(user_id))
+        except Exception as e:
+            print(f"Notification cache invalidation failed for {user_id}: {e}")
+
+    def invalidate_many_sync(self, user_ids) -> None:
+        """Drop feeds from synchronous code (Celery); they re-warm on next read"""
+        keys = [key for user_id in set(user_ids) for key in (
+            _feed_key(user_id), _items_key(user_id), _unread_key(user_id)
+        )]
+        if not keys:
+            return
+        try:
+            get_sync_redis().delete(*keys)
+        except Exception as e:
+            print(f"Notification cache invalidation failed: {e}")
+
+    async def warm(self, user_id: UUID, entries: List[Tuple[Dict[str, Any], int]], unread_count: int) -> None:
+        """Rebuild a feed from (payload, feed_score) pairs read from the database"""
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.delete(_feed_key(user_id), _items_key(user_id), _unread_key(user_id))
+                if entries:
+                    pipe.zadd(_feed_key(user_id), {p["id"]: score for p, score in entries})
+                    pipe.hset(_items_key(user_id), mapping={p["id"]: json.dumps(p) for p, _ in entries})
+                pipe.set(_unread_key(user_id), unread_count)
+                for key in (_feed_key(user_id), _items_key(user_id), _unread_key(user_id)):
+                    pipe.expire(key, settings.NOTIFICATION_FEED_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Notification cache warm-up failed for {user_id}: {e}")
+
+    async def get_unread_count(self, user_id: UUID) -> Optional[int]:
+        """Cached unread count, or None if the feed is cold"""
+        try:
+            value = await get_redis().get(_unread_key(user_id))
+            return int(value) if value is not None else None
+        except Exception:
+            return None
+
+    async def read(
+        self,
+        user_id: UUID,
+        is_read: Optional[bool],
+        limit: int,
+        offset: int,
+        since: Optional[int],
+    ) -> Optional[NotificationFeed]:
+        """
+        Serve a feed page from cache.
+
+        Returns None when the feed is cold or the page reaches past the cached
+        window, in which case the caller should read from the database.
+        """
+        try:
+            client = get_redis()
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get(_unread_key(user_id))
+                pipe.zcard(_feed_key(user_id))
+                pipe.zrevrangebyscore(
+                    _feed_key(user_id), "+inf", f"({since}" if since is not None else "-inf",
+                    withscores=True
+                )
+                unread, cached_total, entries = await pipe.execute()
+            if unread is None:
+                return None
+
+            cursor = int(entries[0][1]) if entries else since
+            raw_items = await client.hmget(_items_key(user_id), [e[0] for e in entries]) if entries else []
+        except Exception as e:
+            print(f"Notification cache read failed for {user_id}: {e}")
+            return None
+
+        items = [json.loads(raw) for raw in raw_items if raw]
+        if is_read is not None:
+            items = [item for item in items if item["is_read"] == is_read]
+
+        # A full feed may have been trimmed, so it can't answer pages beyond it
+        truncated = cached_total >= settings.NOTIFICATION_FEED_SIZE
+        if since is None and truncated and offset + limit > len(items):
+            return None
+
+        return NotificationFeed(
+            items=items[offset:offset + limit],
+            unread_count=int(unread),
+            cursor=cursor,
+        )
+
+
+notification_feed_cache = NotificationFeedCache()
+
+
+# ──────────────────────────────────────────────
+# Apply cache updates after commit
+# ──────────────────────────────────────────────
+
+_PENDING_KEY = "notification_feed_ops"
+_STAMP_KEY = "notification_feed_stamp"   # Notification IDs to score at commit
+_PUSH_KEY = "notification_feed_push"     # (user_id, payload) to push after commit
+_SCORE_KEY = "notification_feed_score"   # Score stamped by the committing transaction
+_background_tasks: set = set()
+
+
+def defer_feed_update(db: AsyncSession, op: Callable[[], Awaitable[None]]) -> None:
+    """Run `op` once the session's current transaction commits (dropped on rollback)."""
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append(op)
+
+
+def stamp_feed_scores(session: Session, notification_ids: Iterable[UUID]) -> None:
+    """Give new notifications their feed score when the session's transaction commits"""
+    session.info.setdefault(_STAMP_KEY, []).extend(notification_ids)
+
+
+def defer_feed_push(db: AsyncSession, entries: List[Tuple[UUID, Dict[str, Any]]]) -> None:
+    """Stamp new (user_id, payload) notifications at commit, then push them to the feeds"""
+    stamp_feed_scores(db.sync_session, [UUID(payload["id"]) for _, payload in entries])
+    db.sync_session.info.setdefault(_PUSH_KEY, []).extend(entries)
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_feed_scores(session: Session) -> None:
+    ids = session.info.pop(_STAMP_KEY, None)
+    if not ids:
+        return
+    # As late as possible, so scores follow commit order
+    score = current_feed_score()
+    session.execute(update(Notification).where(Notification.id.in_(ids)).values(feed_score=score))
+    session.info[_SCORE_KEY] = score
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_feed_updates(session: Session) -> None:
+    score = session.info.pop(_SCORE_KEY, None)
+    pushes = session.info.pop(_PUSH_KEY, None)
+    ops = session.info.pop(_PENDING_KEY, None) or []
+    if pushes and score is not None:
+        ops.insert(0, lambda: notification_feed_cache.push_many(pushes, score))
+    if not ops:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Sync session outside an event loop; feeds expire on their own
+
+    for op in ops:
+        task = loop.create_task(op())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_feed_updates(session: Session) -> None:
+    for key in (_PENDING_KEY, _STAMP_KEY, _PUSH_KEY, _SCORE_KEY):
+        session.info.pop(key, None)
@@ -1,12 +1,67 @@
 
+import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
-from sqlalchemy import select, update
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models.notification import Notification
 from app.schemas.notification import NotificationResponse
+from app.services.notification_cache import (
+    NotificationFeed,
+    defer_feed_push,
+    defer_feed_update,
+    notification_feed_cache,
+    stamp_feed_scores,
+)
+
+_NULL_ORG_ID = UUID("00000000-0000-0000-0000-000000000000")
+
+
+def _notification_row(item: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Normalise a create_notification-style dict into a full insert row."""
+    return {
+        "id": uuid.uuid4(),
+        "user_id": item["user_id"],
+        "type": item["type"],
+        "title": item["title"],
+        "message": item["message"],
+        "organization_id": item.get("organization_id"),
+        "action_url": item.get("action_url"),
+        "grant_id": item.get("grant_id"),
+        "action_metadata": item.get("action_metadata"),
+        "is_read": False,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def create_notifications_bulk_sync(db: Session, notifications: List[Dict[str, Any]]) -> int:
+    """
+    Synchronous (Celery) counterpart of NotificationService.create_notifications_bulk.
+
+    Inserts every notification in one multi-row statement and commits. Workers
+    hold no WebSocket connections, so recipients' cached feeds are dropped
+    instead and the notifications appear on their next poll.
+
+    Returns:
+        Number of notifications created
+    """
+    if not notifications:
+        return 0
+
+    now = datetime.utcnow()
+    rows = [_notification_row(item, now) for item in notifications]
+    db.execute(insert(Notification), rows)
+    stamp_feed_scores(db, [row["id"] for row in rows])
+    db.commit()
+
+    notification_feed_cache.invalidate_many_sync(row["user_id"] for row in rows)
+    return len(rows)
+
 
 class NotificationService:
     def __init__(self, db: AsyncSession):
@@ -42,37 +97,147 @@ class NotificationService:
         from app.api.v1.websockets import manager
         await manager.send_personal_message(
             {"type": "notification", "data": notification_data},
-            organization_id or UUID("00000000-0000-0000-0000-000000000000"), # Fallback if org is missing
+            organization_id or _NULL_ORG_ID, # Fallback if org is missing
             user_id
         )
+        defer_feed_push(self.db, [(user_id, notification_data)])
         
         return notification
 
+    async def create_notifications_bulk(self, notifications: List[Dict[str, Any]]) -> List[Notification]:
+        """
+        Create many notifications in one INSERT and publish them in one batch.
+
+        Each item takes the same keyword fields as create_notification. The
+        WebSocket push and feed cache update are each a single fan-out.
+        """
+        if not notifications:
+            return []
+
+        now = datetime.utcnow()
+        rows = [_notification_row(item, now) for item in notifications]
+        result = await self.db.execute(insert(Notification).returning(Notification), rows)
+        created = result.scalars().all()
+
+        payloads = [
+            (n.user_id, NotificationResponse.model_validate(n).model_dump(mode="json")) for n in created
+        ]
+        from app.api.v1.websockets import manager
+        await manager.send_personal_messages([
+            (n.organization_id or _NULL_ORG_ID, user_id, {"type": "notification", "data": payload})
+            for n, (user_id, payload) in zip(created, payloads)
+        ])
+        defer_feed_push(self.db, payloads)
+
+        return created
+
     async def get_user_notifications(
         self,
         user_id: UUID,
         is_read: Optional[bool] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        since: Optional[int] = None
     ) -> List[Notification]:
-        """Fetch notifications for a specific user."""
+        """Fetch notifications for a specific user, newest first in feed order."""
         query = select(Notification).where(Notification.user_id == user_id)
         if is_read is not None:
             query = query.where(Notification.is_read == is_read)
+        if since is not None:
+            query = query.where(Notification.feed_score > since)
         
-        query = query.order_by(Notification.created_at.desc()).limit(limit).offset(offset)
+        query = query.order_by(Notification.feed_score.desc()).limit(limit).offset(offset)
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def get_feed(
+        self,
+        user_id: UUID,
+        is_read: Optional[bool] = None,
+        limit: int = 50,
+        offset: int = 0,
+        since: Optional[int] = None
+    ) -> NotificationFeed:
+        """
+        Fetch a page of the user's feed from the Redis cache, warming it from
+        the database when cold. `since` (a previous feed cursor) limits the
+        result to notifications added after that point.
+        """
+        feed = await notification_feed_cache.read(user_id, is_read, limit, offset, since)
+        if feed is not None:
+            return feed
+
+        unread_count = await self._count_unread(user_id)
+        recent = await self.get_user_notifications(user_id, limit=settings.NOTIFICATION_FEED_SIZE)
+        entries = [
+            (NotificationResponse.model_validate(n).model_dump(mode="json"), n.feed_score) for n in recent
+        ]
+        await notification_feed_cache.warm(user_id, entries, unread_count)
+
+        feed = await notification_feed_cache.read(user_id, is_read, limit, offset, since)
+        if feed is not None:
+            return feed
+
+        # Cache unavailable or page beyond the cached window
+        items = await self.get_user_notifications(
+            user_id, is_read=is_read, limit=limit, offset=offset, since=since
+        )
+        cursor = since
+        if items and (since is not None or offset == 0):
+            cursor = items[0].feed_score
+        return NotificationFeed(items=list(items), unread_count=unread_count, cursor=cursor)
+
+    async def get_unread_count(self, user_id: UUID) -> int:
+        """Unread notification count, served from the feed cache when warm."""
+        cached = await notification_feed_cache.get_unread_count(user_id)
+        if cached is not None:
+            return cached
+        return await self._count_unread(user_id)
+
+    async def _count_unread(self, user_id: UUID) -> int:
+        result = await self.db.execute(
+            select(func.count()).select_from(Notification).where(
+                Notification.user_id == user_id, Notification.is_read == False
+            )
+        )
+        return result.scalar_one()
+
     async def mark_as_read(self, notification_id: UUID, user_id: UUID) -> bool:
         """Mark a specific notification as read."""
+        now = datetime.utcnow()
         stmt = (
             update(Notification)
-            .where(Notification.id == notification_id, Notification.user_id == user_id)
-            .values(is_read=True, updated_at=datetime.utcnow())
+            .where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id,
+                Notification.is_read == False
+            )
+            .values(is_read=True, updated_at=now)
+            .returning(Notification.id)
+        )
+        if (await self.db.execute(stmt)).first() is not None:
+            self._defer_mark_read(notification_id, user_id, now)
+            return True
+
+        # Already read counts as success as long as the notification exists
+        existing = await self.db.execute(
+            select(Notification.id).where(
+                Notification.id == notification_id, Notification.user_id == user_id
+            )
+        )
+        return existing.first() is not None
+
+    def mark_loaded_as_read(self, notification: Notification) -> None:
+        """Mark an already-loaded notification as read (commit handled by caller)."""
+        if not notification.is_read:
+            notification.is_read = True
+            notification.updated_at = datetime.utcnow()
+            self._defer_mark_read(notification.id, notification.user_id, notification.updated_at)
+
+    def _defer_mark_read(self, notification_id: UUID, user_id: UUID, updated_at: datetime) -> None:
+        defer_feed_update(
+            self.db, lambda: notification_feed_cache.mark_read(user_id, notification_id, updated_at)
         )
-        result = await self.db.execute(stmt)
-        return result.rowcount > 0
 
     async def mark_all_read(self, user_id: UUID) -> int:
         """Mark all unread notifications for a user as read."""
@@ -82,4 +247,7 @@ class NotificationService:
             .values(is_read=True, updated_at=datetime.utcnow())
         )
         result = await self.db.execute(stmt)
+        if result.rowcount:
+            # Cheaper to re-warm on the next poll than to rewrite every cached item
+            defer_feed_update(self.db, lambda: notification_feed_cache.invalidate(user_id))
         return result.rowcount
@@ -12,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from typing import List
 
-from app.core.security import hash_password, pii_encryption
+from app.core.security import hash_password_async, pii_encryption
 from app.models.user import Invitation, Organization, User
 from app.services.email import send_invitation_email
 
@@ -152,7 +152,7 @@ class OrganizationService:
 
         new_user = User(
             email=invitation.email,
-            password_hash=hash_password(password),
+            password_hash=await hash_password_async(password),
             full_name=pii_encryption.encrypt(full_name),
             role=invitation.role,
             organization_id=invitation.organization_id,
@@ -0,0 +1,234 @@
+"""Bulk Patient Import
+
+Hospitals onboard their existing patients by uploading a CSV or NDJSON file
+(POST /patients/imports). The upload is parked in MinIO and the
+import_patients Celery task loads it in batches of PATIENT_IMPORT_BATCH_SIZE
+rows:
+
+    validate   every row against PatientCreate; failures go to the report
+    encrypt    the batch's PII, split across a process pool
+    MRNs       one block reservation per batch (allocate_mrns_sync)
+    insert     one multi-row INSERT per batch, committed with the progress
+
+Patients are created as records only: no login accounts (and so no bcrypt)
+are made for imported rows. A single audit entry covers the whole import.
+"""
+
+import csv
+import io
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.audit import AuditLog
+from app.models.patient import Patient
+from app.models.patient_import import PatientImport
+from app.schemas.patient import PatientCreate
+from app.services.patient_service import PatientService, allocate_mrns_sync
+
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Flat CSV columns for the nested fields (camelCase or snake_case headers)
+_CSV_ADDRESS = {
+    "street": "street", "city": "city", "state": "state",
+    "zipCode": "zip_code", "zip_code": "zip_code",
+}
+_CSV_EMERGENCY_CONTACT = {
+    "emergencyContactName": "name", "emergency_contact_name": "name",
+    "emergencyContactRelationship": "relationship", "emergency_contact_relationship": "relationship",
+    "emergencyContactPhone": "phone_number", "emergency_contact_phone": "phone_number",
+}
+_CSV_LISTS = ("allergies", "medications")  # Semicolon-separated
+
+
+def import_format(file_name: str) -> Optional[str]:
+    """'csv' or 'ndjson' from the upload's extension, None if unsupported"""
+    for extension, file_format in IMPORT_FORMATS.items():
+        if file_name.lower().endswith(extension):
+            return file_format
+    return None
+
+
+def csv_row_to_payload(row: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """Turn a flat CSV record into the nested shape PatientCreate expects"""
+    payload: Dict[str, Any] = {}
+    address: Dict[str, str] = {}
+    contact: Dict[str, str] = {}
+    for column, value in row.items():
+        if column is None:  # More values than headers
+            continue
+        column, value = column.strip(), (value or "").strip()
+        if not value:
+            continue
+        if column in _CSV_ADDRESS:
+            address[_CSV_ADDRESS[column]] = value
+        elif column in _CSV_EMERGENCY_CONTACT:
+            contact[_CSV_EMERGENCY_CONTACT[column]] = value
+        elif column in _CSV_LISTS:
+            payload[column] = [item.strip() for item in value.split(";") if item.strip()]
+        else:
+            payload[column] = value
+    if address:
+        payload["address"] = address
+    if contact:
+        payload["emergency_contact"] = contact
+    return payload
+
+
+def parse_rows(data: bytes, file_format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    (row number, payload, error) for every record of an upload.
+
+    Rows are numbered from 1 in file order, skipping the CSV header and
+    blank NDJSON lines. Raises ValueError when the file is not UTF-8.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"File is not UTF-8 encoded: {e}")
+
+    if file_format == "csv":
+        for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+            yield number, csv_row_to_payload(row), None
+        return
+
+    lines = (line for line in text.splitlines() if line.strip())
+    for number, line in enumerate(lines, start=1):
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(payload, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, payload, None
+
+
+def validate_row(payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """(patient fields, None) for a valid row, (None, error message) otherwise"""
+    try:
+        patient = PatientCreate.model_validate(payload)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+        )
+    return patient.model_dump(by_alias=False), None
+
+
+def _encrypt_chunk(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Module level so the process pool can pickle it
+    service = PatientService(None)
+    return [service.encrypt_patient_data(row) for row in rows]
+
+
+def encrypt_rows(rows: List[Dict[str, Any]], pool: Optional[ProcessPoolExecutor]) -> List[Dict[str, Any]]:
+    """Encrypt a batch, one chunk per pool worker (inline without a pool)"""
+    if pool is None or len(rows) < 2:
+        return _encrypt_chunk(rows)
+    size = -(-len(rows) // settings.PATIENT_IMPORT_ENCRYPT_WORKERS)
+    chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+    return [row for chunk in pool.map(_encrypt_chunk, chunks) for row in chunk]
+
+
+def _encryption_pool() -> Optional[ProcessPoolExecutor]:
+    if settings.PATIENT_IMPORT_ENCRYPT_WORKERS <= 1:
+        return None
+    # spawn: forking a gevent-patched Celery worker is not safe
+    return ProcessPoolExecutor(
+        max_workers=settings.PATIENT_IMPORT_ENCRYPT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def import_batch(db: Session, job: PatientImport, batch, pool: Optional[ProcessPoolExecutor]) -> None:
+    """Validate, encrypt and insert one batch of (row, payload, error), then record progress"""
+    valid: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for number, payload, error in batch:
+        if payload is not None:
+            payload, error = validate_row(payload)
+        if error:
+            errors.append({"row": number, "error": error})
+        else:
+            valid.append(payload)
+
+    if valid:
+        mrns = allocate_mrns_sync(job.organization_id, len(valid))
+        db.execute(insert(Patient), [
+            {**row, "mrn": mrn, "organization_id": job.organization_id, "created_by": job.created_by}
+            for row, mrn in zip(encrypt_rows(valid, pool), mrns)
+        ])
+
+    job.processed_rows += len(batch)
+    job.imported_rows += len(valid)
+    job.failed_rows += len(errors)
+    room = settings.PATIENT_IMPORT_MAX_ERRORS - len(job.errors)
+    if errors and room > 0:
+        job.errors = job.errors + errors[:room]  # New list: JSONB changes are not tracked in place
+    db.commit()
+
+
+def run_patient_import(db: Session, import_id: UUID) -> str:
+    """Load a pending import from a Celery worker; returns the final status"""
+    from app.services.minio_service import minio_service
+
+    job = db.get(PatientImport, import_id)
+    if not job or job.status != "pending":
+        return "skipped"
+
+    job.status = "processing"
+    job.started_at = datetime.now(timezone.utc)
+    db.commit()
+
+    pool = None
+    try:
+        data = minio_service.get_file_bytes(settings.MINIO_BUCKET_UPLOADS, job.storage_path)
+        if data is None:
+            raise ValueError("Uploaded file is no longer available")
+        rows = list(parse_rows(data, job.file_format))
+        del data
+        job.total_rows = len(rows)
+        db.commit()
+
+        pool = _encryption_pool()
+        size = settings.PATIENT_IMPORT_BATCH_SIZE
+        for start in range(0, len(rows), size):
+            import_batch(db, job, rows[start:start + size], pool)
+
+        job.status = "completed"
+    except Exception as e:
+        db.rollback()
+        print(f"[PatientImport] Import {import_id} failed after {job.processed_rows} rows: {e}")
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    job.completed_at = datetime.now(timezone.utc)
+    db.add(AuditLog(
+        user_id=job.created_by,
+        organization_id=job.organization_id,
+        action="bulk_import",
+        resource_type="patient",
+        metadata_={
+            "import_id": str(job.id),
+            "status": job.status,
+            "imported": job.imported_rows,
+            "failed": job.failed_rows,
+        },
+    ))
+    db.commit()
+
+    # The upload holds plaintext PHI: keep it only while it is being imported
+    minio_service.delete_file(settings.MINIO_BUCKET_UPLOADS, job.storage_path)
+    return job.status
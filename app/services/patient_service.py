@@ -5,13 +5,39 @@ from datetime import date, datetime
 from typing import Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import func, select, desc
+from sqlalchemy import func, select, desc, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.security import PIIEncryption
 from app.models.patient import Patient
 
+_RESERVE_MRNS = text(
+    "UPDATE mrn_counters SET next_value = next_value + :n WHERE organization_id = :org "
+    "RETURNING org_code, next_value - :n AS first_value"
+)
+_CREATE_MRN_COUNTER = text(
+    "INSERT INTO mrn_counters (organization_id) VALUES (:org) ON CONFLICT (organization_id) DO NOTHING"
+)
+
+
+def format_mrns(org_code: int, first_value: int, count: int) -> List[str]:
+    # The org code makes MRNs globally unique without a global counter
+    return [f"ORG-{org_code:04d}-{first_value + i:06d}" for i in range(count)]
+
+
+def allocate_mrns_sync(organization_id: UUID, count: int) -> List[str]:
+    """PatientService.allocate_mrns for Celery workers (psycopg2 engine)"""
+    from app.database import _sync_engine
+
+    params = {"org": organization_id, "n": count}
+    with _sync_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        row = conn.execute(_RESERVE_MRNS, params).first()
+        if row is None:
+            conn.execute(_CREATE_MRN_COUNTER, params)
+            row = conn.execute(_RESERVE_MRNS, params).first()
+    return format_mrns(row.org_code, row.first_value, count)
+
 
 class PatientService:
     def __init__(self, db: AsyncSession):
@@ -20,24 +46,33 @@ class PatientService:
 
     async def generate_mrn(self, organization_id: UUID) -> str:
         """
-        Generate sequential MRN for an organization
-        Format: ORG-{YEAR}-{SEQUENCE}
-        Example: ORG-2024-000001
+        Next MRN for an organization
+        Format: ORG-{ORG_CODE}-{SEQUENCE}
+        Example: ORG-0007-000001
         """
-        # Get count of patients for this org to determine sequence
-        # Note: This is a simple implementation. In high concurrency, 
-        # use a dedicated sequence or Redis counter.
-        # Get global count to satisfy unique constraint on mrn column
-        stmt = select(func.count()).select_from(Patient)
-        count = await self.db.scalar(stmt)
-        sequence = (count or 0) + 1
-        year = datetime.now().year
-        
-        # In a real app, you might want a custom prefix per org.
-        # Added random suffix to prevent collisions with deleted records or multiple orgs
-        import random
-        random_suffix = "".join(random.choices("0123456789", k=4))
-        return f"ORG-{year}-{sequence:06d}-{random_suffix}"
+        return (await self.allocate_mrns(organization_id, 1))[0]
+
+    async def allocate_mrns(self, organization_id: UUID, count: int) -> List[str]:
+        """
+        Reserve `count` consecutive MRNs for an organization in one round trip.
+
+        Runs on its own autocommit connection, so like nextval() the counter
+        row is locked only for the UPDATE, not until the caller commits; the
+        numbers of a creation that rolls back are skipped, never reused. The
+        connection comes from the session's own engine (always the primary).
+        """
+        from app import database
+
+        params = {"org": organization_id, "n": count}
+        bind = self.db.bind if self.db is not None and self.db.bind is not None else database.engine
+        async with bind.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            row = (await conn.execute(_RESERVE_MRNS, params)).first()
+            if row is None:
+                # First patient of this organization
+                await conn.execute(_CREATE_MRN_COUNTER, params)
+                row = (await conn.execute(_RESERVE_MRNS, params)).first()
+        return format_mrns(row.org_code, row.first_value, count)
 
     def encrypt_patient_data(self, data: Dict) -> Dict:
         """Encrypt PII fields in patient data dictionary"""
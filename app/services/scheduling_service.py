@@ -0,0 +1,322 @@
+"""Doctor availability: free/busy intervals and slot finding
+
+A doctor is busy during their scheduled calendar events (appointments and
+custom events; task due dates do not block time) and during every open
+appointment request, which holds its slot before it is accepted.
+
+    schedule:busy:{doctor_id}   JSON {"from", "to", "busy": [[start, end], ...]}
+                                merged busy intervals (epoch seconds) for the
+                                scheduling horizon, SCHEDULING_CACHE_TTL_SECONDS
+
+The cache is dropped by CalendarService whenever an appointment or event of
+the doctor changes, once the change commits (defer_busy_invalidation), so a
+concurrent read cannot re-cache the state from before it. Booking conflict checks read the database for the one
+slot instead, so they never see a stale entry. A Redis outage only means
+falling back to the database.
+
+Free slots sit on a SCHEDULING_SLOT_MINUTES grid inside working hours in the
+organization's timezone.
+"""
+
+import asyncio
+import json
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+import pytz
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.redis import get_redis
+from app.models.appointment import Appointment
+from app.models.calendar_event import CalendarEvent
+from app.models.user import Organization, User
+
+# Appointment requests that hold their slot
+OPEN_APPOINTMENT_STATUSES = ("pending", "pending_hospital_approval", "accepted", "approved")
+
+
+def _key(doctor_id: UUID) -> str:
+    return f"schedule:busy:{doctor_id}"
+
+
+def _utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:  # Naive datetimes are UTC throughout the API
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def _ts(moment: datetime) -> float:
+    return _utc(moment).timestamp()
+
+
+def _dt(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+class BusyIntervals:
+    """
+    A doctor's busy time as sorted, merged, disjoint [start, end) intervals.
+
+    Overlap queries are two bisections over the start and end arrays,
+    O(log n), which is all an interval tree would give here since merged
+    intervals never nest.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[float, float]] = ()):
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, start: float, end: float) -> Optional[Tuple[float, float]]:
+        """The busy interval overlapping [start, end), if any"""
+        i = bisect_right(self.starts, start) - 1
+        if i >= 0 and self.ends[i] > start:
+            return self.starts[i], self.ends[i]
+        j = bisect_left(self.starts, start)
+        if j < len(self.starts) and self.starts[j] < end:
+            return self.starts[j], self.ends[j]
+        return None
+
+    def is_free(self, start: float, end: float) -> bool:
+        return self.overlapping(start, end) is None
+
+    def to_list(self) -> List[List[float]]:
+        return [[start, end] for start, end in zip(self.starts, self.ends)]
+
+
+async def load_busy_intervals(
+    db: AsyncSession, doctor_ids: List[UUID], start: datetime, end: datetime
+) -> Dict[UUID, BusyIntervals]:
+    """Busy intervals overlapping [start, end) straight from the database, two queries for all doctors"""
+    slot = timedelta(minutes=settings.SCHEDULING_SLOT_MINUTES)
+    raw: Dict[UUID, List[Tuple[float, float]]] = {doctor_id: [] for doctor_id in doctor_ids}
+
+    events = await db.execute(
+        select(CalendarEvent.user_id, CalendarEvent.start_time, CalendarEvent.end_time).where(
+            CalendarEvent.user_id.in_(doctor_ids),
+            CalendarEvent.status == "scheduled",
+            CalendarEvent.event_type != "task",
+            CalendarEvent.start_time < end,
+            CalendarEvent.end_time > start,
+        )
+    )
+    for doctor_id, event_start, event_end in events.all():
+        raw[doctor_id].append((_ts(event_start), _ts(event_end)))
+
+    # Appointment requests last one slot (same length as their calendar events)
+    requests = await db.execute(
+        select(Appointment.doctor_id, Appointment.requested_date).where(
+            Appointment.doctor_id.in_(doctor_ids),
+            Appointment.status.in_(OPEN_APPOINTMENT_STATUSES),
+            Appointment.requested_date < end,
+            Appointment.requested_date > start - slot,
+        )
+    )
+    for doctor_id, requested in requests.all():
+        raw[doctor_id].append((_ts(requested), _ts(requested + slot)))
+
+    return {doctor_id: BusyIntervals(intervals) for doctor_id, intervals in raw.items()}
+
+
+async def invalidate_busy_intervals(*doctor_ids: UUID) -> None:
+    """Drop cached busy intervals now"""
+    try:
+        await get_redis().delete(*(_key(doctor_id) for doctor_id in doctor_ids))
+    except Exception as e:
+        print(f"Busy interval cache invalidation failed: {e}")
+
+
+_PENDING_KEY = "busy_interval_invalidations"
+_background_tasks: set = set()
+
+
+def defer_busy_invalidation(db: AsyncSession, *doctor_ids: UUID) -> None:
+    """Drop the doctors' cached busy intervals once the session's transaction commits"""
+    db.sync_session.info.setdefault(_PENDING_KEY, set()).update(doctor_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_busy_invalidations(session: Session) -> None:
+    doctor_ids = session.info.pop(_PENDING_KEY, None)
+    if not doctor_ids:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Sync session outside an event loop; entries expire on their own
+
+    task = loop.create_task(invalidate_busy_intervals(*doctor_ids))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_busy_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class SchedulingService:
+    """Free/busy lookups and slot finding for doctors"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _cache_window() -> Tuple[datetime, datetime]:
+        # Day-aligned so entries cached during the day stay usable
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=1), today + timedelta(days=settings.SCHEDULING_HORIZON_DAYS + 1)
+
+    async def get_busy(
+        self, doctor_ids: List[UUID], start: datetime, end: datetime
+    ) -> Dict[UUID, BusyIntervals]:
+        """Busy intervals of several doctors, cached when [start, end) lies in the horizon"""
+        window_start, window_end = self._cache_window()
+        if _ts(start) < window_start.timestamp() or _ts(end) > window_end.timestamp():
+            return await load_busy_intervals(self.db, doctor_ids, start, end)
+
+        busy: Dict[UUID, BusyIntervals] = {}
+        try:
+            cached = await get_redis().mget([_key(doctor_id) for doctor_id in doctor_ids])
+        except Exception as e:
+            print(f"Busy interval cache read failed: {e}")
+            cached = [None] * len(doctor_ids)
+        for doctor_id, raw in zip(doctor_ids, cached):
+            if raw:
+                entry = json.loads(raw)
+                if entry["from"] <= window_start.timestamp() and entry["to"] >= window_end.timestamp():
+                    busy[doctor_id] = BusyIntervals(map(tuple, entry["busy"]))
+
+        missing = [doctor_id for doctor_id in doctor_ids if doctor_id not in busy]
+        if missing:
+            loaded = await load_busy_intervals(self.db, missing, window_start, window_end)
+            busy.update(loaded)
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    for doctor_id, intervals in loaded.items():
+                        entry = {
+                            "from": window_start.timestamp(),
+                            "to": window_end.timestamp(),
+                            "busy": intervals.to_list(),
+                        }
+                        pipe.set(_key(doctor_id), json.dumps(entry), ex=settings.SCHEDULING_CACHE_TTL_SECONDS)
+                    await pipe.execute()
+            except Exception as e:
+                print(f"Busy interval cache write failed: {e}")
+        return busy
+
+    async def find_conflict(
+        self, doctor_id: UUID, start: datetime, end: Optional[datetime] = None
+    ) -> Optional[Tuple[datetime, datetime]]:
+        """
+        The doctor's busy interval overlapping [start, end) (one slot by
+        default), or None. Reads the database, not the cache: use it to guard
+        bookings.
+        """
+        end = end or start + timedelta(minutes=settings.SCHEDULING_SLOT_MINUTES)
+        busy = (await load_busy_intervals(self.db, [doctor_id], start, end))[doctor_id]
+        overlap = busy.overlapping(_ts(start), _ts(end))
+        return (_dt(overlap[0]), _dt(overlap[1])) if overlap else None
+
+    async def _org_tz(self, organization_id: UUID):
+        tz_name = await self.db.scalar(select(Organization.timezone).where(Organization.id == organization_id))
+        try:
+            return pytz.timezone(tz_name or "UTC")
+        except Exception:
+            return pytz.UTC
+
+    @staticmethod
+    def slot_grid(tz, after: datetime, until: datetime) -> Iterator[datetime]:
+        """Working-hour slot starts (UTC) in [after, until), on the organization's local grid"""
+        slot = timedelta(minutes=settings.SCHEDULING_SLOT_MINUTES)
+        workdays = {int(day) for day in settings.SCHEDULING_WORKDAYS.split(",") if day.strip()}
+        after_ts, until_ts = _ts(after), _ts(until)
+        day = _dt(after_ts).astimezone(tz).date()
+        while tz.localize(datetime.combine(day, time.min)).timestamp() < until_ts:
+            if day.weekday() in workdays:
+                local = datetime.combine(day, time.min) + timedelta(hours=settings.SCHEDULING_WORKDAY_START_HOUR)
+                day_end = datetime.combine(day, time.min) + timedelta(hours=settings.SCHEDULING_WORKDAY_END_HOUR)
+                while local + slot <= day_end:
+                    start = tz.localize(local).astimezone(pytz.UTC)
+                    if start.timestamp() >= until_ts:
+                        return
+                    if start.timestamp() >= after_ts:
+                        yield start
+                    local += slot
+            day += timedelta(days=1)
+
+    async def free_slots(
+        self, organization_id: UUID, doctor_id: UUID, start: datetime, end: datetime
+    ) -> List[Dict[str, datetime]]:
+        """Every free slot of one doctor in [start, end)"""
+        slot = timedelta(minutes=settings.SCHEDULING_SLOT_MINUTES)
+        tz = await self._org_tz(organization_id)
+        busy = (await self.get_busy([doctor_id], start, end))[doctor_id]
+        return [
+            {"start": slot_start, "end": slot_start + slot}
+            for slot_start in self.slot_grid(tz, start, end)
+            if busy.is_free(slot_start.timestamp(), (slot_start + slot).timestamp())
+        ]
+
+    async def next_free_slots(
+        self,
+        organization_id: UUID,
+        count: int,
+        after: Optional[datetime] = None,
+        department: Optional[str] = None,
+        doctor_id: Optional[UUID] = None,
+    ) -> List[Dict]:
+        """
+        The earliest `count` free slots across an organization's doctors
+        (optionally one department or one doctor), soonest first, within
+        SCHEDULING_HORIZON_DAYS.
+        """
+        query = select(User.id, User.department).where(
+            User.organization_id == organization_id,
+            User.role == "doctor",
+            User.deleted_at.is_(None),
+        )
+        if department:
+            query = query.where(User.department == department)
+        if doctor_id:
+            query = query.where(User.id == doctor_id)
+        doctors = (await self.db.execute(query.order_by(User.id))).all()
+        if not doctors:
+            return []
+
+        now = datetime.now(timezone.utc)
+        after = max(_utc(after), now) if after else now
+        until = now + timedelta(days=settings.SCHEDULING_HORIZON_DAYS)
+        slot = timedelta(minutes=settings.SCHEDULING_SLOT_MINUTES)
+        tz = await self._org_tz(organization_id)
+        busy = await self.get_busy([doctor.id for doctor in doctors], after, until)
+
+        slots = []
+        for slot_start in self.slot_grid(tz, after, until):
+            start_ts, end_ts = slot_start.timestamp(), (slot_start + slot).timestamp()
+            for doctor in doctors:
+                if busy[doctor.id].is_free(start_ts, end_ts):
+                    slots.append({
+                        "doctor_id": doctor.id,
+                        "department": doctor.department,
+                        "start": slot_start,
+                        "end": slot_start + slot,
+                    })
+                    if len(slots) == count:
+                        return slots
+        return slots
@@ -15,11 +15,13 @@ class StorageService:
     def __init__(self):
         """Initialize MinIO clients"""
         # Internal client for backend-to-MinIO communication
+        from app.core.metrics import minio_http_client
         self.client = Minio(
             settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ROOT_USER,
             secret_key=settings.MINIO_ROOT_PASSWORD,
-            secure=False
+            secure=False,
+            http_client=minio_http_client(),  # Times every request for /metrics
         )
 
         # Handle MINIO_EXTERNAL_ENDPOINT which may contain a path (e.g. saramedico.com/s3).
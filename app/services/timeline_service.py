@@ -0,0 +1,301 @@
+"""Document Timeline Service - AI-extracted, persisted document timelines"""
+
+import asyncio
+import base64
+import io
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.document import Document
+from app.models.document_timeline import DocumentTimeline
+
+# A 'pending' claim older than this is assumed abandoned (crashed worker)
+TIMELINE_CLAIM_TIMEOUT = timedelta(minutes=5)
+# How long a request waits for a timeline another request/worker is generating
+TIMELINE_WAIT_SECONDS = 20
+
+TIMELINE_SYSTEM_PROMPT = """\
+You are a clinical document analysis AI. Your task is to extract a structured timeline from the provided document.
+
+STRICT RULES:
+1. Extract ALL events that have a date or time reference — clinical, administrative, or otherwise.
+2. For every event you extract, provide a date (even if approximate like "2024-01", "~2023" or "Unknown").
+3. Classify each event into one of these types: lab, imaging, visit, medication, procedure, surgery, diagnosis, vaccination, other
+4. If the document is a medical report, focus on clinical events. If it has any dated entries, milestones, or references, include those too under type "other".
+5. Return ONLY valid JSON — no markdown fences, no explanation, no preamble.
+
+JSON format (array of events, sorted by date descending):
+[
+  {
+    "id": 1,
+    "date": "YYYY-MM-DD or YYYY-MM or YYYY or approximate",
+    "title": "Short event title (max 60 chars)",
+    "description": "Brief description of the event (max 120 chars)",
+    "type": "lab|imaging|visit|medication|procedure|surgery|diagnosis|vaccination|other",
+    "page": 1
+  }
+]
+
+If truly no events with any date or time reference can be found, return an empty array: []
+"""
+
+
+def _media_type(file_name: str) -> str:
+    fname = (file_name or "").lower()
+    if fname.endswith(".pdf"):
+        return "application/pdf"
+    if fname.endswith(".png"):
+        return "image/png"
+    if fname.endswith((".jpg", ".jpeg")):
+        return "image/jpeg"
+    if fname.endswith(".webp"):
+        return "image/webp"
+    return "application/pdf"  # safe fallback for unknown types
+
+
+def _build_messages(file_name: str, file_bytes: bytes) -> List[Dict[str, Any]]:
+    """Claude message for the document — images use vision, PDFs use extracted text"""
+    media_type = _media_type(file_name)
+    if media_type.startswith("image/"):
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": media_type,
+                            "data": base64.b64encode(file_bytes).decode("utf-8"),
+                        },
+                    },
+                    {
+                        "type": "text",
+                        "text": (
+                            f"Analyse this document image (file: {file_name}). "
+                            "Extract all timeline events with dates and return them as JSON."
+                        ),
+                    },
+                ],
+            }
+        ]
+
+    try:
+        from pypdf import PdfReader
+        reader = PdfReader(io.BytesIO(file_bytes))
+        text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        if not text.strip():
+            text = "[PDF contained no extractable text — may be a scanned image]"
+    except Exception as pdf_ex:
+        text = f"[Could not extract text from PDF: {pdf_ex}]"
+
+    print(f"[Timeline] Extracted {len(text)} chars from PDF: {file_name}")
+    return [
+        {
+            "role": "user",
+            "content": (
+                f"Analyse this document text (file: {file_name}):\n\n"
+                f"{text[:12000]}\n\n"
+                "Extract all timeline events with dates and return them as JSON."
+            ),
+        }
+    ]
+
+
+async def extract_timeline_events(file_name: str, file_bytes: bytes) -> List[Dict[str, Any]]:
+    """Run the document through Claude and normalise the returned events"""
+    from app.services.aws_service import aws_service
+
+    resp_body = await aws_service.invoke_cached(
+        {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 2048,
+            "system": TIMELINE_SYSTEM_PROMPT,
+            "messages": _build_messages(file_name, file_bytes),
+        },
+        kind="timeline",
+    )
+    raw_text = resp_body["content"][0]["text"].strip()
+    print(f"[Timeline] Claude raw response ({len(raw_text)} chars): {raw_text[:300]}")
+
+    # Strip optional code fences
+    if "```json" in raw_text:
+        raw_text = raw_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in raw_text:
+        raw_text = raw_text.split("```")[1].split("```")[0].strip()
+
+    events_raw = json.loads(raw_text)
+    if not isinstance(events_raw, list):
+        events_raw = []
+
+    return [
+        {
+            "id": i + 1,
+            "date": str(e.get("date", "Unknown")),
+            "title": str(e.get("title", "Event"))[:60],
+            "description": str(e.get("description", ""))[:120],
+            "type": str(e.get("type", "other")),
+            "page": int(e.get("page", 1)),
+        }
+        for i, e in enumerate(events_raw)
+    ]
+
+
+def _download(storage_path: str) -> bytes:
+    """Fetch raw document bytes from MinIO (blocking)"""
+    from app.services.storage_service import StorageService
+
+    storage = StorageService()
+    response_obj = storage.client.get_object(bucket_name=storage.bucket_name, object_name=storage_path)
+    try:
+        return response_obj.read()
+    finally:
+        response_obj.close()
+        response_obj.release_conn()
+
+
+def _claim_statement(document_id: UUID, version: datetime):
+    """
+    Take the generation claim for (document, version) unless an up-to-date
+    timeline exists or another live claim holds it. RETURNING is empty when
+    the claim was not taken.
+    """
+    stmt = pg_insert(DocumentTimeline).values(
+        document_id=document_id,
+        document_version=version,
+        status="pending",
+        claimed_at=func.now(),
+    )
+    current = DocumentTimeline.__table__.c
+    return stmt.on_conflict_do_update(
+        index_elements=[DocumentTimeline.document_id],
+        set_={
+            "document_version": stmt.excluded.document_version,
+            "status": "pending",
+            "events": None,
+            "error": None,
+            "claimed_at": func.now(),
+        },
+        where=or_(
+            current.document_version.is_distinct_from(stmt.excluded.document_version),
+            current.status == "failed",
+            and_(current.status == "pending", current.claimed_at < func.now() - TIMELINE_CLAIM_TIMEOUT),
+        ),
+    ).returning(DocumentTimeline.document_id)
+
+
+def _finish_statement(document_id: UUID, version: datetime, events=None, error: Optional[str] = None):
+    """Store the outcome, unless the document was replaced meanwhile"""
+    return (
+        update(DocumentTimeline)
+        .where(
+            DocumentTimeline.document_id == document_id,
+            DocumentTimeline.document_version == version,
+        )
+        .values(
+            status="failed" if error else "ready",
+            events=events,
+            error=error,
+            generated_at=func.now(),
+        )
+    )
+
+
+class TimelineService:
+    """Serve persisted timelines, generating each document version once"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _get(self, document: Document) -> Optional[DocumentTimeline]:
+        result = await self.db.execute(
+            select(DocumentTimeline)
+            .where(DocumentTimeline.document_id == document.id)
+            .execution_options(populate_existing=True)
+        )
+        timeline = result.scalar_one_or_none()
+        if timeline and timeline.document_version != document.uploaded_at:
+            return None  # Stale: the file was replaced
+        return timeline
+
+    async def get_or_generate(self, document: Document) -> Optional[DocumentTimeline]:
+        """
+        Return the document's ready timeline, generating it if needed.
+
+        Concurrent callers are single-flighted through a row claim: one
+        generates while the rest wait up to TIMELINE_WAIT_SECONDS for its
+        result (which may be a 'failed' row). Returns None if the timeline is
+        still being generated after that. Raises if this caller's generation
+        fails.
+        """
+        timeline = await self._get(document)
+        if timeline and timeline.status == "ready":
+            return timeline
+
+        claimed = (await self.db.execute(_claim_statement(document.id, document.uploaded_at))).first()
+        await self.db.commit()
+
+        if claimed:
+            try:
+                file_bytes = await asyncio.to_thread(_download, document.storage_path)
+                events = await extract_timeline_events(document.file_name, file_bytes)
+            except Exception as e:
+                await self.db.execute(_finish_statement(document.id, document.uploaded_at, error=str(e)))
+                await self.db.commit()
+                raise
+            await self.db.execute(_finish_statement(document.id, document.uploaded_at, events=events))
+            await self.db.commit()
+            return await self._get(document)
+
+        # Someone else is generating it
+        for _ in range(TIMELINE_WAIT_SECONDS):
+            await asyncio.sleep(1)
+            timeline = await self._get(document)
+            await self.db.commit()  # End the read transaction between polls
+            if timeline and timeline.status != "pending":
+                return timeline
+        return None
+
+    async def invalidate(self, document_id: UUID) -> None:
+        """Drop a document's timeline (caller commits)"""
+        await self.db.execute(delete(DocumentTimeline).where(DocumentTimeline.document_id == document_id))
+
+
+def generate_timeline_sync(db: Session, document_id: UUID) -> str:
+    """
+    Precompute a document's timeline from a Celery worker.
+
+    A no-op when the current version already has a timeline or another
+    worker/request holds the claim.
+    """
+    document = db.query(Document).filter(
+        Document.id == document_id, Document.deleted_at.is_(None)
+    ).first()
+    if not document:
+        return "missing"
+
+    claimed = db.execute(_claim_statement(document.id, document.uploaded_at)).first()
+    db.commit()
+    if not claimed:
+        return "skipped"
+
+    from app.workers.tasks import run_async
+
+    try:
+        events = run_async(extract_timeline_events(document.file_name, _download(document.storage_path)))
+    except Exception as e:
+        print(f"[Timeline] Precomputation failed for doc {document_id}: {e}")
+        db.execute(_finish_statement(document.id, document.uploaded_at, error=str(e)))
+        db.commit()
+        return "failed"
+
+    db.execute(_finish_statement(document.id, document.uploaded_at, events=events))
+    db.commit()
+    return "ready"
@@ -0,0 +1,141 @@
+"""Vector search over chunk embeddings, per configured storage mode
+
+`chunks.embedding` always keeps the full-precision vector(1536). What changes
+with settings.EMBEDDING_STORAGE_MODE is which HNSW index serves
+nearest-neighbour queries (and so how much RAM it needs):
+
+    vector    index on the float32 vectors                ~6 KB per chunk
+    halfvec   expression index on embedding::halfvec       ~3 KB per chunk
+    binary    expression index on binary_quantize(...)     ~200 B per chunk;
+              the top EMBEDDING_RERANK_FACTOR x limit candidates by Hamming
+              distance are re-ranked by exact cosine distance on the heap
+
+halfvec and binary need the pgvector extension >= 0.7 in Postgres. Indexes
+are built online with scripts/reindex_embeddings.py, and
+scripts/benchmark_embeddings.py compares recall and latency of the modes.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Float, cast, func, literal, text
+from sqlalchemy.sql import Select
+from sqlalchemy.types import UserDefinedType
+from pgvector.sqlalchemy import Vector
+
+from app.models.chunk import Chunk
+
+EMBEDDING_DIMENSIONS = 1536  # Titan Text Embeddings v1
+STORAGE_MODES = ("vector", "halfvec", "binary")
+
+# mode -> (index name, CREATE INDEX body after "CREATE INDEX [CONCURRENTLY] IF NOT EXISTS <name>")
+INDEX_DDL: Dict[str, Tuple[str, str]] = {
+    "vector": (
+        "ix_chunk_embedding",
+        "ON chunks USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)",
+    ),
+    "halfvec": (
+        "ix_chunk_embedding_halfvec",
+        f"ON chunks USING hnsw ((embedding::halfvec({EMBEDDING_DIMENSIONS})) halfvec_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)",
+    ),
+    "binary": (
+        "ix_chunk_embedding_binary",
+        f"ON chunks USING hnsw ((binary_quantize(embedding)::bit({EMBEDDING_DIMENSIONS})) bit_hamming_ops) "
+        "WITH (m = 16, ef_construction = 64)",
+    ),
+}
+
+
+class _HalfVec(UserDefinedType):
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_col_spec(self, **kw):
+        return f"HALFVEC({self.dim})"
+
+
+class _Bit(UserDefinedType):
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_col_spec(self, **kw):
+        return f"BIT({self.dim})"
+
+
+def _mode(mode: Optional[str]) -> str:
+    from app.config import settings
+
+    mode = mode or settings.EMBEDDING_STORAGE_MODE
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown EMBEDDING_STORAGE_MODE '{mode}'. Expected one of {STORAGE_MODES}")
+    return mode
+
+
+def cosine_distance(query_embedding: List[float]):
+    """Exact cosine distance on the full-precision column"""
+    return Chunk.embedding.cosine_distance(query_embedding)
+
+
+def index_distance(query_embedding: List[float], mode: Optional[str] = None):
+    """Distance expression matching the mode's index, so the planner can use it"""
+    mode = _mode(mode)
+    query = literal(query_embedding, Vector(EMBEDDING_DIMENSIONS))
+    if mode == "halfvec":
+        half = _HalfVec(EMBEDDING_DIMENSIONS)
+        return cast(Chunk.embedding, half).op("<=>", return_type=Float)(cast(query, half))
+    if mode == "binary":
+        bits = _Bit(EMBEDDING_DIMENSIONS)
+        return cast(func.binary_quantize(Chunk.embedding), bits).op("<~>", return_type=Float)(
+            cast(func.binary_quantize(query), bits)
+        )
+    return cosine_distance(query_embedding)
+
+
+def ef_search_statement(limit: int, mode: Optional[str] = None):
+    """
+    SET LOCAL hnsw.ef_search high enough for `limit` results (HNSW returns at
+    most ef_search rows; pgvector's default is 40). Execute it in the same
+    transaction, before the search query.
+    """
+    from app.config import settings
+
+    candidates = limit * settings.EMBEDDING_RERANK_FACTOR if _mode(mode) == "binary" else limit
+    return text(f"SET LOCAL hnsw.ef_search = {max(40, int(candidates))}")
+
+
+def rank_by_similarity(
+    stmt: Select,
+    query_embedding: List[float],
+    limit: int,
+    mode: Optional[str] = None,
+) -> Select:
+    """
+    Order a chunk query by similarity to `query_embedding` and keep `limit`
+    rows, nearest first, using the index of the configured storage mode.
+    `stmt` holds the columns, joins and filters.
+    """
+    from app.config import settings
+
+    mode = _mode(mode)
+    stmt = stmt.where(Chunk.embedding.isnot(None))
+
+    if mode == "binary":
+        # Coarse pass on the bit index, exact re-rank of the survivors
+        shortlist = (
+            stmt.with_only_columns(Chunk.id)
+            .order_by(None)
+            .order_by(index_distance(query_embedding, mode))
+            .limit(limit * settings.EMBEDDING_RERANK_FACTOR)
+        )
+        return (
+            stmt.where(Chunk.id.in_(shortlist))
+            .order_by(None)
+            .order_by(cosine_distance(query_embedding))
+            .limit(limit)
+        )
+
+    return stmt.order_by(None).order_by(index_distance(query_embedding, mode)).limit(limit)
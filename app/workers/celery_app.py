@@ -1,6 +1,7 @@
 """Celery Workers and Background Tasks"""
 
 from celery import Celery
+from celery.schedules import crontab
 
 from app.config import settings
 
@@ -22,5 +23,55 @@ celery_app.conf.update(
     task_time_limit=1800,  # 30 minutes max
 )
 
+# Periodic tasks (run by the celery_beat service)
+celery_app.conf.beat_schedule = {
+    "rollup-audit-stats": {
+        "task": "app.workers.tasks.rollup_audit_stats",
+        "schedule": crontab(minute=15),  # Hourly, so a new day is rolled up shortly after midnight UTC
+    },
+    "check-for-upcoming-reminders": {
+        "task": "app.workers.tasks.check_for_upcoming_reminders",
+        "schedule": 60.0,  # Matches the task's 10-11 minute look-ahead window
+    },
+    "ingest-meeting-transcripts": {
+        "task": "app.workers.tasks.ingest_meeting_transcripts",
+        "schedule": 60.0,  # Google Meet usually uploads transcripts a few minutes after the call
+    },
+}
+
 # Auto-discover tasks
 celery_app.autodiscover_tasks(['app.workers'])
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+# Task durations per task and final state, served on CELERY_METRICS_PORT
+import time
+
+from celery.signals import task_postrun, task_prerun, worker_init
+
+_task_started = {}
+
+
+@worker_init.connect
+def _start_metrics_server(**kwargs):
+    if settings.CELERY_METRICS_PORT:
+        from prometheus_client import start_http_server
+        from app.core.metrics import metrics_registry
+        start_http_server(settings.CELERY_METRICS_PORT, registry=metrics_registry())
+
+
+@task_prerun.connect
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    from app.core.metrics import CELERY_TASK_DURATION, update_db_pool_metrics
+    CELERY_TASK_DURATION.labels(task.name if task else "unknown", state or "UNKNOWN").observe(
+        time.perf_counter() - started
+    )
+    update_db_pool_metrics(include_async=False)
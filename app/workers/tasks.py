@@ -69,17 +69,45 @@ def process_document_task(document_id_str: str):
     finally:
         db.close()
 
+    # Final pipeline tier: precompute the AI timeline so the first view is instant
+    generate_document_timeline.delay(document_id_str)
+
+
+@celery_app.task(name="app.workers.tasks.generate_document_timeline")
+def generate_document_timeline(document_id_str: str) -> str:
+    """Extract and store the AI timeline of a document's current version"""
+    from app.database import SyncSessionLocal
+    from app.services.timeline_service import generate_timeline_sync
+
+    db = SyncSessionLocal()
+    try:
+        return generate_timeline_sync(db, UUID(document_id_str))
+    finally:
+        db.close()
+
+# ─────────────────────────────────────────────────────────
+# Bulk Patient Import Task
+# ─────────────────────────────────────────────────────────
+
+@celery_app.task(name="app.workers.tasks.import_patients")
+def import_patients(import_id: str) -> str:
+    """Load an uploaded CSV/NDJSON patient file (see patient_import_service)"""
+    from app.database import SyncSessionLocal
+    from app.services.patient_import_service import run_patient_import
+
+    db = SyncSessionLocal()
+    try:
+        return run_patient_import(db, UUID(import_id))
+    finally:
+        db.close()
+
+
 # ─────────────────────────────────────────────────────────
 # SOAP Note Generation Task
 # ─────────────────────────────────────────────────────────
 
-@celery_app.task(
-    name="app.workers.tasks.generate_soap_note",
-    bind=True,
-    max_retries=10,
-    default_retry_delay=30,
-)
-def generate_soap_note(self, consultation_id: str) -> dict:
+@celery_app.task(name="app.workers.tasks.generate_soap_note")
+def generate_soap_note(consultation_id: str) -> dict:
     """
     Background task to generate a SOAP note for a completed consultation.
 
@@ -87,11 +115,11 @@ def generate_soap_note(self, consultation_id: str) -> dict:
     It will NEVER fall back to mock/demo data as that would produce fabricated clinical records.
 
     Flow:
-    1. Verify the consultation has a google_event_id (i.e., a real meeting was scheduled).
-    2. Attempt to fetch the real transcript from Google Drive (attached to the Calendar event).
-    3. If transcript is not ready yet, retry up to 3 times (90s total).
-    4. If no transcript is available after retries → set ai_status = "no_transcript" and STOP.
-    5. If real transcript found → send to AWS Bedrock and save SOAP note.
+    1. Use the transcript already stored by ingest_meeting_transcripts, if any.
+    2. Otherwise (manual trigger) check Google Drive once. If the transcript is
+       not there yet, hand the consultation back to the watcher by setting
+       ai_status = "awaiting_transcript" and STOP.
+    3. Send the transcript to AWS Bedrock and save the SOAP note.
     """
     from app.database import SyncSessionLocal
     from app.models.consultation import Consultation
@@ -105,49 +133,36 @@ def generate_soap_note(self, consultation_id: str) -> dict:
         if not consultation:
             return {"status": "failed", "reason": f"Consultation {consultation_id} not found"}
 
+        transcript_text = consultation.transcript
+
         # 2. Safety check: No real meeting = no transcript = no SOAP note
-        if not consultation.google_event_id:
+        if not transcript_text and not consultation.google_event_id:
             print(f"[generate_soap_note] ⚠ Consultation {consultation_id} has no google_event_id. "
                   "Cannot generate SOAP note without a real meeting transcript.")
             consultation.ai_status = "no_transcript"
             db.commit()
             return {"status": "no_transcript", "reason": "No Google Meet event associated with this consultation"}
 
-        # 3. Mark as processing
-        consultation.ai_status = "processing"
-        db.commit()
-
-        # 4. Attempt to fetch REAL transcript from Google Drive
-        transcript_text = None
-        try:
-            transcript_text = run_async(google_meet_service.get_meeting_transcript(consultation.google_event_id))
-        except Exception as e:
-            print(f"[generate_soap_note] Error fetching transcript: {e}")
+        # 3. Not ingested yet: one direct Drive check, otherwise leave it to the watcher
+        if not transcript_text:
+            try:
+                transcript_text = run_async(google_meet_service.get_meeting_transcript(consultation.google_event_id))
+            except Exception as e:
+                print(f"[generate_soap_note] Error fetching transcript: {e}")
 
-        # 5. Handle missing transcript — retry a few times or fail gracefully
-        if not transcript_text or not transcript_text.strip():
-            print(f"[generate_soap_note] No transcript found yet for Event ID: {consultation.google_event_id}.")
+            if not transcript_text or not transcript_text.strip():
+                print(f"[generate_soap_note] No transcript yet for Event ID: {consultation.google_event_id}. "
+                      "Waiting for the transcript watcher.")
+                consultation.ai_status = "awaiting_transcript"
+                db.commit()
+                return {"status": "awaiting_transcript", "consultation_id": consultation_id}
 
-            if self.request.retries < self.max_retries:
-                retry_attempt = self.request.retries + 1
-                print(f"[generate_soap_note] Retrying in 30s (Attempt {retry_attempt}/{self.max_retries})...")
-                raise self.retry(countdown=30)
+            consultation.transcript = transcript_text
 
-            # All retries exhausted — meeting had no transcript (e.g., no speech, or transcription disabled)
-            print(f"[generate_soap_note] ⚠ No real transcript available after all retries. "
-                  "Marking as 'no_transcript'. No SOAP note will be generated.")
-            consultation.ai_status = "no_transcript"
-            db.commit()
-            return {
-                "status": "no_transcript",
-                "reason": (
-                    "No transcript was captured for this meeting. "
-                    "Ensure Google Meet transcription is enabled and that the meeting "
-                    "contained actual spoken conversation."
-                )
-            }
+        consultation.ai_status = "processing"
+        db.commit()
 
-        # 6. Real transcript found — build patient context
+        # 4. Real transcript found — build patient context
         print(f"[generate_soap_note] ✅ Real transcript found! Sending to AWS Bedrock...")
         patient_info = None
         if consultation.patient_id:
@@ -156,18 +171,18 @@ def generate_soap_note(self, consultation_id: str) -> dict:
                 "scheduled_at": consultation.scheduled_at.isoformat() if consultation.scheduled_at else None,
             }
 
-        # 7. Generate SOAP note via AWS Bedrock (Claude 3.5 Sonnet)
+        # 5. Generate SOAP note via AWS Bedrock (Claude 3.5 Sonnet)
         try:
             soap_note = run_async(aws_service.generate_soap_note(
                 transcript=transcript_text,
                 patient_info=patient_info
             ))
 
-            # 8. Persist results
-            consultation.transcript = transcript_text
+            # 6. Persist results
             consultation.soap_note = soap_note
             consultation.ai_status = "completed"
             db.commit()
+            index_consultation.delay(consultation_id)
 
             print(f"[generate_soap_note] ✅ SOAP note generated for consultation {consultation_id}")
             return {"status": "completed", "consultation_id": consultation_id}
@@ -185,6 +200,146 @@ def generate_soap_note(self, consultation_id: str) -> dict:
         db.close()
 
 
+@celery_app.task(name="app.workers.tasks.index_consultation")
+def index_consultation(consultation_id: str) -> dict:
+    """
+    Embed a consultation's SOAP note, diagnosis and prescription into the
+    chunks table so chat retrieval can find it (see consultation_indexer).
+    """
+    from app.database import SyncSessionLocal
+    from app.services.consultation_indexer import index_consultation_sync
+
+    db = SyncSessionLocal()
+    try:
+        count = index_consultation_sync(db, UUID(consultation_id))
+        print(f"[index_consultation] Indexed {count} chunk(s) for consultation {consultation_id}")
+        return {"status": "indexed", "chunks": count}
+    except Exception as e:
+        db.rollback()
+        print(f"[index_consultation] ❌ Failed for consultation {consultation_id}: {e}")
+        return {"status": "failed", "reason": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.workers.tasks.ingest_meeting_transcripts")
+def ingest_meeting_transcripts(batch_size: int = 200) -> str:
+    """
+    Periodic sweep over consultations with ai_status = "awaiting_transcript".
+
+    Looks up all of their Google Meet transcripts in one batched pass, stores
+    each transcript found on Consultation.transcript and queues SOAP note
+    generation. Consultations still without a transcript after
+    TRANSCRIPT_WAIT_MINUTES are marked "no_transcript".
+    """
+    from collections import defaultdict
+    from sqlalchemy import and_, func, or_, select, update
+    from app.config import settings
+    from app.database import SyncSessionLocal
+    from app.models.consultation import Consultation
+    from app.services.google_meet_service import google_meet_service
+
+    awaiting = and_(
+        Consultation.ai_status == "awaiting_transcript",
+        Consultation.deleted_at.is_(None),
+    )
+
+    db = SyncSessionLocal()
+    try:
+        expired = db.execute(
+            update(Consultation)
+            .where(
+                awaiting,
+                or_(
+                    Consultation.google_event_id.is_(None),
+                    Consultation.updated_at < func.now() - timedelta(minutes=settings.TRANSCRIPT_WAIT_MINUTES),
+                ),
+            )
+            .values(ai_status="no_transcript")
+        ).rowcount
+
+        pending = db.execute(
+            select(Consultation.id, Consultation.google_event_id, Consultation.scheduled_at)
+            .where(awaiting)
+            .order_by(Consultation.updated_at)
+            .limit(batch_size)
+        ).all()
+        db.commit()
+
+        if not pending:
+            return f"No consultations awaiting transcripts ({expired} expired)"
+
+        consultations_by_event = defaultdict(list)
+        scheduled_by_event = {}
+        for consultation_id, google_event_id, scheduled_at in pending:
+            consultations_by_event[google_event_id].append(consultation_id)
+            scheduled_by_event[google_event_id] = scheduled_at
+
+        try:
+            transcripts = run_async(google_meet_service.find_transcripts(list(scheduled_by_event.items())))
+        except Exception as e:
+            print(f"[ingest_meeting_transcripts] Transcript lookup failed: {e}")
+            return f"Transcript lookup failed for {len(pending)} consultation(s): {e}"
+
+        ready = []
+        for google_event_id, transcript_text in transcripts.items():
+            ready += db.execute(
+                update(Consultation)
+                .where(awaiting, Consultation.id.in_(consultations_by_event[google_event_id]))
+                .values(transcript=transcript_text, ai_status="processing")
+                .returning(Consultation.id)
+            ).scalars().all()
+        db.commit()
+
+        for consultation_id in ready:
+            generate_soap_note.delay(str(consultation_id))
+
+        return (
+            f"Ingested {len(ready)} transcript(s); {len(pending) - len(ready)} still awaiting, "
+            f"{expired} expired"
+        )
+    finally:
+        db.close()
+
+
+
+# ─────────────────────────────────────────────────────────
+# Compliance Rollup Tasks
+# ─────────────────────────────────────────────────────────
+
+@celery_app.task(name="app.workers.tasks.rollup_audit_stats")
+def rollup_audit_stats(days: int = 2) -> str:
+    """
+    Periodic task maintaining audit_daily_rollups for get_compliance_stats.
+
+    Re-rolls the last `days` completed days (to absorb late audit writes)
+    and every day since the newest existing rollup, so days missed while
+    beat or the workers were down are caught up. On the very first run it
+    backfills AUDIT_ROLLUP_BACKFILL_DAYS instead.
+    """
+    from sqlalchemy import func, select
+    from app.config import settings
+    from app.database import SyncSessionLocal
+    from app.models.audit import AuditDailyRollup
+    from app.services.audit_service import rollup_audit_day
+
+    db = SyncSessionLocal()
+    try:
+        today = datetime.utcnow().date()
+        newest = db.scalar(select(func.max(AuditDailyRollup.day)))
+        if newest is None:
+            days = max(days, settings.AUDIT_ROLLUP_BACKFILL_DAYS)
+        else:
+            days = min(max(days, (today - newest).days), settings.AUDIT_ROLLUP_BACKFILL_DAYS)
+
+        rows = 0
+        for offset in range(days, 0, -1):
+            rows += rollup_audit_day(db, today - timedelta(days=offset))
+
+        return f"Rolled up {days} day(s) of audit stats ({rows} org rows)"
+    finally:
+        db.close()
+
 
 # ─────────────────────────────────────────────────────────
 # Appointment Reminder Tasks
@@ -195,11 +350,12 @@ def check_for_upcoming_reminders():
     """
     Periodic task to check for appointments starting in ~10 minutes
     and send reminder notifications.
+
+    All reminders of a sweep are inserted with a single bulk statement.
     """
     from app.database import SyncSessionLocal
     from app.models.appointment import Appointment
-    from app.services.notification_service import NotificationService
-    import asyncio
+    from app.services.notification_service import create_notifications_bulk_sync
 
     db = SyncSessionLocal()
     try:
@@ -209,50 +365,37 @@ def check_for_upcoming_reminders():
 
         # Find appointments starting between 10-11 minutes from now
         # that are 'accepted' and haven't had a reminder sent
-        query = db.query(Appointment).filter(
+        appointments = db.query(
+            Appointment.id, Appointment.doctor_id, Appointment.patient_id, Appointment.meet_link
+        ).filter(
             Appointment.status == "accepted",
             Appointment.requested_date >= ten_mins_later,
             Appointment.requested_date < eleven_mins_later
-        )
-        
-        appointments = query.all()
+        ).all()
+
         if not appointments:
             return f"No reminders to send at {now}"
 
-        # Notification logic needs to be async or run in thread
-        async def send_reminders():
-            from sqlalchemy.ext.asyncio import AsyncSession
-            from app.database import SessionLocal # Assuming this is the async one
-            
-            # Since this is a sync celery task context usually, but we need 
-            # to interact with our async NotificationService...
-            # A better way might be to use the run_async helper if we have an async db session.
-            # However, typical celery workers are sync with gevent/eventlet.
-            pass
-            
-        # Refined: Use sync notification path if available or wrap async
-        # Let's keep it simple for now and use the existing run_async helper 
-        # but we need to fetch user details to send meaningful messages.
-        
+        reminders = []
         for appt in appointments:
             # Notify Doctor
-            run_async(NotificationService(None).create_notification(
-                user_id=appt.doctor_id,
-                type="appointment_reminder",
-                title="Meeting Reminder",
-                message=f"Your consultation starts in 10 minutes. {appt.meet_link or ''}",
-                action_url=f"/appointments/{appt.id}"
-            ))
+            reminders.append({
+                "user_id": appt.doctor_id,
+                "type": "appointment_reminder",
+                "title": "Meeting Reminder",
+                "message": f"Your consultation starts in 10 minutes. {appt.meet_link or ''}",
+                "action_url": f"/appointments/{appt.id}",
+            })
             # Notify Patient
-            run_async(NotificationService(None).create_notification(
-                user_id=appt.patient_id,
-                type="appointment_reminder",
-                title="Meeting Reminder",
-                message=f"Your appointment starts in 10 minutes. Click to join: {appt.meet_link or ''}",
-                action_url=f"/appointments/{appt.id}"
-            ))
-
+            reminders.append({
+                "user_id": appt.patient_id,
+                "type": "appointment_reminder",
+                "title": "Meeting Reminder",
+                "message": f"Your appointment starts in 10 minutes. Click to join: {appt.meet_link or ''}",
+                "action_url": f"/appointments/{appt.id}",
+            })
+
+        create_notifications_bulk_sync(db, reminders)
         return f"Sent reminders for {len(appointments)} appointments"
     finally:
         db.close()
-
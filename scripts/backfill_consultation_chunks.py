@@ -0,0 +1,38 @@
+from sqlalchemy import exists, select
+
+from app.database import SyncSessionLocal
+from app.models.chunk import Chunk
+from app.models.consultation import Consultation
+from app.services.consultation_indexer import index_consultation_sync
+
+
+def backfill_consultation_chunks():
+    """
+    One-off backfill: embed every completed SOAP note that was written before
+    consultations were indexed into the chunks table. Safe to re-run; already
+    indexed consultations are skipped.
+    """
+    db = SyncSessionLocal()
+    try:
+        consultation_ids = db.execute(
+            select(Consultation.id).where(
+                Consultation.ai_status == "completed",
+                Consultation.soap_note.isnot(None),
+                Consultation.deleted_at.is_(None),
+                ~exists().where(Chunk.consultation_id == Consultation.id),
+            )
+        ).scalars().all()
+
+        print(f"Found {len(consultation_ids)} consultations to index.")
+
+        for i, consultation_id in enumerate(consultation_ids, start=1):
+            count = index_consultation_sync(db, consultation_id)
+            print(f"[{i}/{len(consultation_ids)}] {consultation_id}: {count} chunk(s)")
+
+        print("Done.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_consultation_chunks()
@@ -0,0 +1,99 @@
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func, select, text
+
+from app.database import SyncSessionLocal
+from app.models.chunk import Chunk
+from app.services.vector_search import (
+    INDEX_DDL,
+    STORAGE_MODES,
+    cosine_distance,
+    ef_search_statement,
+    rank_by_similarity,
+)
+
+
+def _as_list(embedding):
+    return embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+
+
+def benchmark_embeddings(queries: int = 100, k: int = 20, per_patient: bool = False):
+    """
+    Compare recall@k and latency of the embedding storage modes on our data.
+
+    Query vectors are the embeddings of randomly sampled chunks. Ground truth
+    is an exact (sequential scan) cosine search; each mode whose index exists
+    (see scripts/reindex_embeddings.py) is then timed on the same queries.
+    With --per-patient, searches are restricted to the sampled chunk's
+    patient, as chat retrieval does.
+    """
+    db = SyncSessionLocal()
+    try:
+        total = db.execute(select(func.count()).select_from(Chunk).where(Chunk.embedding.isnot(None))).scalar()
+        print(f"Chunks with embeddings: {total}")
+        samples = db.execute(
+            select(Chunk.patient_id, Chunk.embedding)
+            .where(Chunk.embedding.isnot(None))
+            .order_by(func.random())
+            .limit(queries)
+        ).all()
+        db.rollback()
+
+        def base(patient_id):
+            stmt = select(Chunk.id)
+            return stmt.where(Chunk.patient_id == patient_id) if per_patient else stmt
+
+        # Exact top-k per query
+        truth = []
+        for patient_id, embedding in samples:
+            db.execute(text("SET LOCAL enable_indexscan = off"))
+            ids = db.execute(
+                base(patient_id)
+                .where(Chunk.embedding.isnot(None))
+                .order_by(cosine_distance(_as_list(embedding)))
+                .limit(k)
+            ).scalars().all()
+            db.rollback()
+            truth.append(set(ids))
+
+        print(f"\n{'mode':<9} {'index size':>11} {'recall@' + str(k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+        for mode in STORAGE_MODES:
+            index_name = INDEX_DDL[mode][0]
+            size = db.execute(
+                text("SELECT pg_size_pretty(pg_relation_size(oid)) FROM pg_class WHERE relname = :name"),
+                {"name": index_name},
+            ).scalar()
+            db.rollback()
+            if size is None:
+                print(f"{mode:<9} {'(no index)':>11}")
+                continue
+
+            recalls, latencies = [], []
+            for (patient_id, embedding), expected in zip(samples, truth):
+                db.execute(ef_search_statement(k, mode))
+                started = time.perf_counter()
+                ids = db.execute(rank_by_similarity(base(patient_id), _as_list(embedding), k, mode)).scalars().all()
+                latencies.append((time.perf_counter() - started) * 1000)
+                db.rollback()
+                if expected:
+                    recalls.append(len(expected & set(ids)) / len(expected))
+
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(
+                f"{mode:<9} {size:>11} {statistics.mean(recalls or [0]):>10.3f} "
+                f"{statistics.median(latencies):>8.1f} {p95:>8.1f}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall/latency benchmark of embedding storage modes")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=20)
+    parser.add_argument("--per-patient", action="store_true")
+    args = parser.parse_args()
+    benchmark_embeddings(args.queries, args.k, args.per_patient)
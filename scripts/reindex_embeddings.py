@@ -0,0 +1,67 @@
+import argparse
+
+from sqlalchemy import text
+
+from app.database import _sync_engine
+from app.services.vector_search import INDEX_DDL, STORAGE_MODES
+
+
+def _index_state(conn, name):
+    """(exists, valid, size) of an index"""
+    row = conn.execute(
+        text(
+            "SELECT i.indisvalid, pg_size_pretty(pg_relation_size(c.oid)) "
+            "FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"
+        ),
+        {"name": name},
+    ).first()
+    return (False, False, None) if row is None else (True, row[0], row[1])
+
+
+def reindex_embeddings(mode: str, drop_others: bool = False, maintenance_work_mem: str = "2GB"):
+    """
+    Build the HNSW index for an embedding storage mode without blocking writes
+    (CREATE INDEX CONCURRENTLY), then optionally drop the other modes' indexes.
+
+    Run this BEFORE switching EMBEDDING_STORAGE_MODE, so queries in the new
+    mode find their index ready. Safe to re-run: a valid index is kept and an
+    invalid one left behind by an interrupted build is rebuilt.
+    """
+    # CONCURRENTLY cannot run inside a transaction block
+    with _sync_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        version = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+        print(f"pgvector extension version: {version}")
+        if mode != "vector" and tuple(int(p) for p in (version or "0").split(".")[:2]) < (0, 7):
+            raise SystemExit(f"Mode '{mode}' needs pgvector >= 0.7 (ALTER EXTENSION vector UPDATE)")
+
+        name, ddl = INDEX_DDL[mode]
+        exists, valid, size = _index_state(conn, name)
+        if exists and not valid:
+            print(f"Dropping invalid index {name} from an interrupted build...")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            exists = False
+
+        if exists:
+            print(f"Index {name} already built ({size}).")
+        else:
+            conn.execute(text(f"SET maintenance_work_mem = '{maintenance_work_mem}'"))
+            print(f"Building {name} concurrently (writes continue meanwhile)...")
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {ddl}"))
+            print(f"Built {name} ({_index_state(conn, name)[2]}).")
+
+        if drop_others:
+            for other, (other_name, _) in INDEX_DDL.items():
+                if other != mode and _index_state(conn, other_name)[0]:
+                    print(f"Dropping {other_name} ({other} mode)...")
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {other_name}"))
+
+    print(f"Done. Set EMBEDDING_STORAGE_MODE={mode} and restart the API.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the chunk embedding index for a storage mode")
+    parser.add_argument("--mode", choices=STORAGE_MODES, required=True)
+    parser.add_argument("--drop-others", action="store_true", help="Drop the other modes' indexes afterwards")
+    parser.add_argument("--maintenance-work-mem", default="2GB")
+    args = parser.parse_args()
+    reindex_embeddings(args.mode, args.drop_others, args.maintenance_work_mem)
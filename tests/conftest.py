@@ -9,6 +9,9 @@ from app.main import app
 from app.database import Base, get_db
 from app.config import settings
 
+# Tests share one client address; rate limiting has its own tests
+settings.RATE_LIMIT_ENABLED = False
+
 # Test database URL (reuse dev db for standalone testing)
 TEST_DATABASE_URL = settings.DATABASE_URL.replace("saramedico_dev", "saramedico_test")
 
@@ -96,12 +99,13 @@ async def db_session(engine):
 async def client(db_session):
     """Create a test client"""
     from app.main import app
-    from app.database import get_db
+    from app.database import get_db, get_readonly_db
     
     async def override_get_db():
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_readonly_db] = override_get_db
     
     # Use the app lifespan
     async with AsyncClient(app=app, base_url="http://test") as ac:
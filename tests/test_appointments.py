@@ -0,0 +1,95 @@
+"""Tests for accepting appointments one at a time and in bulk"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+
+async def _appointment(db_session, doctor_user, patient_user, requested_date, status="pending"):
+    from app.models.appointment import Appointment
+
+    appointment = Appointment(
+        doctor_id=doctor_user.id,
+        patient_id=patient_user.id,
+        requested_date=requested_date,
+        reason="Follow-up",
+        status=status,
+    )
+    db_session.add(appointment)
+    await db_session.commit()
+    return appointment
+
+
+async def _consultation_count(db_session, doctor_user) -> int:
+    from app.models.consultation import Consultation
+
+    return await db_session.scalar(
+        select(func.count()).select_from(Consultation).where(Consultation.doctor_id == doctor_user.id)
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_accept_accepts_appointments_whose_meeting_failed(
+    async_client: AsyncClient, db_session, doctor_token, doctor_user, patient_user, patient_id
+):
+    start = datetime(2031, 6, 2, 9, 0, tzinfo=timezone.utc)
+    with_meet = await _appointment(db_session, doctor_user, patient_user, start)
+    without_meet = await _appointment(db_session, doctor_user, patient_user, start + timedelta(hours=1))
+    already_accepted = await _appointment(
+        db_session, doctor_user, patient_user, start + timedelta(hours=2), status="accepted"
+    )
+
+    from app.services.google_meet_service import google_meet_service
+
+    batch = AsyncMock(return_value=[("evt-1", "https://meet.google.com/abc"), RuntimeError("quota exceeded")])
+    with patch.object(google_meet_service, "create_meetings_batch", batch):
+        response = await async_client.post(
+            "/api/v1/appointments/bulk-accept",
+            json={"appointment_ids": [str(with_meet.id), str(without_meet.id), str(already_accepted.id)]},
+            headers={"Authorization": f"Bearer {doctor_token}"},
+        )
+
+    assert response.status_code == 200
+    accepted = {item["id"]: item for item in response.json()}
+    assert set(accepted) == {str(with_meet.id), str(without_meet.id)}
+    assert all(item["status"] == "accepted" for item in accepted.values())
+    assert accepted[str(with_meet.id)]["meet_link"] == "https://meet.google.com/abc"
+    assert accepted[str(without_meet.id)]["meet_link"] is None
+    assert len(batch.await_args.args[0]) == 2
+    assert await _consultation_count(db_session, doctor_user) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_accept_reuses_existing_consultation(
+    async_client: AsyncClient, db_session, doctor_token, doctor_user, patient_user, patient_id
+):
+    from app.models.consultation import Consultation
+
+    start = datetime(2031, 6, 3, 9, 0, tzinfo=timezone.utc)
+    appointment = await _appointment(db_session, doctor_user, patient_user, start)
+    db_session.add(Consultation(
+        doctor_id=doctor_user.id,
+        patient_id=patient_user.id,
+        organization_id=doctor_user.organization_id,
+        scheduled_at=start,
+        duration_minutes=30,
+        status="scheduled",
+    ))
+    await db_session.commit()
+
+    from app.services.google_meet_service import google_meet_service
+
+    batch = AsyncMock(return_value=[("evt-2", "https://meet.google.com/def")])
+    with patch.object(google_meet_service, "create_meetings_batch", batch):
+        response = await async_client.post(
+            "/api/v1/appointments/bulk-accept",
+            json={"appointment_ids": [str(appointment.id)]},
+            headers={"Authorization": f"Bearer {doctor_token}"},
+        )
+
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == ["accepted"]
+    assert await _consultation_count(db_session, doctor_user) == 1
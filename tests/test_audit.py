@@ -38,6 +38,46 @@ async def test_get_audit_logs(
     assert "total" in data
 
 
+@pytest.mark.asyncio
+async def test_audit_logs_cursor_pagination(
+    async_client: AsyncClient,
+    admin_token: str,
+    admin_user: User,
+    db_session: AsyncSession
+):
+    """Test keyset pagination walks pages without overlap"""
+    for i in range(5):
+        db_session.add(AuditLog(
+            action=f"page_test_{i}",
+            resource_type="test",
+            organization_id=admin_user.organization_id,
+        ))
+    await db_session.commit()
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    first = await async_client.get(
+        "/api/v1/audit/logs",
+        params={"limit": 2, "count": "exact"},
+        headers=headers
+    )
+    assert first.status_code == 200
+    first_data = first.json()
+    assert first_data["total_is_estimate"] is False
+    assert first_data["total"] >= 5
+    assert first_data["next_cursor"]
+
+    second = await async_client.get(
+        "/api/v1/audit/logs",
+        params={"limit": 2, "cursor": first_data["next_cursor"], "count": "none"},
+        headers=headers
+    )
+    assert second.status_code == 200
+    second_data = second.json()
+    assert second_data["total"] is None
+    first_ids = {log["id"] for log in first_data["logs"]}
+    assert not first_ids & {log["id"] for log in second_data["logs"]}
+
+
 @pytest.mark.asyncio
 async def test_audit_logs_permission(
     async_client: AsyncClient,
@@ -66,6 +106,53 @@ async def test_export_audit_logs(
     assert "Timestamp,Action" in response.text
 
 
+@pytest.mark.asyncio
+async def test_export_audit_logs_ndjson_resume(
+    async_client: AsyncClient,
+    admin_token: str,
+    admin_user: User,
+    db_session: AsyncSession
+):
+    """Test NDJSON export streams records with resumable cursors"""
+    import json
+
+    for i in range(3):
+        db_session.add(AuditLog(
+            action=f"export_test_{i}",
+            resource_type="test",
+            organization_id=admin_user.organization_id,
+        ))
+    await db_session.commit()
+
+    response = await async_client.get(
+        "/api/v1/audit/export",
+        params={"format": "ndjson"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines() if line]
+    assert len(records) >= 3
+
+    # Resuming after the first record skips it
+    resumed = await async_client.get(
+        "/api/v1/audit/export",
+        params={"format": "ndjson", "after": records[0]["cursor"]},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert resumed.status_code == 200
+    resumed_ids = [json.loads(line)["id"] for line in resumed.text.splitlines() if line]
+    assert records[0]["id"] not in resumed_ids
+    assert records[1]["id"] in resumed_ids
+
+    bad = await async_client.get(
+        "/api/v1/audit/export",
+        params={"after": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert bad.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_compliance_stats(
     async_client: AsyncClient,
@@ -82,6 +169,82 @@ async def test_compliance_stats(
     assert "phi_access_count" in data
 
 
+@pytest.mark.asyncio
+async def test_compliance_stats_combines_rollups_and_live_logs(
+    async_client: AsyncClient,
+    admin_token: str,
+    admin_user: User,
+    db_session: AsyncSession
+):
+    """Test stats add rolled-up days to today's live audit rows"""
+    from datetime import datetime, timedelta
+    from app.models.audit import AuditDailyRollup
+    from app.utils.hyperloglog import HyperLogLog
+
+    sketch = HyperLogLog()
+    sketch.add(uuid4())
+    sketch.add(uuid4())
+    db_session.add(AuditDailyRollup(
+        organization_id=admin_user.organization_id,
+        day=datetime.utcnow().date() - timedelta(days=1),
+        total_events=40,
+        phi_access_count=7,
+        active_users_sketch=sketch.to_bytes(),
+    ))
+    db_session.add(AuditLog(
+        action="view",
+        resource_type="patient",
+        organization_id=admin_user.organization_id,
+        user_id=admin_user.id,
+    ))
+    await db_session.commit()
+
+    response = await async_client.get(
+        "/api/v1/audit/stats",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_events"] >= 41
+    assert data["phi_access_count"] >= 8
+    assert data["users_active_count"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_compliance_stats_reads_days_missing_rollups_live(admin_user: User, db_session: AsyncSession):
+    """A day the rollup task missed is aggregated live, not skipped behind newer rollups"""
+    from datetime import datetime, timedelta
+    from app.models.audit import AuditDailyRollup
+    from app.services.audit_service import get_compliance_stats
+    from app.utils.hyperloglog import HyperLogLog
+
+    today = datetime.utcnow().date()
+    for offset in (1, 3):  # Day 2 has no rollup
+        db_session.add(AuditDailyRollup(
+            organization_id=admin_user.organization_id,
+            day=today - timedelta(days=offset),
+            total_events=10,
+            phi_access_count=0,
+            active_users_sketch=HyperLogLog().to_bytes(),
+        ))
+    await db_session.commit()
+    before = await get_compliance_stats(db_session, admin_user.organization_id, days=7)
+
+    db_session.add(AuditLog(
+        action="view",
+        resource_type="patient",
+        organization_id=admin_user.organization_id,
+        user_id=admin_user.id,
+        timestamp=datetime.combine(today - timedelta(days=2), datetime.min.time()) + timedelta(hours=12),
+    ))
+    await db_session.commit()
+    after = await get_compliance_stats(db_session, admin_user.organization_id, days=7)
+
+    assert before["total_events"] >= 20
+    assert after["total_events"] == before["total_events"] + 1
+    assert after["phi_access_count"] == before["phi_access_count"] + 1
+
+
 @pytest.mark.asyncio
 async def test_export_my_data(
     async_client: AsyncClient,
@@ -96,3 +259,16 @@ async def test_export_my_data(
     data = response.json()
     assert "profile" in data
     assert data["profile"]["role"] == "doctor"
+
+
+@pytest.mark.asyncio
+async def test_failed_row_estimate_keeps_transaction_usable(db_session: AsyncSession, admin_user):
+    """A failing EXPLAIN is rolled back to its savepoint, not left aborting the transaction"""
+    from sqlalchemy import column, table
+    from app.services.audit_service import estimate_row_count
+
+    missing = select(column("id")).select_from(table("no_such_table"))
+    assert await estimate_row_count(db_session, missing) is None
+
+    result = await db_session.execute(select(User.id).where(User.id == admin_user.id))
+    assert result.scalar_one() == admin_user.id
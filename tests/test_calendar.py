@@ -474,6 +474,33 @@ class TestCalendarViews:
         assert isinstance(data["days"], list)
 
 
+    @pytest.mark.asyncio
+    async def test_month_view_counts_events_per_day(self, test_client, doctor_token):
+        """Month view aggregates counts and event-type flags per day"""
+        headers = {"Authorization": f"Bearer {doctor_token}"}
+        year, month = 2031, 5
+        for day, hour in ((3, 9), (3, 14), (20, 10)):
+            start = datetime(year, month, day, hour)
+            await test_client.post(
+                "/api/v1/calendar/events",
+                json={
+                    "title": f"Month View Event {day}/{hour}",
+                    "start_time": start.isoformat() + "Z",
+                    "end_time": (start + timedelta(hours=1)).isoformat() + "Z",
+                    "all_day": False
+                },
+                headers=headers
+            )
+
+        response = await test_client.get(f"/api/v1/calendar/month/{year}/{month}", headers=headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_events"] == 3
+        assert [(d["day"], d["event_count"]) for d in data["days"]] == [(3, 2), (20, 1)]
+        assert all(d["has_custom_events"] and not d["has_appointments"] for d in data["days"])
+
+
 class TestAccessControl:
     """Test role-based access control"""
     
@@ -0,0 +1,35 @@
+"""
+Tests for persistent chat sessions and their rolling memory.
+"""
+
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_rolling_memory_never_drops_half_an_exchange(db_session, doctor_user, patient_id):
+    """Every message is either folded into memory or still sent verbatim, never lost between the two"""
+    from app.services.aws_service import aws_service
+    from app.services.chat_session_service import ChatSessionService
+
+    service = ChatSessionService(db_session)
+    session = await service.create_session(doctor_user.id, UUID(patient_id))
+    for i in range(4):
+        await service.save_messages(session.id, f"question-{i} " + "q" * 400, f"answer-{i} " + "a" * 400)
+
+    generate_text = AsyncMock(return_value="Doctor asked four questions.")
+    with patch.object(aws_service, "generate_text", generate_text), \
+            patch("app.config.settings.CHAT_HISTORY_TOKEN_BUDGET", 250):
+        await service.update_rolling_memory(session.id)
+
+    await db_session.refresh(session)
+    folded = generate_text.await_args.args[0]
+    recent = await service.get_session_history_for_prompt(session.id, since=session.memory_through)
+
+    assert recent and recent[0]["role"] == "user"
+    for i in range(4):
+        for marker in (f"question-{i}", f"answer-{i}"):
+            in_recent = any(m["content"].startswith(marker) for m in recent)
+            assert (marker in folded) != in_recent, marker
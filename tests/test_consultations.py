@@ -171,3 +171,190 @@ async def test_analyze_consultation_stub(
     data = response.json()
     print(f"DEBUG: Analyze Response: {data}")
     assert "initiated" in data["message"]
+
+
+@pytest.mark.asyncio
+async def test_transcript_status_reads_ingested_transcript(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    doctor_token: str,
+    patient_id: str
+):
+    """transcript-status answers from the DB once the watcher has stored the transcript"""
+    from app.models.consultation import Consultation
+
+    scheduled_time = datetime.utcnow() + timedelta(days=6)
+    create_resp = await async_client.post(
+        "/api/v1/consultations",
+        headers={"Authorization": f"Bearer {doctor_token}"},
+        json={
+            "patientId": patient_id,
+            "scheduledAt": scheduled_time.isoformat(),
+            "durationMinutes": 30
+        }
+    )
+    cons_id = create_resp.json()["id"]
+
+    consultation = (await db_session.execute(
+        select(Consultation).where(Consultation.id == cons_id)
+    )).scalar_one()
+    consultation.google_event_id = "evt-transcript-test"
+    consultation.ai_status = "awaiting_transcript"
+    await db_session.commit()
+
+    response = await async_client.get(
+        f"/api/v1/consultations/{cons_id}/transcript-status",
+        headers={"Authorization": f"Bearer {doctor_token}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "processing"
+
+    consultation.transcript = "Doctor: How are you feeling?\nPatient: Much better."
+    consultation.ai_status = "processing"
+    await db_session.commit()
+
+    response = await async_client.get(
+        f"/api/v1/consultations/{cons_id}/transcript-status",
+        headers={"Authorization": f"Bearer {doctor_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "available"
+    assert data["transcript_in_db"] is True
+
+
+@pytest.mark.asyncio
+async def test_clinical_search_matches_soap_note_text(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    doctor_user,
+    doctor_token: str,
+    patient_id: str
+):
+    """Full-text search finds consultations by SOAP note content and partial words"""
+    from app.models.consultation import Consultation
+
+    create_resp = await async_client.post(
+        "/api/v1/consultations",
+        headers={"Authorization": f"Bearer {doctor_token}"},
+        json={
+            "patientId": patient_id,
+            "scheduledAt": (datetime.utcnow() + timedelta(days=7)).isoformat(),
+            "durationMinutes": 30
+        }
+    )
+    cons_id = create_resp.json()["id"]
+
+    consultation = (await db_session.execute(
+        select(Consultation).where(Consultation.id == cons_id)
+    )).scalar_one()
+    consultation.soap_note = {
+        "subjective": "Intermittent palpitations for two weeks",
+        "assessment": "Suspected paroxysmal atrial fibrillation",
+    }
+    await db_session.commit()
+
+    response = await async_client.get(
+        f"/api/v1/doctor/{doctor_user.id}/search?q=fibrill",
+        headers={"Authorization": f"Bearer {doctor_token}"}
+    )
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()] == [cons_id]
+
+    response = await async_client.get(
+        f"/api/v1/doctor/{doctor_user.id}/clinical-search?q=atrial fibrillation&semantic=false",
+        headers={"Authorization": f"Bearer {doctor_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["results"][0]["type"] == "consultation"
+    assert data["results"][0]["id"] == cons_id
+    assert "**fibrillation**" in data["results"][0]["snippet"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    from uuid import uuid4
+    from app.services.clinical_search_service import ClinicalSearchService, SearchHit, build_tsquery
+
+    assert build_tsquery("chest pai!") == "chest:* & pai:*"
+    assert build_tsquery("  ?? ") is None
+
+    patient = uuid4()
+    a, b, c = uuid4(), uuid4(), uuid4()
+    fused = ClinicalSearchService.fuse({
+        "lexical_chunks": [SearchHit("document", a, patient), SearchHit("document", b, patient)],
+        "semantic_chunks": [SearchHit("document", c, patient), SearchHit("document", b, patient)],
+    })
+
+    assert [h.id for h in fused][0] == b  # Ranked by both retrievers
+    assert fused[0].ranks == {"lexical_chunks": 2, "semantic_chunks": 2}
+    assert len(fused) == 3
+
+
+
+@pytest.mark.asyncio
+async def test_clinical_search_total_does_not_depend_on_page():
+    """Each retriever is read to the same depth on every page, so total is stable"""
+    from unittest.mock import AsyncMock, MagicMock, patch
+    from uuid import uuid4
+    from app.services.clinical_search_service import MAX_CANDIDATES, ClinicalSearchService, SearchHit
+
+    patient = uuid4()
+    pool = [SearchHit("document", uuid4(), patient) for _ in range(MAX_CANDIDATES + 50)]
+
+    async def _retrieve(doctor_id, tsquery, limit):
+        return pool[:limit]
+
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+    service = ClinicalSearchService(db)
+    with patch.object(service, "_lexical_consultations", AsyncMock(return_value=[])), \
+            patch.object(service, "_lexical_chunks", side_effect=_retrieve):
+        first_page, first_total = await service.search(uuid4(), "chest pain", page=1, semantic=False)
+        third_page, third_total = await service.search(uuid4(), "chest pain", page=3, semantic=False)
+
+    assert first_total == third_total == MAX_CANDIDATES
+    assert len(first_page) == len(third_page) == 20
+
+
+def test_drive_transcripts_match_only_their_own_meeting():
+    """Repeat meetings share a summary; each transcript goes to the meeting it was recorded in"""
+    from unittest.mock import MagicMock, patch
+    from app.services.google_meet_service import GoogleMeetService
+
+    summary = "Consultation: Dr. House & Jane"
+
+    def _event(day):
+        return {
+            "summary": summary,
+            "start": {"dateTime": f"2031-06-{day:02d}T09:00:00Z"},
+            "end": {"dateTime": f"2031-06-{day:02d}T09:30:00Z"},
+        }
+
+    events = {"evt-monday": _event(2), "evt-friday": _event(6), "evt-doubled": _event(9)}
+
+    def _new_batch(callback):
+        batch = MagicMock()
+        added = []
+        batch.add.side_effect = lambda request, request_id: added.append(request_id)
+        batch.execute.side_effect = lambda: [
+            callback(request_id, events[order[int(request_id)]], None) for request_id in added
+        ]
+        return batch
+
+    order = list(events)
+    calendar, drive = MagicMock(), MagicMock()
+    calendar.new_batch_http_request.side_effect = _new_batch
+    drive.files().list().execute.return_value = {"files": [
+        {"id": "file-friday", "name": f"{summary} - Transcript", "createdTime": "2031-06-06T09:40:00Z"},
+        {"id": "file-monday", "name": f"{summary} - Transcript", "createdTime": "2031-06-02T09:35:00Z"},
+        {"id": "file-doubled-1", "name": f"{summary} - Transcript", "createdTime": "2031-06-09T09:35:00Z"},
+        {"id": "file-doubled-2", "name": f"{summary} - Transcript", "createdTime": "2031-06-09T10:05:00Z"},
+    ]}
+
+    service = GoogleMeetService.__new__(GoogleMeetService)
+    with patch.object(GoogleMeetService, "_clients", return_value=(calendar, drive)):
+        found = service._find_transcript_files([(event_id, None) for event_id in order])
+
+    assert found == {"evt-monday": "file-monday", "evt-friday": "file-friday"}
@@ -0,0 +1,107 @@
+"""
+Unit tests for the token-budgeted RAG context assembler.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.services.context_assembler import (
+    ContextAssembler,
+    ContextItem,
+    estimate_tokens,
+    history_tail_start,
+)
+
+
+def _page(marker: str, lines: int = 400) -> str:
+    filler = "\n".join(f"line {i}: routine administrative text" for i in range(lines))
+    return f"{filler}\n{marker}\n{filler}"
+
+
+def test_passages_are_trimmed_deduplicated_and_within_budget():
+    now = datetime.now(timezone.utc)
+    page = _page("HbA1c 8.2% - diabetes poorly controlled")
+    candidates = [
+        ContextItem("chunk", page, "[Source: labs.pdf]", now - timedelta(days=5)),
+        ContextItem("chunk", page, "[Source: labs (copy).pdf]", now - timedelta(days=300)),
+        ContextItem("soap", "Subjective: knee pain after a fall.", "[SOAP Note 2023-01-02]", now - timedelta(days=600)),
+    ]
+
+    assembled = ContextAssembler(token_budget=2000, history_budget=500, max_passage_tokens=300).assemble(
+        query="How well controlled is the diabetes? Latest HbA1c?",
+        candidates=candidates,
+    )
+
+    labels = [p.label for p in assembled.passages]
+    assert labels[0] == "[Source: labs.pdf]"
+    assert "[Source: labs (copy).pdf]" not in labels  # Near-duplicate dropped
+    assert "HbA1c 8.2%" in assembled.passages[0].text  # Most relevant window kept
+    assert assembled.passages[0].tokens <= 300 + estimate_tokens("[Source: labs.pdf]") + 2
+    assert assembled.tokens <= 2000
+
+
+def test_history_is_bounded_and_starts_with_user_turn():
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "x" * 400}
+        for i in range(40)
+    ]
+
+    start = history_tail_start(history, budget=500)
+    assert 0 < start < len(history)
+    assert history[start]["role"] == "user"
+    assert sum(estimate_tokens(m["content"]) for m in history[start:]) <= 500
+
+    assembled = ContextAssembler(token_budget=1500, history_budget=500, max_passage_tokens=300).assemble(
+        query="anything new?", candidates=[], history=history, memory="Earlier: discussed statins."
+    )
+    assert assembled.history == history[start:]
+    assert assembled.overflow_history == start
+    assert assembled.tokens <= 1500
+
+
+def test_older_turns_recalled_only_when_relevant():
+    history = [
+        {"role": "user", "content": "Which anticoagulant is she on? warfarin dosing?"},
+        {"role": "assistant", "content": "Records show warfarin 5 mg daily."},
+    ] + [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": "y" * 800}
+        for i in range(10)
+    ]
+
+    assembled = ContextAssembler(token_budget=3000, history_budget=450, max_passage_tokens=300).assemble(
+        query="Should the warfarin dose change?", candidates=[], history=history
+    )
+
+    recalled = [p.text for p in assembled.passages_of("history")]
+    assert any("warfarin" in text for text in recalled)
+    assert all("warfarin" in text for text in recalled)
+
+
+def test_chat_request_cached_prefix_ignores_retrieved_context():
+    """Two questions of one session share a byte-identical cached prefix"""
+    import json
+
+    from app.services.aws_service import build_chat_request
+
+    history = [
+        {"role": "user", "content": "What medications is the patient on?"},
+        {"role": "assistant", "content": "Metformin 500 mg twice daily."},
+    ]
+    memory = "Discussed the patient's diabetes management."
+
+    def cached_prefix(body):
+        # Everything up to the last cache breakpoint: system blocks and prior turns
+        return json.dumps(body["system"]) + json.dumps(body["messages"][:-1])
+
+    first = build_chat_request(
+        "SYSTEM", [*history, {"role": "user", "content": "Any allergies?"}],
+        context="[Source: intake.pdf] Allergic to penicillin.", memory=memory,
+    )
+    second = build_chat_request(
+        "SYSTEM", [*history, {"role": "user", "content": "Latest HbA1c?"}],
+        context="[Source: labs.pdf] HbA1c 7.2% in March.", memory=memory,
+    )
+
+    assert cached_prefix(first) == cached_prefix(second)
+    assert "penicillin" not in cached_prefix(first)
+    assert "penicillin" in json.dumps(first["messages"][-1])
+    assert first["messages"][-2]["content"][0]["cache_control"] == {"type": "ephemeral"}
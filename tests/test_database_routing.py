@@ -0,0 +1,48 @@
+import time
+
+from sqlalchemy import select, text, update
+
+
+def test_readonly_session_routes_selects_to_replica_until_it_writes(monkeypatch):
+    from app import database
+    from app.config import settings
+    from app.models.user import User
+
+    replica = database.Replica("replica-test", settings.DATABASE_URL)
+    replica.lag_seconds = 0.0
+    replica.checked_at = time.monotonic()
+    monkeypatch.setattr(database, "replicas", [replica])
+
+    primary = database.engine.sync_engine
+
+    session = database.RoutingSession(info={"readonly": True})
+    assert session.get_bind(clause=select(User)) is replica.engine.sync_engine
+    assert session.get_bind(clause=select(User).with_for_update()) is primary
+    # Pinned after the first non-read statement
+    assert session.get_bind(clause=select(User)) is primary
+
+    session = database.RoutingSession(info={"readonly": True})
+    session.get_bind(clause=update(User).values(last_login=None))
+    assert session.get_bind(clause=select(User)) is primary
+
+    # EXPLAIN routes like the statement it wraps and does not pin the session
+    from app.services.audit_service import _Explain
+
+    session = database.RoutingSession(info={"readonly": True})
+    assert session.get_bind(clause=_Explain(select(User))) is replica.engine.sync_engine
+    assert session.get_bind(clause=select(User)) is replica.engine.sync_engine
+
+    session = database.RoutingSession(info={"readonly": True})
+    assert session.get_bind(clause=text("SET LOCAL hnsw.ef_search = 100")) is primary
+
+    # Sessions opened with get_db never use replicas
+    assert database.RoutingSession().get_bind(clause=select(User)) is primary
+
+    # A lagging replica is skipped
+    replica.lag_seconds = settings.DATABASE_REPLICA_MAX_LAG_SECONDS + 1
+    session = database.RoutingSession(info={"readonly": True})
+    assert session.get_bind(clause=select(User)) is primary
+
+    stats = database.pool_stats()
+    assert set(stats) == {"primary", "replica-test"}
+    assert stats["replica-test"]["healthy"] is False
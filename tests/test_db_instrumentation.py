@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import select
+
+
+def test_fingerprint_ignores_values():
+    from app.core.db_instrumentation import fingerprint
+
+    a = fingerprint("SELECT documents.id FROM documents\n WHERE documents.id IN ($1::UUID, $2::UUID) LIMIT 10")
+    b = fingerprint("SELECT documents.id FROM documents WHERE documents.id IN ($1::UUID) LIMIT 50")
+    assert a == b == "SELECT documents.id FROM documents WHERE documents.id IN (?) LIMIT ?"
+    assert fingerprint("SELECT * FROM users WHERE email = 'a@b.com'") == "SELECT * FROM users WHERE email = ?"
+
+
+@pytest.mark.asyncio
+async def test_request_stats_flag_repeated_statements(db_session, doctor_user):
+    from app.config import settings
+    from app.core.db_instrumentation import RequestQueryStats, current_query_stats, instrument_engine
+    from app.models.user import User
+
+    instrument_engine(db_session.bind.sync_engine)  # The test engine is created by the fixture
+
+    stats = RequestQueryStats(scope={"method": "GET", "path": "/api/v1/test"})
+    token = current_query_stats.set(stats)
+    try:
+        for _ in range(settings.DB_N_PLUS_ONE_THRESHOLD):
+            await db_session.execute(select(User.email).where(User.id == doctor_user.id))
+        await db_session.execute(select(User.id).limit(1))
+    finally:
+        current_query_stats.reset(token)
+
+    assert stats.count == settings.DB_N_PLUS_ONE_THRESHOLD + 1
+    assert stats.total_ms > 0
+    repeated = stats.repeated()
+    assert len(repeated) == 1
+    assert list(repeated.values()) == [settings.DB_N_PLUS_ONE_THRESHOLD]
+    assert stats.route == "GET /api/v1/test"
@@ -242,3 +242,90 @@ async def test_invalid_upload_request(
         }
     )
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_document_timeline_generated_once(
+    async_client: AsyncClient,
+    doctor_token: str,
+    patient_id: str
+):
+    """The AI timeline is extracted on first view and then served from the DB"""
+    from unittest.mock import AsyncMock, patch
+
+    upload_response = await async_client.post(
+        "/api/v1/documents/upload-url",
+        headers={"Authorization": f"Bearer {doctor_token}"},
+        json={
+            "fileName": "discharge_summary.pdf",
+            "fileType": "application/pdf",
+            "fileSize": 2048,
+            "patientId": patient_id
+        }
+    )
+    document_id = upload_response.json()["documentId"]
+
+    events = [{
+        "id": 1, "date": "2024-03-01", "title": "Admission",
+        "description": "Admitted with pneumonia", "type": "visit", "page": 1
+    }]
+    with patch("app.services.timeline_service._download", return_value=b"%PDF-1.4"), \
+            patch("app.services.timeline_service.extract_timeline_events",
+                  new_callable=AsyncMock, return_value=events) as mock_extract:
+        for _ in range(2):
+            response = await async_client.get(
+                f"/api/v1/doctor/ai/timeline/{document_id}",
+                headers={"Authorization": f"Bearer {doctor_token}"}
+            )
+            assert response.status_code == 200
+            assert response.json()["events"][0]["title"] == "Admission"
+
+    assert mock_extract.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_citations_name_live_documents_only(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    doctor_token: str,
+    patient_id: str
+):
+    """Chat cites a document by name and upload date, and stops once it is deleted"""
+    from uuid import UUID
+    from unittest.mock import AsyncMock, patch
+    from app.models.chunk import Chunk
+    from app.services.ai_chat_service import AIChatService
+    from app.services.aws_service import aws_service
+
+    upload_response = await async_client.post(
+        "/api/v1/documents/upload-url",
+        headers={"Authorization": f"Bearer {doctor_token}"},
+        json={
+            "fileName": "echo_report.pdf",
+            "fileType": "application/pdf",
+            "fileSize": 4096,
+            "patientId": patient_id
+        }
+    )
+    document_id = upload_response.json()["documentId"]
+    db_session.add(Chunk(
+        document_id=UUID(document_id),
+        patient_id=UUID(patient_id),
+        content="Ejection fraction 55%.",
+        source="TIER_1_TEXT",
+        chunk_type="text",
+        page_number=1,
+    ))
+    await db_session.commit()
+
+    with patch.object(aws_service, "generate_embeddings", AsyncMock(return_value=None)):
+        (candidate,) = await AIChatService(db_session)._fetch_chunk_candidates(UUID(patient_id), "ejection fraction")
+        assert candidate.label.startswith("[Source: echo_report.pdf, uploaded ")
+
+        response = await async_client.delete(
+            f"/api/v1/documents/{document_id}",
+            headers={"Authorization": f"Bearer {doctor_token}"}
+        )
+        assert response.status_code == 204
+
+        assert await AIChatService(db_session)._fetch_chunk_candidates(UUID(patient_id), "ejection fraction") == []
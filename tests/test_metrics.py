@@ -0,0 +1,32 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_labels_requests_by_route_template(async_client: AsyncClient, doctor_token):
+    headers = {"Authorization": f"Bearer {doctor_token}"}
+    await async_client.get("/api/v1/notifications", headers=headers)
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/notifications",le="0.005"}' in body
+    assert "http_requests_in_flight" in body
+    assert 'db_pool_connections{engine="primary",state="checked_out"}' in body
+    # Scrapes themselves are not recorded
+    assert 'route="/metrics"' not in body
+
+
+def test_bedrock_stream_usage_counts_tokens():
+    from app.core.metrics import BEDROCK_TOKENS, record_bedrock_tokens
+
+    model = "test-model"
+    record_bedrock_tokens(model, {"input_tokens": 120, "cache_read_input_tokens": 80})
+    record_bedrock_tokens(model, {"output_tokens": 42})
+    record_bedrock_tokens(model, None)
+
+    assert BEDROCK_TOKENS.labels(model, "input")._value.get() == 120
+    assert BEDROCK_TOKENS.labels(model, "cache_read")._value.get() == 80
+    assert BEDROCK_TOKENS.labels(model, "output")._value.get() == 42
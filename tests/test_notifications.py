@@ -105,5 +105,88 @@ async def test_notifications_flow():
 
         print("\n=== TEST COMPLETED SUCCESSFULLY ===\n")
 
+async def test_unread_count_and_since_cursor(async_client, doctor_token, doctor_user, db_session):
+    """Feed reports unread count and `since` polling only returns newer items"""
+    from app.services.notification_service import NotificationService
+
+    service = NotificationService(db_session)
+    await service.create_notification(
+        user_id=doctor_user.id,
+        type="test",
+        title="Feed Test",
+        message="Unread notification for feed cache test",
+        organization_id=doctor_user.organization_id,
+    )
+    await db_session.commit()
+
+    headers = {"Authorization": f"Bearer {doctor_token}"}
+    resp = await async_client.get("/api/v1/notifications", headers=headers)
+    assert resp.status_code == 200
+    assert any(n["title"] == "Feed Test" for n in resp.json())
+    assert int(resp.headers["X-Unread-Count"]) >= 1
+    cursor = resp.headers["X-Notifications-Cursor"]
+
+    count_resp = await async_client.get("/api/v1/notifications/unread-count", headers=headers)
+    assert count_resp.status_code == 200
+    assert count_resp.json()["unread_count"] >= 1
+
+    delta = await async_client.get("/api/v1/notifications", params={"since": cursor}, headers=headers)
+    assert delta.status_code == 200
+    assert delta.json() == []
+
+
+async def test_since_cursor_survives_feed_rewarm(async_client, doctor_token, doctor_user, db_session):
+    """A cursor from a pushed feed selects the same items after the feed is re-warmed"""
+    from app.services.notification_cache import _background_tasks, notification_feed_cache
+    from app.services.notification_service import NotificationService
+
+    service = NotificationService(db_session)
+    headers = {"Authorization": f"Bearer {doctor_token}"}
+
+    await service.create_notification(user_id=doctor_user.id, type="test", title="First", message="First")
+    await db_session.commit()
+    first = await async_client.get("/api/v1/notifications", headers=headers)
+    cursor = first.headers["X-Notifications-Cursor"]
+
+    created = await service.create_notification(user_id=doctor_user.id, type="test", title="Second", message="Second")
+    await db_session.commit()
+    await asyncio.gather(*_background_tasks)  # Let the post-commit push land
+
+    pushed = await async_client.get("/api/v1/notifications", params={"since": cursor}, headers=headers)
+    assert [n["title"] for n in pushed.json()] == ["Second"]
+    assert int(pushed.headers["X-Notifications-Cursor"]) == created.feed_score
+
+    await notification_feed_cache.invalidate(doctor_user.id)
+    rewarmed = await async_client.get("/api/v1/notifications", params={"since": cursor}, headers=headers)
+    assert [n["title"] for n in rewarmed.json()] == ["Second"]
+    assert rewarmed.headers["X-Notifications-Cursor"] == pushed.headers["X-Notifications-Cursor"]
+
+    latest = pushed.headers["X-Notifications-Cursor"]
+    delta = await async_client.get("/api/v1/notifications", params={"since": latest}, headers=headers)
+    assert delta.json() == []
+
+
+async def test_create_notifications_bulk(doctor_user, patient_user, db_session):
+    """Bulk creation inserts every notification in one call"""
+    from sqlalchemy import func, select
+    from app.models.notification import Notification
+    from app.services.notification_service import NotificationService
+
+    created = await NotificationService(db_session).create_notifications_bulk([
+        {"user_id": doctor_user.id, "type": "bulk_test", "title": "Bulk", "message": "Doctor alert"},
+        {"user_id": patient_user.id, "type": "bulk_test", "title": "Bulk", "message": "Patient alert"},
+        {"user_id": doctor_user.id, "type": "bulk_test", "title": "Bulk", "message": "Second alert",
+         "action_url": "/dashboard"},
+    ])
+    await db_session.commit()
+
+    assert len(created) == 3
+    assert all(n.id and not n.is_read for n in created)
+    count = await db_session.scalar(
+        select(func.count()).select_from(Notification).where(Notification.type == "bulk_test")
+    )
+    assert count == 3
+
+
 if __name__ == "__main__":
     asyncio.run(test_notifications_flow())
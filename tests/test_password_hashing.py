@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_password_pool_rejects_when_queue_full():
+    from app.core.security import PasswordHasher, PasswordHasherBusy
+
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(hasher.run(release.wait, 5))
+    queued = asyncio.ensure_future(hasher.run(lambda: "queued"))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.run(lambda: "rejected")
+
+    stats = hasher.stats()
+    assert stats["running"] == 1
+    assert stats["queue_depth"] == 1
+    assert stats["rejected"] == 1
+
+    release.set()
+    assert await running is True
+    assert await queued == "queued"
+    assert hasher.stats()["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_login_rehash_when_cost_changes(monkeypatch):
+    from app.config import settings
+    from app.core.security import hash_password, verify_and_rehash_password
+
+    monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 4)
+    old_hash = hash_password("Password123!")
+
+    # Same cost: nothing to store
+    assert await verify_and_rehash_password("Password123!", old_hash) == (True, None)
+    assert await verify_and_rehash_password("wrong", old_hash) == (False, None)
+
+    monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 5)
+    ok, new_hash = await verify_and_rehash_password("Password123!", old_hash)
+    assert ok is True
+    assert new_hash.startswith("$2b$05$")
+    assert await verify_and_rehash_password("Password123!", new_hash) == (True, None)
@@ -0,0 +1,55 @@
+"""Tests for bulk patient import parsing and validation"""
+
+from app.services.patient_import_service import (
+    encrypt_rows,
+    import_format,
+    parse_rows,
+    validate_row,
+)
+
+
+def test_import_format_from_extension():
+    assert import_format("patients.CSV") == "csv"
+    assert import_format("export.jsonl") == "ndjson"
+    assert import_format("patients.xlsx") is None
+
+
+def test_csv_rows_are_nested_and_validated():
+    data = (
+        "fullName,dateOfBirth,gender,city,zipCode,emergencyContactName,allergies\n"
+        "Jane Roe,1980-04-02,female,Pune,411001,John Roe,penicillin; latex\n"
+        ",2999-01-01,robot,,,,\n"
+    ).encode("utf-8-sig")
+
+    rows = list(parse_rows(data, "csv"))
+    assert [number for number, _, _ in rows] == [1, 2]
+
+    fields, error = validate_row(rows[0][1])
+    assert error is None
+    assert fields["full_name"] == "Jane Roe"
+    assert fields["address"]["zip_code"] == "411001"
+    assert fields["emergency_contact"]["name"] == "John Roe"
+    assert fields["allergies"] == ["penicillin", "latex"]
+
+    fields, error = validate_row(rows[1][1])
+    assert fields is None
+    assert "fullName" in error or "full_name" in error
+    assert "gender" in error
+
+
+def test_ndjson_reports_unparseable_lines():
+    data = b'{"fullName": "A B", "dateOfBirth": "1990-01-01"}\n\nnot json\n[1, 2]\n'
+
+    rows = list(parse_rows(data, "ndjson"))
+    assert [(number, error is None) for number, _, error in rows] == [(1, True), (2, False), (3, False)]
+    assert rows[1][2].startswith("Invalid JSON")
+
+
+def test_encrypt_rows_inline_encrypts_pii():
+    fields, _ = validate_row({"fullName": "Jane Roe", "dateOfBirth": "1980-04-02", "medications": ["aspirin"]})
+
+    (encrypted,) = encrypt_rows([fields], pool=None)
+    assert encrypted["full_name"] != "Jane Roe"
+    assert encrypted["date_of_birth"] != "1980-04-02"
+    assert encrypted["medications"][0] != "aspirin"
+    assert encrypted["gender"] is None
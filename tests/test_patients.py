@@ -219,3 +219,32 @@ async def test_search_patients(
     data = response.json()
     assert len(data["patients"]) == 1
     assert data["patients"][0]["mrn"] == mrn2
+
+
+@pytest.mark.asyncio
+async def test_mrn_allocation_is_unique_under_concurrency(db_session: AsyncSession):
+    """Concurrent blocks never overlap and each organization numbers from 1"""
+    import asyncio
+    from uuid import uuid4
+
+    from app.services.patient_service import PatientService
+
+    service = PatientService(db_session)
+    org_a, org_b = uuid4(), uuid4()
+
+    *blocks, single = await asyncio.gather(
+        *(service.allocate_mrns(org_a, 25) for _ in range(4)),
+        service.generate_mrn(org_b),
+    )
+    mrns = [mrn for block in blocks for mrn in block]
+
+    assert len(set(mrns)) == 100
+    assert sorted(int(mrn.rsplit("-", 1)[1]) for mrn in mrns) == list(range(1, 101))
+    assert single.endswith("-000001")
+    assert single.rsplit("-", 1)[0] != mrns[0].rsplit("-", 1)[0]
+
+    # Counters live in the session's database (the test DB), not the app's default engine
+    from app.models.mrn_counter import MrnCounter
+
+    counter = await db_session.get(MrnCounter, org_a)
+    assert counter is not None and counter.next_value == 101
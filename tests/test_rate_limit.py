@@ -0,0 +1,97 @@
+import pytest
+from httpx import AsyncClient
+
+
+def test_parse_rate():
+    from app.core.rate_limit import parse_rate
+
+    assert parse_rate("5/minute") == (5, 60)
+    assert parse_rate("100 / hour") == (100, 3600)
+    assert parse_rate("10/30seconds") == (10, 30)
+    with pytest.raises(ValueError):
+        parse_rate("5 per minute")
+
+
+@pytest.mark.asyncio
+async def test_login_route_limit_returns_429_with_headers(async_client: AsyncClient, monkeypatch):
+    from app.config import settings
+    from app.core.redis import get_redis
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    redis = get_redis()
+    async for key in redis.scan_iter("ratelimit:*"):
+        await redis.delete(key)
+
+    credentials = {"email": "nobody@saramedico.com", "password": "WrongPass123!"}
+    for _ in range(settings.LOGIN_RATE_LIMIT_PER_MINUTE):
+        response = await async_client.post("/api/v1/auth/login", json=credentials)
+        assert response.status_code == 401
+        assert "RateLimit-Remaining" in response.headers
+
+    response = await async_client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == 429
+    assert response.headers["RateLimit-Remaining"] == "0"
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Another account from the same address is not locked out
+    other = {"email": "Somebody.Else@saramedico.com", "password": "WrongPass123!"}
+    response = await async_client.post("/api/v1/auth/login", json=other)
+    assert response.status_code == 401
+
+    # Other routes only count against the global per-IP window
+    response = await async_client.post("/api/v1/auth/forgot-password", json={"email": "nobody@saramedico.com"})
+    assert response.status_code == 200
+    assert int(response.headers["RateLimit-Remaining"]) > 0
+
+    async for key in redis.scan_iter("ratelimit:*"):
+        await redis.delete(key)
+
+
+@pytest.mark.asyncio
+async def test_login_ip_backstop_limits_rotating_emails(async_client: AsyncClient, monkeypatch):
+    from app.config import settings
+    from app.core.redis import get_redis
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    redis = get_redis()
+    async for key in redis.scan_iter("ratelimit:*"):
+        await redis.delete(key)
+
+    statuses = []
+    for i in range(settings.LOGIN_IP_RATE_LIMIT_PER_MINUTE + 1):
+        credentials = {"email": f"nobody{i}@saramedico.com", "password": "WrongPass123!"}
+        statuses.append((await async_client.post("/api/v1/auth/login", json=credentials)).status_code)
+
+    assert statuses[:-1] == [401] * settings.LOGIN_IP_RATE_LIMIT_PER_MINUTE
+    assert statuses[-1] == 429
+
+    async for key in redis.scan_iter("ratelimit:*"):
+        await redis.delete(key)
+
+
+@pytest.mark.asyncio
+async def test_authenticated_traffic_does_not_use_anonymous_ip_budget(
+    async_client: AsyncClient, doctor_token, monkeypatch
+):
+    from app.config import settings
+    from app.core.redis import get_redis
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 3)
+    redis = get_redis()
+    async for key in redis.scan_iter("ratelimit:*"):
+        await redis.delete(key)
+
+    # Several signed-in users behind one clinic address
+    for _ in range(settings.RATE_LIMIT_PER_MINUTE + 2):
+        response = await async_client.get(
+            "/api/v1/notifications/unread-count", headers={"Authorization": f"Bearer {doctor_token}"}
+        )
+        assert response.status_code == 200
+
+    credentials = {"email": "nobody@saramedico.com", "password": "WrongPass123!"}
+    response = await async_client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == 401
+
+    async for key in redis.scan_iter("ratelimit:*"):
+        await redis.delete(key)
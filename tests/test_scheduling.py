@@ -0,0 +1,95 @@
+"""Tests for doctor availability (free/busy and slot finding)"""
+
+import pytest
+from httpx import AsyncClient
+
+
+def test_busy_intervals_merge_and_detect_overlaps():
+    from app.services.scheduling_service import BusyIntervals
+
+    busy = BusyIntervals([(300, 400), (100, 200), (150, 250), (250, 260)])
+
+    assert busy.to_list() == [[100, 260], [300, 400]]
+    assert busy.overlapping(90, 110) == (100, 260)
+    assert busy.overlapping(390, 500) == (300, 400)
+    assert busy.is_free(260, 300)  # Touching intervals do not overlap
+    assert busy.is_free(0, 100)
+    assert not busy.is_free(0, 1000)
+
+
+def test_slot_grid_stays_in_working_hours():
+    import pytz
+    from datetime import datetime, timedelta
+
+    from app.config import settings
+    from app.services.scheduling_service import SchedulingService
+
+    tz = pytz.timezone("Asia/Kolkata")
+    after = tz.localize(datetime(2031, 6, 6, 16, 10))  # Friday afternoon
+    slots = list(SchedulingService.slot_grid(tz, after, after + timedelta(days=4)))
+
+    local = [slot.astimezone(tz) for slot in slots]
+    assert local[0] == tz.localize(datetime(2031, 6, 6, 16, 30))
+    assert all(slot.weekday() < 5 for slot in local)  # Weekend skipped
+    assert all(
+        settings.SCHEDULING_WORKDAY_START_HOUR <= slot.hour < settings.SCHEDULING_WORKDAY_END_HOUR
+        for slot in local
+    )
+
+
+@pytest.mark.asyncio
+async def test_booked_slot_conflicts_and_leaves_free_slots(
+    async_client: AsyncClient, doctor_token, doctor_user, patient_user
+):
+    headers = {"Authorization": f"Bearer {doctor_token}"}
+    params = {"count": 1, "doctor_id": str(doctor_user.id)}
+
+    response = await async_client.get("/api/v1/appointments/slots", params=params, headers=headers)
+    assert response.status_code == 200
+    (first,) = response.json()
+
+    booking = {"patient_id": str(patient_user.id), "requested_date": first["start"], "reason": "Follow-up"}
+    response = await async_client.post("/api/v1/appointments/doctor-create", json=booking, headers=headers)
+    assert response.status_code == 201
+
+    response = await async_client.post("/api/v1/appointments/doctor-create", json=booking, headers=headers)
+    assert response.status_code == 409
+
+    response = await async_client.get("/api/v1/appointments/slots", params=params, headers=headers)
+    (next_slot,) = response.json()
+    assert next_slot["start"] != first["start"]
+
+
+@pytest.mark.asyncio
+async def test_slots_accept_naive_after_as_utc(async_client: AsyncClient, doctor_token, doctor_user):
+    from datetime import datetime, timedelta
+
+    after = (datetime.utcnow() + timedelta(days=2)).replace(microsecond=0)
+    params = {"count": 1, "doctor_id": str(doctor_user.id), "after": after.isoformat()}  # No offset
+
+    response = await async_client.get(
+        "/api/v1/appointments/slots", params=params, headers={"Authorization": f"Bearer {doctor_token}"}
+    )
+
+    assert response.status_code == 200
+    (slot,) = response.json()
+    assert datetime.fromisoformat(slot["start"].replace("Z", "+00:00")).replace(tzinfo=None) >= after
+
+
+@pytest.mark.asyncio
+async def test_busy_cache_is_dropped_only_after_commit(db_session, doctor_user):
+    import asyncio
+    from unittest.mock import AsyncMock, patch
+
+    from app.services import scheduling_service
+
+    with patch.object(scheduling_service, "invalidate_busy_intervals", new_callable=AsyncMock) as invalidate:
+        scheduling_service.defer_busy_invalidation(db_session, doctor_user.id)
+        await db_session.rollback()
+        scheduling_service.defer_busy_invalidation(db_session, doctor_user.id)
+        invalidate.assert_not_called()
+
+        await db_session.commit()
+        await asyncio.gather(*scheduling_service._background_tasks)
+
+    invalidate.assert_awaited_once_with(doctor_user.id)
@@ -120,6 +120,202 @@ async def test_generate_soap_note_fallback_on_error():
     assert "[MOCK" in result["subjective"] or len(result["subjective"]) > 0
 
 
+def test_segment_transcript_splits_on_speaker_turns():
+    """Long transcripts are split between speaker turns, losing no text."""
+    from app.services.aws_service import segment_transcript
+
+    transcript = "\n".join(
+        f"{'Dr. Patel' if i % 2 else 'Patient'}: statement number {i} " + "x" * 40
+        for i in range(100)
+    )
+    segments = segment_transcript(transcript, max_chars=1000)
+
+    assert len(segments) > 1
+    assert all(len(segment) <= 1000 for segment in segments)
+    assert all(segment.startswith(("Dr. Patel:", "Patient:")) for segment in segments)
+    assert "\n".join(segments) == transcript
+    assert segment_transcript("Patient: short visit", max_chars=1000) == ["Patient: short visit"]
+
+
+
+def test_segment_transcript_splits_long_turn_between_words():
+    """A monologue longer than a segment is split on whitespace, never mid-word."""
+    from app.services.aws_service import segment_transcript
+
+    words = [f"word{i}" for i in range(400)]
+    transcript = "Dr. Patel: " + " ".join(words)
+    segments = segment_transcript(transcript, max_chars=200)
+
+    assert len(segments) > 1
+    assert all(len(segment) <= 200 for segment in segments)
+    assert " ".join(segments).split() == transcript.split()
+
+
+def test_consultation_chunk_texts_cover_soap_sections_and_orders():
+    """Completed consultations are indexed per SOAP section plus diagnosis/prescription."""
+    from app.models.consultation import Consultation
+    from app.services.consultation_indexer import consultation_chunk_texts
+
+    consultation = Consultation(
+        scheduled_at=datetime(2021, 3, 14, 9, 30),
+        soap_note={
+            "subjective": "Wheezing at night",
+            "objective": "",
+            "assessment": "Mild persistent asthma",
+            "plan": "Start inhaled budesonide",
+            "patient_summary": "Not indexed",
+        },
+        diagnosis="Asthma",
+        prescription="Budesonide 200 mcg BID",
+    )
+
+    texts = consultation_chunk_texts(consultation)
+    assert [source for source, _ in texts] == [
+        "SOAP_SUBJECTIVE", "SOAP_ASSESSMENT", "SOAP_PLAN", "CONSULTATION_ORDERS"
+    ]
+    assert texts[1][1] == "Consultation 2021-03-14 — Assessment: Mild persistent asthma"
+    assert "Prescription: Budesonide 200 mcg BID" in texts[3][1]
+
+    # SOAP notes still being generated are left out; orders are still indexed
+    assert [source for source, _ in consultation_chunk_texts(consultation, include_soap=False)] == [
+        "CONSULTATION_ORDERS"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_generate_soap_note_map_reduce_for_long_transcript():
+    """Long transcripts get one findings call per segment plus one merge call."""
+    import json
+    from app.services.aws_service import AWSService, SOAP_SYSTEM_PROMPT
+
+    merged_soap = {
+        "subjective": "Patient reports two weeks of headaches.",
+        "objective": "BP 150/95.",
+        "assessment": "Tension headache; rule out hypertension.",
+        "plan": "Home BP log, follow-up in 2 weeks.",
+        "patient_summary": "We talked about your headaches and blood pressure."
+    }
+    segment_findings = {"subjective": ["Headaches"], "objective": [], "assessment": [], "plan": []}
+
+    def _invoke_model(modelId, body):
+        payload = json.loads(body)
+        reply = merged_soap if payload["system"] == SOAP_SYSTEM_PROMPT else segment_findings
+        return {"body": MagicMock(read=MagicMock(return_value=json.dumps(
+            {"content": [{"text": json.dumps(reply)}]}
+        ).encode()))}
+
+    transcript = "\n".join(
+        f"{'Dr. Patel' if i % 2 else 'Patient'}: turn {i} " + "y" * 60 for i in range(60)
+    )
+
+    with patch.object(AWSService, '_get_client') as mock_client_factory, \
+            patch("app.config.settings.SOAP_SEGMENT_CHARS", 1000):
+        mock_client = MagicMock()
+        mock_client.invoke_model.side_effect = _invoke_model
+        mock_client_factory.return_value = mock_client
+
+        result = await AWSService().generate_soap_note(transcript=transcript)
+
+    systems = [json.loads(call.kwargs["body"])["system"] for call in mock_client.invoke_model.call_args_list]
+    assert systems.count(SOAP_SYSTEM_PROMPT) == 1
+    assert len(systems) > 2
+    assert result == merged_soap
+
+
+@pytest.mark.asyncio
+async def test_invoke_cached_reuses_identical_requests():
+    """A repeated idempotent request is answered from the response cache."""
+    import json
+    from app.services.aws_service import AWSService
+    from app.services.bedrock_cache import bedrock_cache
+
+    store = {}
+
+    async def _get(key):
+        return store.get(key)
+
+    async def _set(key, value):
+        store[key] = value
+
+    response_body = {"content": [{"text": "[]"}], "usage": {"input_tokens": 900}}
+
+    with patch.object(AWSService, '_get_client') as mock_client_factory, \
+            patch.object(bedrock_cache, "get", side_effect=_get), \
+            patch.object(bedrock_cache, "set", side_effect=_set), \
+            patch.object(bedrock_cache, "record", new_callable=AsyncMock) as mock_record:
+        mock_client = MagicMock()
+        mock_client.invoke_model.return_value = {
+            "body": MagicMock(read=MagicMock(return_value=json.dumps(response_body).encode()))
+        }
+        mock_client_factory.return_value = mock_client
+
+        service = AWSService()
+        body = {"anthropic_version": "bedrock-2023-05-31", "max_tokens": 10,
+                "messages": [{"role": "user", "content": "timeline please"}]}
+        first = await service.invoke_cached(body, kind="timeline")
+        second = await service.invoke_cached(dict(reversed(list(body.items()))), kind="timeline")
+
+    assert first == second == response_body
+    assert mock_client.invoke_model.call_count == 1
+    assert [call.kwargs.get("hit") for call in mock_record.call_args_list] == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_response_cache_encrypts_stored_bodies():
+    """Cached Bedrock responses quote patient data, so Redis only sees ciphertext."""
+    import json
+    from app.services.bedrock_cache import bedrock_cache
+
+    store = {}
+
+    async def _set(key, value, ex=None):
+        store[key] = value
+
+    redis = MagicMock(get=AsyncMock(side_effect=store.get), set=AsyncMock(side_effect=_set))
+    body = {"content": [{"text": "Patient John Doe, HbA1c 7.2%"}]}
+
+    with patch("app.services.bedrock_cache.get_redis", return_value=redis):
+        await bedrock_cache.set("bedrock:resp:test", body)
+        assert "John Doe" not in store["bedrock:resp:test"]
+        assert await bedrock_cache.get("bedrock:resp:test") == body
+
+        store["bedrock:resp:test"] = json.dumps(body)  # Plaintext entry from before encryption
+        assert await bedrock_cache.get("bedrock:resp:test") is None
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_disables_prompt_caching_only_for_cache_errors():
+    """Only a cache_control rejection turns prompt caching off; other errors retry once."""
+    import json
+    from botocore.exceptions import ClientError
+    from app.services.aws_service import AWSService
+
+    def _rejection(message):
+        return ClientError({"Error": {"Code": "ValidationException", "Message": message}}, "InvokeModelWithResponseStream")
+
+    delta = {"type": "content_block_delta", "delta": {"text": "ok"}}
+    streamed = {"body": [{"chunk": {"bytes": json.dumps(delta).encode()}}]}
+    messages = [{"role": "user", "content": "Any allergies?"}]
+
+    with patch.object(AWSService, '_get_client') as mock_client_factory:
+        mock_client = MagicMock()
+        mock_client_factory.return_value = mock_client
+        service = AWSService()
+        service._prompt_caching_enabled = True
+
+        mock_client.invoke_model_with_response_stream.side_effect = [_rejection("Malformed input request"), streamed]
+        assert [text async for text in service.generate_chat_stream(messages, "context")] == ["ok"]
+        retry_body = json.loads(mock_client.invoke_model_with_response_stream.call_args.kwargs["body"])
+        assert "cache_control" not in json.dumps(retry_body)
+        assert service._prompt_caching_enabled is True
+
+        mock_client.invoke_model_with_response_stream.side_effect = [
+            _rejection("extraneous key [cache_control] is not permitted"), streamed
+        ]
+        assert [text async for text in service.generate_chat_stream(messages, "context")] == ["ok"]
+        assert service._prompt_caching_enabled is False
+
+
 # ─────────────────────────────────────────────────────────
 # Integration Tests: API Endpoints
 # ─────────────────────────────────────────────────────────
@@ -278,3 +474,50 @@ async def test_auto_trigger_on_completion(
     assert update_resp.json()["status"] == "completed"
     # Verify the background SOAP generation task was triggered
     mock_task.assert_called_once_with(cons_id)
+
+
+@pytest.mark.asyncio
+async def test_generate_soap_note_merge_tolerates_non_object_findings():
+    """A segment whose findings come back as a bare JSON value is merged as unavailable."""
+    import json
+    from app.services.aws_service import AWSService, SOAP_SYSTEM_PROMPT
+
+    merged_soap = {
+        "subjective": "Headaches.",
+        "objective": "No data provided in transcript",
+        "assessment": "Tension headache.",
+        "plan": "Follow-up in 2 weeks.",
+        "patient_summary": "We talked about your headaches."
+    }
+    segment_replies = ['"nothing clinical here"']
+
+    def _invoke_model(modelId, body):
+        payload = json.loads(body)
+        if payload["system"] == SOAP_SYSTEM_PROMPT:
+            reply = json.dumps(merged_soap)
+        elif segment_replies:
+            reply = segment_replies.pop()
+        else:
+            reply = json.dumps({"subjective": ["Headaches"], "objective": [], "assessment": [], "plan": []})
+        return {"body": MagicMock(read=MagicMock(return_value=json.dumps(
+            {"content": [{"text": reply}]}
+        ).encode()))}
+
+    transcript = "\n".join(
+        f"{'Dr. Patel' if i % 2 else 'Patient'}: turn {i} " + "y" * 60 for i in range(60)
+    )
+
+    with patch.object(AWSService, '_get_client') as mock_client_factory, \
+            patch("app.config.settings.SOAP_SEGMENT_CHARS", 1000):
+        mock_client = MagicMock()
+        mock_client.invoke_model.side_effect = _invoke_model
+        mock_client_factory.return_value = mock_client
+
+        result = await AWSService().generate_soap_note(transcript=transcript)
+
+    merge_call = next(
+        json.loads(call.kwargs["body"]) for call in mock_client.invoke_model.call_args_list
+        if json.loads(call.kwargs["body"])["system"] == SOAP_SYSTEM_PROMPT
+    )
+    assert '"unavailable": true' in merge_call["messages"][0]["content"]
+    assert result == merged_soap
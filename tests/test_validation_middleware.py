@@ -0,0 +1,73 @@
+import pytest
+
+
+def _scope(method, path, headers):
+    return {"type": "http", "method": method, "path": path, "headers": headers}
+
+
+async def _run(middleware, scope, chunks):
+    """Drive an ASGI middleware; returns (response status, sent messages, raised exception)"""
+    messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1} for i, c in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    try:
+        await middleware(scope, receive, send)
+    except Exception as e:
+        return None, None, e
+    return sent[0]["status"] if sent else None, sent, None
+
+
+@pytest.mark.asyncio
+async def test_chunked_body_counted_against_route_limit(monkeypatch):
+    from fastapi import HTTPException
+    from app.config import settings
+    from app.middleware.validation import ValidationMiddleware
+
+    monkeypatch.setattr(settings, "MAX_REQUEST_BODY_MB", 1)
+    consumed = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            consumed.append(len(message["body"]))
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = ValidationMiddleware(app)
+    chunked = [(b"content-type", b"application/json"), (b"transfer-encoding", b"chunked")]
+
+    status, _, error = await _run(middleware, _scope("POST", "/api/v1/patients", chunked), [b"x" * 512 * 1024] * 3)
+    assert isinstance(error, HTTPException) and error.status_code == 413
+    assert sum(consumed) <= 1024 * 1024
+
+    # Upload routes get MAX_UPLOAD_SIZE_MB
+    consumed.clear()
+    upload = [(b"content-type", b"multipart/form-data; boundary=x"), (b"transfer-encoding", b"chunked")]
+    status, _, error = await _run(middleware, _scope("POST", "/api/v1/documents/upload", upload), [b"x" * 512 * 1024] * 3)
+    assert error is None and status == 200
+
+    # Declared lengths are refused before the app runs
+    consumed.clear()
+    declared = [(b"content-type", b"application/json"), (b"content-length", str(2 * 1024 * 1024).encode())]
+    status, _, error = await _run(middleware, _scope("POST", "/api/v1/patients", declared), [b""])
+    assert status == 413 and consumed == []
+
+
+def test_content_type_checks():
+    from app.middleware.validation import content_type_error
+
+    assert content_type_error("POST", "/api/v1/patients", "application/json; charset=utf-8", True) is None
+    assert content_type_error("PATCH", "/api/v1/patients/x", "application/merge-patch+json", True) is None
+    assert content_type_error("POST", "/api/v1/patients", "text/xml", True)[0] == 415
+    assert content_type_error("POST", "/api/v1/documents/upload", "application/json", True)[0] == 415
+    assert content_type_error("POST", "/api/v1/doctor/ai/chat/doctor", "", False)[0] == 400
+    # Empty POSTs (state transitions) need no Content-Type
+    assert content_type_error("POST", "/api/v1/consultations/x/start", "", False) is None
@@ -0,0 +1,38 @@
+"""
+Unit tests for embedding storage modes in vector search.
+"""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.chunk import Chunk
+from app.services.vector_search import ef_search_statement, rank_by_similarity
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_vector_mode_orders_by_cosine_distance():
+    sql = _sql(rank_by_similarity(select(Chunk.id), [0.1] * 1536, 10, mode="vector"))
+    assert "chunks.embedding <=>" in sql
+    assert "HALFVEC" not in sql and "binary_quantize" not in sql
+
+
+def test_halfvec_mode_matches_expression_index():
+    sql = _sql(rank_by_similarity(select(Chunk.id), [0.1] * 1536, 10, mode="halfvec"))
+    assert "CAST(chunks.embedding AS HALFVEC(1536)) <=>" in sql
+
+
+def test_binary_mode_reranks_hamming_shortlist():
+    sql = _sql(rank_by_similarity(select(Chunk.id), [0.1] * 1536, 10, mode="binary"))
+    # Shortlist by Hamming distance on the bit index, final order by exact cosine
+    assert "CAST(binary_quantize(chunks.embedding) AS BIT(1536)) <~>" in sql
+    assert sql.index("<~>") < sql.rindex("chunks.embedding <=>")
+    assert "SET LOCAL hnsw.ef_search = 40" in str(ef_search_statement(10, mode="binary"))
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        rank_by_similarity(select(Chunk.id), [0.1] * 1536, 10, mode="pq")